@@ -0,0 +1,17 @@
+from toc_bench import comparar_escalamiento
+
+CON_RESTRICCION = [(1_000, 0.04), (10_000, 0.40), (50_000, 2.00)]
+
+
+def test_escalamiento_igual_no_falla():
+    # Constante distinta, mismo crecimiento
+    sin_restriccion = [(n, t * 0.7) for n, t in CON_RESTRICCION]
+    assert comparar_escalamiento(CON_RESTRICCION, sin_restriccion) == []
+
+
+def test_escalamiento_peor_falla():
+    # El caso sin restricción crece de forma cuadrática
+    sin_restriccion = [(1_000, 0.04), (10_000, 0.60), (50_000, 40.0)]
+    regresiones = comparar_escalamiento(CON_RESTRICCION, sin_restriccion, umbral=0.5)
+    assert [r["productos"] for r in regresiones] == [50_000]
+    assert regresiones[0]["escalamiento"] == 20.0
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+import toc_cache
+
+
+def _salidas(tmp_path, contenido):
+    rutas = {}
+    for nombre, texto in contenido.items():
+        ruta = tmp_path / nombre
+        ruta.write_text(texto, encoding="utf-8")
+        rutas[nombre] = str(ruta)
+    return rutas
+
+
+def test_clave_cambia_con_datos_version_y_opciones():
+    datos = {"recursos": {"a": 1, "b": 2}, "productos": {}}
+    clave = toc_cache.cache_key(datos, "1.0", mode="greedy")
+    # El orden de las claves no cambia el hash
+    assert clave == toc_cache.cache_key({"productos": {}, "recursos": {"b": 2, "a": 1}}, "1.0", mode="greedy")
+    assert clave != toc_cache.cache_key({"recursos": {"a": 1, "b": 3}, "productos": {}}, "1.0", mode="greedy")
+    assert clave != toc_cache.cache_key(datos, "1.1", mode="greedy")
+    assert clave != toc_cache.cache_key(datos, "1.0", mode="lp")
+
+
+def test_guardar_y_recuperar(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    origen = _salidas(tmp_path, {"resultados.csv": "a,b\n1,2\n", "resumen.txt": "texto"})
+    resumen = {"bottleneck": "a", "net_profit": 300.0}
+    toc_cache.store("k1", origen, resumen, cache_dir)
+
+    destino = {nombre: str(tmp_path / f"copia_{nombre}") for nombre in origen}
+    assert toc_cache.lookup("k1", destino, cache_dir) == resumen
+    for nombre in origen:
+        with open(destino[nombre], encoding="utf-8") as a, open(origen[nombre], encoding="utf-8") as b:
+            assert a.read() == b.read()
+    assert toc_cache.lookup("otra", destino, cache_dir) is None
+    # Sin directorios temporales a medias
+    assert sorted(os.listdir(cache_dir)) == ["k1"]
+
+
+def test_entrada_danada_es_un_fallo(tmp_path):
+    cache_dir = tmp_path / "cache"
+    (cache_dir / "k1").mkdir(parents=True)
+    (cache_dir / "k1" / toc_cache.META_FILE).write_text("{no es json", encoding="utf-8")
+    assert toc_cache.lookup("k1", {}, str(cache_dir)) is None
+
+
+def test_limpieza_por_antiguedad_y_tamano(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    origen = _salidas(tmp_path, {"grande.bin": "x" * 400_000})
+    ahora = time.time()
+    for i, dias in enumerate((40, 3, 2, 1)):
+        toc_cache.store(f"k{i}", origen, {}, cache_dir)
+        meta = os.path.join(cache_dir, f"k{i}", toc_cache.META_FILE)
+        os.utime(meta, (ahora - dias * 86400, ahora - dias * 86400))
+
+    # k0 es más antigua que 30 días; con 1 MB solo caben dos de las restantes (las más recientes)
+    assert toc_cache.evict(cache_dir, max_mb=1, max_age_days=30) == 2
+    assert sorted(os.listdir(cache_dir)) == ["k2", "k3"]
+
+
+def test_limpieza_tolera_entradas_que_desaparecen(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    for nombre in ("k1", "k2"):
+        (cache_dir / nombre).mkdir(parents=True)
+        (cache_dir / nombre / toc_cache.META_FILE).write_text(json.dumps({"summary": {}, "files": []}))
+
+    # Otro proceso borra una entrada entre el listado y la lectura de su tamaño
+    getsize = os.path.getsize
+
+    def getsize_con_carrera(ruta):
+        if os.sep + "k1" + os.sep in ruta:
+            raise FileNotFoundError(ruta)
+        return getsize(ruta)
+
+    monkeypatch.setattr(os.path, "getsize", getsize_con_carrera)
+    assert toc_cache.evict(str(cache_dir), max_mb=0) == 1
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+import toc_columnar
+from toc_read import TocDataError, load_catalog_from_file, load_data_from_file
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+PLANTAS = ["textiles.yml", "ies_nov.yml", "servicios.yml", os.path.join("datos_prueba", "capacidades_mixtas.yml")]
+
+
+@pytest.mark.parametrize("planta", PLANTAS)
+@pytest.mark.parametrize("mmap", [True, False])
+def test_ida_y_vuelta(planta, mmap, tmp_path):
+    yaml_catalog = load_catalog_from_file(os.path.join(AQUI, planta))
+    npz = toc_columnar.convert_yaml_to_npz(os.path.join(AQUI, planta), str(tmp_path / "planta.npz"))
+    catalog = toc_columnar.load_catalog_npz(npz, mmap=mmap)
+
+    # 'generales' se guarda como JSON: las fechas vuelven como texto
+    assert catalog.generales == {k: v if isinstance(v, (int, float)) else str(v)
+                                 for k, v in yaml_catalog.generales.items()}
+    assert catalog.resource_names == yaml_catalog.resource_names
+    assert [str(p) for p in catalog.product_names] == yaml_catalog.product_names
+    assert catalog.capacity_values == yaml_catalog.capacity_values
+    for campo in ("capacity", "demand", "price", "cost", "indptr", "indices", "times"):
+        assert np.asarray(getattr(catalog, campo)).tolist() == list(getattr(yaml_catalog, campo)), campo
+    assert catalog.operating_expenses == yaml_catalog.operating_expenses
+    assert catalog.datos is None
+
+
+def _npz_modificado(tmp_path, **cambios):
+    npz = toc_columnar.convert_yaml_to_npz(os.path.join(AQUI, "ies_nov.yml"), str(tmp_path / "base.npz"))
+    with np.load(npz) as data:
+        arrays = {name: data[name] for name in data.files}
+    for name, value in cambios.items():
+        if value is None:
+            del arrays[name]
+        else:
+            arrays[name] = value(arrays[name].copy())
+    ruta = str(tmp_path / "modificado.npz")
+    np.savez(ruta, **arrays)
+    return ruta
+
+
+def _con(indice, valor):
+    def cambiar(a):
+        a = a.astype(np.result_type(a, valor))
+        a[indice] = valor
+        return a
+    return cambiar
+
+
+@pytest.mark.parametrize("cambios, mensaje", [
+    ({"indices": _con(0, 7)}, "'indices'"),
+    ({"capacity": _con(1, 0)}, "mayor que 0"),
+    ({"demand": _con(0, -1)}, "no negativa"),
+    ({"times": _con(0, -0.5)}, "negativos"),
+    ({"times": _con(0, np.nan)}, "finitos"),
+    ({"indptr": lambda a: a[::-1].copy()}, "'indptr'"),
+    ({"demand": lambda a: a[:-1]}, "forma"),
+    ({"price": None}, "price"),
+])
+def test_archivo_invalido(tmp_path, cambios, mensaje):
+    with pytest.raises(TocDataError, match=mensaje):
+        load_catalog_from_file(_npz_modificado(tmp_path, **cambios))
+
+
+def test_load_data_from_file_solo_yaml(tmp_path):
+    assert isinstance(load_data_from_file(os.path.join(AQUI, "textiles.yml")), dict)
+    npz = toc_columnar.convert_yaml_to_npz(os.path.join(AQUI, "textiles.yml"), str(tmp_path / "t.npz"))
+    with pytest.raises(ValueError, match="load_catalog_from_file"):
+        load_data_from_file(npz)
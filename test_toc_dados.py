@@ -0,0 +1,36 @@
+import io
+
+from toc_dados import Jugador, LineaDeProduccion
+
+
+def _linea(destino_logs=None):
+    return LineaDeProduccion([Jugador("A", 6), Jugador("B", 6)], destino_logs=destino_logs)
+
+
+def test_reporte_en_buffer_se_escribe_y_se_informa(tmp_path, capsys):
+    linea = _linea()
+    linea.simular_jornada(numero_de_turnos=3)
+    ruta = tmp_path / "reporte.txt"
+    linea.guardar_reporte(str(ruta))
+    assert ruta.read_text(encoding="utf-8") == "\n".join(linea.logs)
+    assert f"Reporte guardado en: {ruta}" in capsys.readouterr().out
+
+
+def test_reporte_en_archivo_propio_informa_esa_ruta(tmp_path, capsys):
+    ruta = tmp_path / "flujo.txt"
+    linea = _linea(str(ruta))
+    linea.simular_jornada(numero_de_turnos=3)
+    linea.guardar_reporte(str(tmp_path / "ignorado.txt"))
+    assert ruta.read_text(encoding="utf-8")
+    assert not (tmp_path / "ignorado.txt").exists()
+    assert f"Reporte guardado en: {ruta}" in capsys.readouterr().out
+
+
+def test_reporte_a_funcion_u_objeto_no_informa_ruta(tmp_path, capsys):
+    for destino in ([].append, io.StringIO()):
+        linea = _linea(destino)
+        linea.simular_jornada(numero_de_turnos=3)
+        capsys.readouterr()
+        linea.guardar_reporte(str(tmp_path / "reporte.txt"))
+        assert "Reporte guardado en" not in capsys.readouterr().out
+        assert not (tmp_path / "reporte.txt").exists()
@@ -0,0 +1,28 @@
+import toc_dbr
+
+
+def _planta(productos):
+    return {
+        "generales": {"empresa": "prueba", "fecha": "2025-01-01"},
+        "recursos": {"a": 1000, "b": 1000},
+        "productos": productos,
+        "gastos_operacion": {"sueldos": 0},
+    }
+
+
+def test_orden_sin_recursos_no_genera_operaciones():
+    # p1 no usa recursos: su orden no debe ocupar recursos ni alterar las demás
+    for nombres in (("p1", "p2"), ("p2", "p1")):
+        productos = {
+            "p1": {"costo_ventas": 0, "precio": 10, "demanda": 5, "recursos": {}},
+            "p2": {"costo_ventas": 0, "precio": 10, "demanda": 5, "recursos": {"a": 10, "b": 3}},
+        }
+        programa = toc_dbr.programar_dbr(_planta({n: productos[n] for n in nombres}))
+        gantt = programa["gantt"]
+        ordenes = programa["ordenes"].set_index("Producto")
+
+        assert set(gantt["Producto"]) == {"p2"}
+        assert gantt[["Recurso", "Inicio", "Fin"]].values.tolist() == [["a", 0.0, 50.0], ["b", 50.0, 65.0]]
+        assert ordenes.loc["p1", "Fin"] == ordenes.loc["p1", "Liberacion"]
+        assert ordenes.loc["p2", "Fin"] == 65.0
+        assert programa["makespan"] == 65.0
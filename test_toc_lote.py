@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from toc_dados import PoliticaLiberacion
+from toc_lote import LineaDeProduccionLote, comparar_con_escalar
+
+LINEA = [8, 8, 4, 8, 8]
+POLITICAS = {
+    "push": PoliticaLiberacion(),
+    "dbr": PoliticaLiberacion("dbr", limite=8, tambor=2),
+    "conwip": PoliticaLiberacion("conwip", limite=12),
+    "kanban": PoliticaLiberacion("kanban", limite=3),
+    "kanban_por_estacion": PoliticaLiberacion("kanban", limite=[2, 5, 1, 4, None]),
+    "push_lotes": PoliticaLiberacion(lote_transferencia=4),
+    "dbr_lotes": PoliticaLiberacion("dbr", limite=10, tambor=2, lote_transferencia=3),
+    "conwip_lotes": PoliticaLiberacion("conwip", limite=15, lote_transferencia=2),
+}
+
+
+@pytest.mark.parametrize("politica", sorted(POLITICAS))
+@pytest.mark.parametrize("caras", [LINEA, [6, 6, 6], [3]])
+def test_motor_vectorizado_igual_al_escalar(politica, caras):
+    if POLITICAS[politica].tipo == "dbr" and len(caras) <= 2:
+        pytest.skip("El tambor es la tercera estación.")
+    if isinstance(POLITICAS[politica].limite, list) and len(caras) != len(LINEA):
+        pytest.skip("Límites kanban definidos para la línea de cinco estaciones.")
+    for semilla in range(10):
+        assert comparar_con_escalar(caras, 50, semilla=semilla, politica=POLITICAS[politica])
+
+
+@pytest.mark.parametrize("politica", sorted(POLITICAS))
+def test_replicas_independientes(politica):
+    # Cada réplica del lote evoluciona igual que un lote de una sola réplica con sus lanzamientos
+    rng = np.random.default_rng(3)
+    lanzamientos = rng.integers(1, np.array(LINEA) + 1, size=(40, 6, len(LINEA)))
+    lote = LineaDeProduccionLote(LINEA, replicas=6, politica=POLITICAS[politica])
+    lote.simular_lanzamientos(lanzamientos)
+    for r in range(6):
+        sola = LineaDeProduccionLote(LINEA, replicas=1, politica=POLITICAS[politica])
+        sola.simular_lanzamientos(lanzamientos[:, r:r + 1])
+        assert sola.producto_terminado[0] == lote.producto_terminado[r]
+        assert sola.wip()[0] == lote.wip()[r]
+        assert sola.suma_wip[0] == lote.suma_wip[r]
+
+
+def test_limites_de_wip_de_cada_politica():
+    conwip = LineaDeProduccionLote(LINEA, replicas=200, semilla=1, politica=POLITICAS["conwip"])
+    dbr = LineaDeProduccionLote(LINEA, replicas=200, semilla=1, politica=POLITICAS["dbr"])
+    kanban = LineaDeProduccionLote(LINEA, replicas=200, semilla=1, politica=POLITICAS["kanban_por_estacion"])
+    limites = np.array([2, 5, 1, 4])
+    for _ in range(100):
+        for lote in (conwip, dbr, kanban):
+            lote.simular_turno()
+        assert (conwip.wip() <= 12).all()
+        assert ((dbr.inventario[:, :2] + dbr.en_lote[:, :2]).sum(axis=1) <= 8).all()
+        assert ((kanban.inventario[:, :-1] + kanban.en_lote[:, :-1]) <= limites).all()
+
+
+def test_politicas_con_limite_reducen_el_wip():
+    resultados = {}
+    for nombre in ("push", "dbr", "conwip"):
+        lote = LineaDeProduccionLote(LINEA, replicas=500, semilla=7, politica=POLITICAS[nombre])
+        lote.simular_jornada(300)
+        resultados[nombre] = lote.resultados()
+    wip = {nombre: res["wip_promedio"].mean() for nombre, res in resultados.items()}
+    assert wip["dbr"] < wip["push"] / 5 and wip["conwip"] < wip["push"] / 5
+    # El tambor protegido conserva casi todo el throughput de push
+    assert resultados["dbr"]["throughput"].mean() > 0.95 * resultados["push"]["throughput"].mean()
+
+
+def test_semilla_reproduce_la_corrida():
+    a = LineaDeProduccionLote(LINEA, replicas=50, semilla=11, politica=POLITICAS["kanban"])
+    b = LineaDeProduccionLote(LINEA, replicas=50, semilla=11, politica=POLITICAS["kanban"])
+    a.simular_jornada(30)
+    b.simular_jornada(30)
+    assert a.producto_terminado.tolist() == b.producto_terminado.tolist()
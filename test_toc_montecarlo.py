@@ -0,0 +1,60 @@
+import copy
+
+import numpy as np
+import pytest
+
+import toc_montecarlo
+from toc_optimize import TocModel
+from toc_read import TocCatalog
+
+
+def _planta():
+    return {
+        "generales": {"empresa": "prueba", "fecha": "2025-01-01"},
+        "recursos": {"corte": 2400, "costura": 2400, "empaque": 900},
+        "productos": {
+            "camisa": {"costo_ventas": 50, "precio": 100, "demanda": 120,
+                       "demanda_dist": {"tipo": "normal", "desv": 30},
+                       "recursos": {"corte": 10, "costura": 10, "empaque": 2}},
+            "blusa": {"costo_ventas": 45, "precio": 105, "demanda": 120,
+                      "demanda_dist": {"tipo": "triangular", "min": 60, "max": 200},
+                      "recursos": {"corte": 2, "costura": 15, "empaque": 3}},
+            "pantalon": {"costo_ventas": 30, "precio": 80, "demanda": 80,
+                         "demanda_dist": {"tipo": "poisson"},
+                         "recursos": {"corte": 6, "empaque": 4}},
+        },
+        "gastos_operacion": {"sueldos": 10000},
+        "disponibilidad": {"costura": {"tipo": "uniforme", "min": 60, "max": 100}, "corte": 90},
+    }
+
+
+def test_muestras_igual_a_resolver_cada_escenario():
+    catalog = TocCatalog.from_datos(_planta())
+    modelo = TocModel(catalog)
+    demand, capacity = toc_montecarlo.sortear_muestras(catalog, 300, np.random.default_rng(5))
+    restriccion, throughput = toc_montecarlo.resolver_muestras(modelo, demand, capacity)
+
+    assert len(set(restriccion.tolist())) > 1  # Las muestras cubren varias restricciones
+    for i in range(len(demand)):
+        resultado = TocModel(catalog).update(capacity=capacity[i], demand=demand[i]).solve()
+        assert restriccion[i] == (resultado.bottleneck_index if resultado.has_bottleneck else -1)
+        assert throughput[i] == pytest.approx(float(resultado.total_throughput))
+
+
+def test_sin_incertidumbre_coincide_con_el_modelo():
+    datos = copy.deepcopy(_planta())
+    for producto in datos["productos"].values():
+        del producto["demanda_dist"]
+    del datos["disponibilidad"]
+    resultado = TocModel(datos).solve()
+    mc = toc_montecarlo.montecarlo(datos, muestras=50, semilla=1, procesos=1)
+    assert np.allclose(mc["throughput_total"], float(resultado.total_throughput))
+    assert np.allclose(mc["utilidad_neta"], float(resultado.net_profit))
+
+
+def test_resultado_no_depende_de_los_procesos():
+    uno = toc_montecarlo.montecarlo(_planta(), muestras=2500, semilla=3, procesos=1, tamano_bloque=1000)
+    dos = toc_montecarlo.montecarlo(_planta(), muestras=2500, semilla=3, procesos=2, tamano_bloque=1000)
+    assert uno["restriccion"].tolist() == dos["restriccion"].tolist()
+    assert uno["throughput_total"].tolist() == dos["throughput_total"].tolist()
+    assert uno["frecuencia_restriccion"]["veces"].sum() == 2500
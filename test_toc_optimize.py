@@ -0,0 +1,97 @@
+import copy
+import os
+
+import numpy as np
+import pytest
+
+import toc_columnar
+from toc_optimize import TocModel, run_toc_analysis
+from toc_read import load_catalog_from_file
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+# Reportes de referencia generados con la versión original (diccionarios y bucles por producto)
+PLANTAS = {
+    "textiles": os.path.join(AQUI, "textiles.yml"),
+    "ies_nov": os.path.join(AQUI, "ies_nov.yml"),
+    "servicios": os.path.join(AQUI, "servicios.yml"),
+    "capacidades_mixtas": os.path.join(AQUI, "datos_prueba", "capacidades_mixtas.yml"),
+}
+
+
+def _esperado(planta, sufijo):
+    with open(os.path.join(AQUI, "datos_prueba", f"{planta}_{sufijo}"), encoding="utf-8") as f:
+        return f.read()
+
+
+def _reporte(datos, planta, tmp_path):
+    csv_path, txt_path = tmp_path / "resultados.csv", tmp_path / "resumen.txt"
+    run_toc_analysis(datos, str(csv_path), str(txt_path), f"{os.path.basename(PLANTAS[planta])}")
+    return csv_path.read_text(encoding="utf-8"), txt_path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("planta", sorted(PLANTAS))
+def test_reporte_igual_a_la_version_original(planta, tmp_path):
+    csv, txt = _reporte(load_catalog_from_file(PLANTAS[planta]), planta, tmp_path)
+    assert csv == _esperado(planta, "resultados_toc.csv")
+    assert txt == _esperado(planta, "resumen.txt")
+
+
+@pytest.mark.parametrize("planta", sorted(PLANTAS))
+def test_reporte_desde_npz_igual_al_yaml(planta, tmp_path):
+    npz = toc_columnar.convert_yaml_to_npz(PLANTAS[planta], str(tmp_path / f"{planta}.npz"))
+    csv, txt = _reporte(load_catalog_from_file(npz), planta, tmp_path)
+    assert csv == _esperado(planta, "resultados_toc.csv")
+    assert txt == _esperado(planta, "resumen.txt")
+
+
+def _comparar_resultados(incremental, nuevo):
+    assert incremental.bottleneck == nuevo.bottleneck
+    assert incremental.has_bottleneck == nuevo.has_bottleneck
+    assert incremental.max_factor == pytest.approx(nuevo.max_factor)
+    assert incremental.units.tolist() == nuevo.units.tolist()
+    assert incremental.order.tolist() == nuevo.order.tolist()
+    assert float(incremental.net_profit) == pytest.approx(float(nuevo.net_profit))
+
+
+@pytest.mark.parametrize("planta", ["textiles", "ies_nov", "servicios"])
+def test_cambios_incrementales_igual_a_modelo_nuevo(planta):
+    catalog = load_catalog_from_file(PLANTAS[planta])
+    datos = copy.deepcopy(catalog.datos)
+    modelo = TocModel(catalog)
+    modelo.solve()
+
+    recurso = catalog.resource_names[0]
+    producto = str(catalog.product_names[-1])
+    modelo.scale_capacity(recurso, 0.5)
+    modelo.set_demand(producto, 3 * modelo.demand_of(producto))
+    modelo.set_price(producto, modelo.price_of(producto) + 40)
+    modelo.set_cost(producto, modelo.cost_of(producto) + 5)
+
+    datos["recursos"][recurso] = datos["recursos"][recurso] * 0.5
+    datos["productos"][producto]["demanda"] *= 3
+    datos["productos"][producto]["precio"] += 40
+    datos["productos"][producto]["costo_ventas"] += 5
+    _comparar_resultados(modelo.solve(), TocModel(datos).solve())
+
+
+def test_update_de_vectores_igual_a_modelo_nuevo():
+    catalog = load_catalog_from_file(PLANTAS["servicios"])
+    datos = copy.deepcopy(catalog.datos)
+    modelo = TocModel(catalog)
+    capacidad = np.asarray(catalog.capacity) * 2
+    demanda = np.asarray(catalog.demand) + 7
+    modelo.update(capacity=capacidad, demand=demanda)
+
+    for r, valor in zip(catalog.resource_names, capacidad.tolist()):
+        datos["recursos"][r] = valor
+    for p, valor in zip(catalog.product_names, demanda.tolist()):
+        datos["productos"][p]["demanda"] = valor
+    _comparar_resultados(modelo.solve(), TocModel(datos).solve())
+
+
+def test_solve_sin_cambios_reutiliza_el_resultado():
+    modelo = TocModel(load_catalog_from_file(PLANTAS["textiles"]))
+    assert modelo.solve() is modelo.solve()
+    resultado = modelo.solve()
+    modelo.set_demand("camisa_mujer", 10)
+    assert modelo.solve() is not resultado
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from toc_ruteo import RedDeProduccion
+
+
+def _red(retrabajos, replicas=4000):
+    return RedDeProduccion({"A": 6, "B": 6, "C": 6}, [("A", "B"), ("B", "C")], replicas=replicas, semilla=3,
+                           retrabajos=retrabajos)
+
+
+def test_retrabajo_con_varios_destinos_respeta_cada_probabilidad():
+    red = _red([("C", "A", 0.5), ("C", "B", 0.5)])
+    red.simular_turno()
+    procesado = red.procesado[:, 2].sum()
+    # Todo lo procesado en C vuelve: la mitad a A y la mitad a B
+    assert red.producto_terminado.sum() == 0
+    assert red.cola_retrabajo[:, 0].sum() / procesado == pytest.approx(0.5, abs=0.01)
+    assert red.cola_retrabajo[:, 1].sum() / procesado == pytest.approx(0.5, abs=0.01)
+
+
+def test_retrabajo_parcial_deja_continuar_el_resto():
+    red = _red([("C", "A", 0.2), ("C", "B", 0.3)])
+    red.simular_turno()
+    procesado = red.procesado[:, 2].sum()
+    assert red.cola_retrabajo[:, 0].sum() / procesado == pytest.approx(0.2, abs=0.01)
+    assert red.cola_retrabajo[:, 1].sum() / procesado == pytest.approx(0.3, abs=0.01)
+    assert red.producto_terminado.sum() + red.cola_retrabajo.sum() == procesado
+
+
+def test_probabilidades_de_retrabajo_que_suman_mas_de_uno():
+    with pytest.raises(ValueError, match="C suman más de 1"):
+        _red([("C", "A", 0.6), ("C", "B", 0.5)])
+    # Redondeo de probabilidades que suman exactamente 1
+    red = _red([("C", "A", 0.1)] * 10, replicas=10)
+    red.simular_jornada(5)
+    assert np.all(red.producto_terminado == 0)
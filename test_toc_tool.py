@@ -0,0 +1,24 @@
+import os
+import shutil
+
+import toc_tool
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_lote_con_salidas_en_conflicto(tmp_path, monkeypatch):
+    entrada = tmp_path / "plantas"
+    entrada.mkdir()
+    shutil.copy(os.path.join(AQUI, "textiles.yml"), entrada / "a.yml")
+    shutil.copy(os.path.join(AQUI, "textiles.yml"), entrada / "b.yml")  # Misma empresa y fecha
+    shutil.copy(os.path.join(AQUI, "servicios.yml"), entrada / "c.yml")
+    monkeypatch.chdir(tmp_path)
+
+    resultados = toc_tool.run_batch(str(entrada), processes=2, use_cache=False, graph=False)
+    estado = {os.path.basename(r["file"]): r for r in resultados}
+    assert estado["c.yml"]["status"] == "ok"
+    ok = [n for n in ("a.yml", "b.yml") if estado[n]["status"] == "ok"]
+    conflicto = [n for n in ("a.yml", "b.yml") if estado[n]["status"] == "error"]
+    assert len(ok) == 1 and len(conflicto) == 1
+    assert "Salidas en conflicto" in estado[conflicto[0]]["error"]
+    assert ok[0] in estado[conflicto[0]]["error"]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from toc_estadistica import EstadisticoEnLinea, z_confianza
+from toc_lote import LineaDeProduccionLote
+
+# ----------------------------------------------------------------------
+## BARRIDO DE ESCENARIOS DEL JUEGO DE DADOS EN PARALELO
+# ----------------------------------------------------------------------
+
+COLUMNAS_ESCENARIO = ['escenario', 'estaciones', 'caras_dados', 'cuello_caras', 'turnos']
+METRICAS = ('throughput', 'wip')
+COLUMNAS_BLOQUE = (COLUMNAS_ESCENARIO[:1] + ['bloque_semilla'] + COLUMNAS_ESCENARIO[1:] + ['replicas']
+                   + [f'{m}_{c}' for m in METRICAS for c in ('media', 'desv', 'ic_inf', 'ic_sup')] + ['segundos'])
+COLUMNAS_RESUMEN = (COLUMNAS_ESCENARIO + ['bloques_semilla', 'replicas']
+                    + [f'{m}_{c}' for m in METRICAS for c in ('media', 'desv', 'ic_inf', 'ic_sup')] + ['segundos'])
+
+def generar_escenarios(estaciones=(5,), caras=(6,), caras_cuello=(None,), turnos=(20,), lineas=()):
+    """
+    Construye la rejilla de escenarios a simular.
+
+    Cada combinación de longitud de línea, caras del dado y turnos genera una
+    línea uniforme; si `caras_cuello` no es None, la estación central usa ese
+    dado (cuello de botella). `lineas` agrega configuraciones explícitas.
+
+    Returns:
+        list[dict]: Escenarios con 'escenario', 'caras_dados' y 'turnos'.
+    """
+    escenarios = []
+    for n, c, cuello, t in itertools.product(estaciones, caras, caras_cuello, turnos):
+        caras_dados = [c] * n
+        if cuello is not None:
+            caras_dados[n // 2] = cuello
+        escenarios.append({'caras_dados': caras_dados, 'turnos': t})
+    for caras_dados, t in itertools.product(lineas, turnos):
+        escenarios.append({'caras_dados': list(caras_dados), 'turnos': t})
+
+    for i, esc in enumerate(escenarios):
+        esc['escenario'] = i
+    return escenarios
+
+
+def _intervalo(valores, z):
+    """Media, desviación estándar y semiancho del intervalo de confianza."""
+    media = float(valores.mean())
+    desv = float(valores.std(ddof=1)) if len(valores) > 1 else 0.0
+    return media, desv, z * desv / np.sqrt(len(valores))
+
+
+def _simular_tarea(tarea):
+    """Ejecuta una tarea (escenario, bloque de semilla) en un proceso trabajador."""
+    escenario, bloque, semilla, replicas, confianza = tarea
+    inicio = time.perf_counter()
+    lote = LineaDeProduccionLote(escenario['caras_dados'], replicas=replicas, semilla=semilla)
+    lote.simular_jornada(escenario['turnos'])
+    res = lote.resultados()
+
+    z = z_confianza(confianza)
+    throughput = res['producto_terminado'] / escenario['turnos']
+    tp_media, tp_desv, tp_semi = _intervalo(throughput, z)
+    wip_media, wip_desv, wip_semi = _intervalo(res['wip_total'], z)
+
+    return {
+        'escenario': escenario['escenario'],
+        'bloque_semilla': bloque,
+        'estaciones': len(escenario['caras_dados']),
+        'caras_dados': "-".join(str(c) for c in escenario['caras_dados']),
+        'cuello_caras': min(escenario['caras_dados']),
+        'turnos': escenario['turnos'],
+        'replicas': replicas,
+        'throughput_media': tp_media,
+        'throughput_desv': tp_desv,
+        'throughput_ic_inf': tp_media - tp_semi,
+        'throughput_ic_sup': tp_media + tp_semi,
+        'wip_media': wip_media,
+        'wip_desv': wip_desv,
+        'wip_ic_inf': wip_media - wip_semi,
+        'wip_ic_sup': wip_media + wip_semi,
+        'segundos': time.perf_counter() - inicio,
+    }
+
+
+def barrido(escenarios, replicas=1000, bloques_semilla=1, semilla=None, procesos=None, confianza=0.95):
+    """
+    Simula todos los escenarios repartiéndolos en un pool de procesos.
+
+    Cada par (escenario, bloque de semilla) es una tarea independiente con su
+    propio flujo aleatorio, derivado con `SeedSequence.spawn` de la semilla
+    maestra, de modo que los resultados no dependen del número de procesos.
+
+    Args:
+        escenarios (list[dict]): Salida de `generar_escenarios`.
+        replicas (int, optional): Réplicas por tarea. Por defecto 1000.
+        bloques_semilla (int, optional): Semillas independientes por escenario.
+        semilla (int, optional): Semilla maestra del barrido.
+        procesos (int, optional): Procesos trabajadores. Por defecto, todos los núcleos.
+        confianza (float, optional): Nivel de los intervalos de confianza. Por defecto 0.95.
+
+    Returns:
+        pd.DataFrame: Tabla ordenada, una fila por escenario y bloque de semilla
+        (los intervalos son los de cada bloque; `resumir_barrido` los une).
+    """
+    z_confianza(confianza)  # Valida el nivel antes de lanzar los procesos
+    if not escenarios:
+        return pd.DataFrame(columns=COLUMNAS_BLOQUE)
+    pares = list(itertools.product(escenarios, range(bloques_semilla)))
+    semillas = np.random.SeedSequence(semilla).spawn(len(pares))
+    tareas = [(esc, bloque, s, replicas, confianza) for (esc, bloque), s in zip(pares, semillas)]
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        filas = [_simular_tarea(t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            filas = list(pool.map(_simular_tarea, tareas, chunksize=max(1, len(tareas) // (procesos * 4))))
+
+    return pd.DataFrame(filas, columns=COLUMNAS_BLOQUE).sort_values(['escenario', 'bloque_semilla']).reset_index(drop=True)
+
+
+def resumir_barrido(df, confianza=0.95):
+    """
+    Une los bloques de semilla de cada escenario en una sola estimación.
+
+    Las réplicas de todos los bloques son independientes, así que los
+    momentos de cada bloque (réplicas, media y desviación) se combinan con la
+    fórmula de Chan y el intervalo de confianza usa todas las réplicas del
+    escenario.
+
+    Args:
+        df (pd.DataFrame): Tabla de `barrido`.
+        confianza (float, optional): Nivel de los intervalos. Por defecto 0.95.
+
+    Returns:
+        pd.DataFrame: Una fila por escenario.
+    """
+    filas = []
+    for _, bloques in df.groupby('escenario', sort=True):
+        fila = bloques.iloc[0][COLUMNAS_ESCENARIO].to_dict()
+        fila['bloques_semilla'] = len(bloques)
+        fila['replicas'] = int(bloques['replicas'].sum())
+        for metrica in METRICAS:
+            total = EstadisticoEnLinea()
+            for n, media, desv in zip(bloques['replicas'], bloques[f'{metrica}_media'], bloques[f'{metrica}_desv']):
+                total.combinar(EstadisticoEnLinea.desde_momentos(int(n), float(media), float(desv)))
+            semi = total.semiancho(confianza) if total.n > 1 else 0.0
+            fila[f'{metrica}_media'] = total.media
+            fila[f'{metrica}_desv'] = total.desv
+            fila[f'{metrica}_ic_inf'] = total.media - semi
+            fila[f'{metrica}_ic_sup'] = total.media + semi
+        fila['segundos'] = float(bloques['segundos'].sum())
+        filas.append(fila)
+    return pd.DataFrame(filas, columns=COLUMNAS_RESUMEN)
+
+
+def guardar_tabla(df, ruta):
+    """Guarda la tabla en CSV o Parquet según la extensión del archivo."""
+    if ruta.endswith('.parquet'):
+        df.to_parquet(ruta, index=False)
+    else:
+        df.to_csv(ruta, index=False, float_format='%.4f')
+
+
+# ----------------------------------------------------------------------
+## EJECUCIÓN DEL PROGRAMA
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido de escenarios del juego de dados en paralelo.")
+    parser.add_argument("--estaciones", type=int, nargs="+", default=[5], help="Longitudes de línea.")
+    parser.add_argument("--caras", type=int, nargs="+", default=[6], help="Caras del dado de cada estación.")
+    parser.add_argument("--cuello", type=int, nargs="*", default=[],
+                        help="Caras del dado de la estación central (cuello de botella).")
+    parser.add_argument("--linea", nargs="*", default=[],
+                        help="Líneas explícitas, por ejemplo 8,8,4,8,8.")
+    parser.add_argument("--turnos", type=int, nargs="+", default=[20], help="Turnos por jornada.")
+    parser.add_argument("--replicas", type=int, default=1000, help="Réplicas por escenario y semilla.")
+    parser.add_argument("--semillas", type=int, default=1, help="Bloques de semilla por escenario.")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla maestra.")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores.")
+    parser.add_argument("--confianza", type=float, default=0.95, help="Nivel de confianza.")
+    parser.add_argument("--salida", default="barrido_dados.csv",
+                        help="Tabla por escenario y bloque de semilla (.csv o .parquet).")
+    parser.add_argument("--resumen", default=None,
+                        help="Tabla por escenario con los bloques unidos (por defecto <salida>_resumen).")
+    args = parser.parse_args()
+
+    escenarios = generar_escenarios(
+        estaciones=args.estaciones, caras=args.caras,
+        caras_cuello=args.cuello or [None], turnos=args.turnos,
+        lineas=[[int(c) for c in linea.split(",")] for linea in args.linea])
+
+    print(f">>> Barrido de {len(escenarios)} escenarios x {args.semillas} semillas x {args.replicas} réplicas")
+    inicio = time.perf_counter()
+    df = barrido(escenarios, replicas=args.replicas, bloques_semilla=args.semillas,
+                 semilla=args.semilla, procesos=args.procesos, confianza=args.confianza)
+    guardar_tabla(df, args.salida)
+    base, extension = os.path.splitext(args.salida)
+    ruta_resumen = args.resumen or f"{base}_resumen{extension}"
+    guardar_tabla(resumir_barrido(df, confianza=args.confianza), ruta_resumen)
+    print(f"Tabla guardada en: {args.salida}, resumen por escenario en: {ruta_resumen} "
+          f"({time.perf_counter() - inicio:.2f} s)")
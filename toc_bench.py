@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# ----------------------------------------------------------------------
+## FUNCIÓN HELPER: CATÁLOGO SINTÉTICO
+# ----------------------------------------------------------------------
+
+def generar_planta(n_productos, n_recursos=50, recursos_por_producto=3, factor_carga=1.5, semilla=0):
+    """
+    Genera un diccionario `datos` con el mismo esquema que los archivos YAML
+    (generales, recursos, productos, gastos_operacion).
+
+    Las capacidades se ajustan para que la carga de cada recurso quede entre
+    `factor_carga` y el doble de ese valor (mayor que 1: hay restricción;
+    menor que 0.5: ningún recurso está sobrecargado).
+    """
+    rnd = random.Random(semilla)
+    productos = {}
+    for p in range(n_productos):
+        usados = rnd.sample(range(n_recursos), min(recursos_por_producto, n_recursos))
+        costo = rnd.randint(5, 50)
+        productos[f"producto_{p}"] = {
+            "costo_ventas": costo,
+            "recursos": {f"recurso_{r}": rnd.randint(1, 20) for r in usados},
+            "precio": costo + rnd.randint(1, 100),
+            "demanda": rnd.randint(1, 200),
+        }
+
+    consumo = [0] * n_recursos
+    for prod in productos.values():
+        for res_name, tiempo in prod["recursos"].items():
+            consumo[int(res_name.split("_")[1])] += tiempo * prod["demanda"]
+    recursos = {f"recurso_{r}": max(1, int(c / (factor_carga * rnd.uniform(1.0, 2.0))))
+                for r, c in enumerate(consumo)}
+
+    return {
+        "generales": {"empresa": "planta_sintetica", "fecha": f"semilla{semilla}"},
+        "recursos": recursos,
+        "productos": productos,
+        "gastos_operacion": {"sueldos": 10 * n_productos},
+    }
+
+
+def escribir_planta_yaml(datos, ruta):
+    """Guarda una planta sintética como YAML (con el emisor en C de PyYAML si está disponible)."""
+    import yaml
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with open(ruta, "w", encoding="utf-8") as f:
+        yaml.dump(datos, f, Dumper=dumper, allow_unicode=True, sort_keys=False)
+
+# ----------------------------------------------------------------------
+## BENCHMARK: ASIGNACIÓN DE LA MEZCLA (run_toc_analysis)
+# ----------------------------------------------------------------------
+
+def bench_analisis(tamanos=(1_000, 10_000, 50_000), n_recursos=300, recursos_por_producto=5,
+                   factor_carga=1.5, modo="greedy", repeticiones=3):
+    """Mide el mejor tiempo de `run_toc_analysis` para varios tamaños de catálogo."""
+    import toc_optimize
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, txt_path = os.path.join(tmp, "r.csv"), os.path.join(tmp, "r.txt")
+        for n in tamanos:
+            datos = generar_planta(n, n_recursos, recursos_por_producto, factor_carga)
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                toc_optimize.run_toc_analysis(datos, csv_path, txt_path, mode=modo)
+                tiempos.append(time.perf_counter() - inicio)
+            resultados.append((n, min(tiempos)))
+            print(f"  {n:>8} productos x {n_recursos} recursos: {min(tiempos):.3f} s")
+    return resultados
+
+
+# ----------------------------------------------------------------------
+## BENCHMARK: TIEMPO DE ARRANQUE DE toc_tool (python -X importtime)
+# ----------------------------------------------------------------------
+
+# Librerías que solo deben cargarse en la etapa que las usa
+LIBRERIAS_PESADAS = ("numpy", "pandas", "scipy", "networkx", "matplotlib")
+
+
+def bench_arranque(argumentos=("--help",), max_ms=None):
+    """
+    Ejecuta `python -X importtime toc_tool.py <argumentos>` y resume el costo
+    de las importaciones.
+
+    Returns:
+        dict: 'total_ms' (suma de los tiempos acumulados de los módulos de
+        primer nivel), 'pesadas' (librerías pesadas importadas) y 'ok'
+        (False si se importó alguna pesada o se superó `max_ms`).
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "toc_tool.py")
+    proceso = subprocess.run([sys.executable, "-X", "importtime", script, *argumentos],
+                             capture_output=True, text=True)
+
+    total_us = 0
+    modulos = set()
+    for linea in proceso.stderr.splitlines():
+        # Formato: "import time: self [us] | cumulative | imported package"
+        if not linea.startswith("import time:") or "imported package" in linea:
+            continue
+        _, acumulado, paquete = linea[len("import time:"):].split("|")
+        modulos.add(paquete.strip())
+        if not paquete.startswith("  "):  # Módulo de primer nivel (sin sangría)
+            total_us += int(acumulado)
+
+    pesadas = sorted(m for m in modulos if m.split(".")[0] in LIBRERIAS_PESADAS and "." not in m)
+    total_ms = total_us / 1000
+    ok = not pesadas and (max_ms is None or total_ms <= max_ms)
+    return {"total_ms": total_ms, "pesadas": pesadas, "ok": ok}
+
+
+# ----------------------------------------------------------------------
+## SUITE: TIEMPO Y MEMORIA POR ETAPA, RESULTADOS EN JSON Y REGRESIONES
+# ----------------------------------------------------------------------
+
+# Etapas de la suite. Las de catálogo se miden por tamaño; las de simulación
+# del juego de dados, una vez por corrida (con `turnos`).
+ETAPAS = ("carga", "analisis", "grafica", "html", "simulacion", "simulacion_lote")
+FORMATO_RESULTADOS = 1
+
+
+def medir(funcion, repeticiones=3, memoria=True):
+    """
+    Mide una etapa.
+
+    Returns:
+        dict: 'segundos' (mejor tiempo de `repeticiones` llamadas) y 'pico_mb'
+        (pico de memoria de una llamada adicional con tracemalloc, que
+        también ve los arreglos de NumPy; None si memoria=False). La
+        llamada con tracemalloc no cuenta para el tiempo.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    pico_mb = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return {"segundos": min(tiempos), "pico_mb": pico_mb}
+
+
+def bench_suite(tamanos=(1_000, 10_000), n_recursos=300, recursos_por_producto=5, factor_carga=1.5,
+                semilla=0, repeticiones=3, turnos=1_000, etapas=ETAPAS, memoria=True):
+    """
+    Mide cada etapa del flujo TOC por separado sobre plantas sintéticas.
+
+    Args:
+        tamanos: Número de productos de cada planta.
+        n_recursos, recursos_por_producto, factor_carga, semilla: Parámetros de
+            `generar_planta` (la densidad de la matriz es recursos_por_producto / n_recursos).
+        repeticiones: Corridas por etapa (se guarda la más rápida).
+        turnos: Turnos de las etapas de simulación del juego de dados.
+        etapas: Subconjunto de `ETAPAS` a medir.
+        memoria: Si es False no se mide el pico de memoria.
+
+    Returns:
+        dict: Parámetros, entorno y una fila por etapa y tamaño
+        ('etapa', 'productos', 'segundos', 'pico_mb').
+    """
+    desconocidas = set(etapas) - set(ETAPAS)
+    if desconocidas:
+        raise ValueError(f"Etapas desconocidas: {', '.join(sorted(desconocidas))}. Opciones: {', '.join(ETAPAS)}")
+
+    filas = []
+
+    def registrar(etapa, productos, funcion):
+        medida = medir(funcion, repeticiones, memoria)
+        filas.append({"etapa": etapa, "productos": productos, **medida})
+        memoria_txt = f", pico {medida['pico_mb']:.1f} MB" if medida["pico_mb"] is not None else ""
+        print(f"  {etapa:<16} {productos if productos is not None else '-':>8}  {medida['segundos']:.3f} s{memoria_txt}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if set(etapas) & {"carga", "analisis", "grafica", "html"}:
+            import toc_optimize
+            from toc_read import TocCatalog, load_catalog_from_file
+        for n in tamanos:
+            datos = generar_planta(n, n_recursos, recursos_por_producto, factor_carga, semilla)
+            if "carga" in etapas:
+                ruta_yaml = os.path.join(tmp, f"planta_{n}.yml")
+                escribir_planta_yaml(datos, ruta_yaml)
+                registrar("carga", n, lambda: load_catalog_from_file(ruta_yaml))
+            if not set(etapas) & {"analisis", "grafica", "html"}:
+                continue
+            catalogo = TocCatalog.from_datos(datos)
+            if "analisis" in etapas:
+                csv_path, txt_path = os.path.join(tmp, "r.csv"), os.path.join(tmp, "r.txt")
+                registrar("analisis", n, lambda: toc_optimize.run_toc_analysis(catalogo, csv_path, txt_path))
+            # La gráfica y el tablero reciben el modelo ya resuelto, como en toc_tool
+            modelo = toc_optimize.TocModel(catalogo)
+            modelo.solve()
+            if "grafica" in etapas:
+                import matplotlib
+                matplotlib.use("Agg")
+                import toc_graf
+                registrar("grafica", n, lambda: toc_graf.run_toc_graph(modelo, os.path.join(tmp, "g.png")))
+            if "html" in etapas:
+                import toc_html
+                registrar("html", n, lambda: toc_html.write_dashboard(modelo, os.path.join(tmp, "t.html")))
+
+    if "simulacion" in etapas:
+        from toc_dados import Jugador, LineaDeProduccion
+
+        def simular():
+            random.seed(semilla)
+            jugadores = [Jugador(f"Operario {c}", caras) for c, caras in zip("ABCDE", (8, 8, 4, 8, 8))]
+            LineaDeProduccion(jugadores, destino_logs=lambda mensaje: None).simular_jornada(turnos)
+        registrar("simulacion", None, simular)
+    if "simulacion_lote" in etapas:
+        from toc_lote import LineaDeProduccionLote
+        registrar("simulacion_lote", None,
+                  lambda: LineaDeProduccionLote([8, 8, 4, 8, 8], replicas=1_000, semilla=semilla).simular_jornada(turnos))
+
+    return {
+        "formato": FORMATO_RESULTADOS,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {"tamanos": list(tamanos), "n_recursos": n_recursos,
+                       "recursos_por_producto": recursos_por_producto, "factor_carga": factor_carga,
+                       "semilla": semilla, "repeticiones": repeticiones, "turnos": turnos},
+        "resultados": filas,
+    }
+
+
+def guardar_resultados(suite, ruta):
+    """Guarda el resultado de `bench_suite` como JSON."""
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(suite, f, ensure_ascii=False, indent=2)
+
+
+def comparar_resultados(actual, referencia, umbral=0.25, min_segundos=0.01):
+    """
+    Compara dos resultados de `bench_suite` etapa por etapa y tamaño.
+
+    Args:
+        actual, referencia: Diccionarios de `bench_suite` (o leídos del JSON).
+        umbral: Aumento relativo de tiempo tolerado (0.25 = 25 % más lento).
+        min_segundos: Diferencia absoluta mínima para contar como regresión
+            (evita falsas alarmas por ruido en etapas de milisegundos).
+
+    Returns:
+        list[dict]: Regresiones ('etapa', 'productos', 'referencia', 'actual', 'razon').
+    """
+    base = {(r["etapa"], r["productos"]): r["segundos"] for r in referencia["resultados"]}
+    regresiones = []
+    for fila in actual["resultados"]:
+        previo = base.get((fila["etapa"], fila["productos"]))
+        if previo is None:
+            continue
+        if fila["segundos"] > previo * (1 + umbral) and fila["segundos"] - previo > min_segundos:
+            regresiones.append({"etapa": fila["etapa"], "productos": fila["productos"], "referencia": previo,
+                                "actual": fila["segundos"], "razon": fila["segundos"] / previo})
+    return regresiones
+
+
+def _main_suite(args):
+    print(f">>> Suite: {len(args.tamanos)} tamaños x {args.recursos} recursos, semilla {args.semilla}")
+    suite = bench_suite(args.tamanos, args.recursos, args.densidad, args.carga, args.semilla,
+                        args.repeticiones, args.turnos, args.etapas, memoria=not args.sin_memoria)
+    if args.salida:
+        guardar_resultados(suite, args.salida)
+        print(f"Resultados guardados en: {args.salida}")
+    if not args.comparar:
+        return True
+    with open(args.comparar, encoding="utf-8") as f:
+        referencia = json.load(f)
+    regresiones = comparar_resultados(suite, referencia, args.umbral)
+    for r in regresiones:
+        print(f"❌ {r['etapa']} ({r['productos'] or '-'}): {r['referencia']:.3f} s -> {r['actual']:.3f} s "
+              f"(x{r['razon']:.2f})")
+    if not regresiones:
+        print(f"✅ Sin regresiones mayores a {args.umbral:.0%} respecto a {args.comparar}")
+    return not regresiones
+
+
+def comparar_escalamiento(con_restriccion, sin_restriccion, umbral=0.5):
+    """
+    Compara cómo crece el tiempo del caso sin restricción frente al caso con
+    restricción. La razón sin/con de cada tamaño se normaliza por la del tamaño
+    más pequeño, de modo que solo cuenta el escalamiento y no la constante.
+
+    Args:
+        con_restriccion, sin_restriccion: Listas (productos, segundos) de `bench_analisis`.
+        umbral: Deterioro tolerado de la razón normalizada (0.5 = 50 %).
+
+    Returns:
+        list[dict]: Tamaños cuya razón normalizada supera 1 + `umbral`.
+    """
+    razones = [(n, t_sin / t_con) for (n, t_con), (_, t_sin) in zip(con_restriccion, sin_restriccion)]
+    if not razones:
+        return []
+    base = razones[0][1]
+    return [{"productos": n, "razon": razon, "escalamiento": razon / base}
+            for n, razon in razones[1:] if razon / base > 1 + umbral]
+
+
+def _main_analisis(tamanos, umbral):
+    tamanos = tamanos or [1_000, 10_000, 50_000]
+    print(">>> run_toc_analysis (greedy), catálogo con restricción")
+    con_restriccion = bench_analisis(tamanos)
+    # Regresión: el caso sin restricción debe escalar igual que el caso con restricción
+    print(">>> run_toc_analysis (greedy), catálogo sin restricción")
+    sin_restriccion = bench_analisis(tamanos, factor_carga=0.4)
+    print(">>> Razón de tiempos sin/con restricción por tamaño:")
+    for (n, t_con), (_, t_sin) in zip(con_restriccion, sin_restriccion):
+        print(f"  {n:>8} productos: {t_sin / t_con:.2f}")
+    regresiones = comparar_escalamiento(con_restriccion, sin_restriccion, umbral)
+    for r in regresiones:
+        print(f"❌ {r['productos']} productos: el caso sin restricción escala x{r['escalamiento']:.2f} "
+              f"peor que con restricción")
+    if not regresiones:
+        print(f"✅ El caso sin restricción escala como el caso con restricción (umbral {umbral:.0%})")
+    return not regresiones
+
+
+def _main_arranque(max_ms):
+    resultado = bench_arranque(("--help",), max_ms=max_ms)
+    print(f">>> toc_tool.py --help: importaciones {resultado['total_ms']:.1f} ms")
+    if resultado["pesadas"]:
+        print(f"❌ Se importaron librerías pesadas al arrancar: {', '.join(resultado['pesadas'])}")
+    elif not resultado["ok"]:
+        print(f"❌ El arranque supera el límite de {max_ms:.1f} ms")
+    else:
+        print("✅ Arranque sin librerías pesadas")
+    return resultado["ok"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de la herramienta TOC.")
+    sub = parser.add_subparsers(dest="comando")
+    p_analisis = sub.add_parser("analisis", help="Tiempo de run_toc_analysis por tamaño de catálogo.")
+    p_analisis.add_argument("tamanos", type=int, nargs="*")
+    p_analisis.add_argument("--umbral", type=float, default=0.5,
+                            help="Deterioro tolerado del escalamiento sin/con restricción (0.5 = 50 %%).")
+    p_arranque = sub.add_parser("arranque", help="Importaciones al arrancar toc_tool (python -X importtime).")
+    p_arranque.add_argument("--max-ms", type=float, default=None, help="Falla si el arranque supera este tiempo.")
+    p_suite = sub.add_parser("suite", help="Tiempo y memoria de cada etapa; JSON y comparación contra una referencia.")
+    p_suite.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 10_000], help="Productos por planta.")
+    p_suite.add_argument("--recursos", type=int, default=300, help="Recursos por planta.")
+    p_suite.add_argument("--densidad", type=int, default=5, help="Recursos que usa cada producto.")
+    p_suite.add_argument("--carga", type=float, default=1.5, help="Factor de carga mínimo de los recursos.")
+    p_suite.add_argument("--semilla", type=int, default=0)
+    p_suite.add_argument("--repeticiones", type=int, default=3)
+    p_suite.add_argument("--turnos", type=int, default=1_000, help="Turnos de las etapas de simulación.")
+    p_suite.add_argument("--etapas", nargs="+", choices=ETAPAS, default=list(ETAPAS))
+    p_suite.add_argument("--sin-memoria", action="store_true", help="No mide el pico de memoria (tracemalloc).")
+    p_suite.add_argument("--salida", help="Archivo JSON donde guardar los resultados.")
+    p_suite.add_argument("--comparar", metavar="JSON", help="Resultados de referencia; falla si hay regresiones.")
+    p_suite.add_argument("--umbral", type=float, default=0.25, help="Aumento de tiempo tolerado (0.25 = 25 %%).")
+    args = parser.parse_args()
+
+    if args.comando == "suite":
+        sys.exit(0 if _main_suite(args) else 1)
+    if args.comando == "arranque":
+        sys.exit(0 if _main_arranque(args.max_ms) else 1)
+    sys.exit(0 if _main_analisis(getattr(args, "tamanos", None), getattr(args, "umbral", 0.5)) else 1)
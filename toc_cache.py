@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# ----------------------------------------------------------------------
+## CACHÉ DE RESULTADOS POR CONTENIDO
+# ----------------------------------------------------------------------
+# Cada entrada es un directorio <cache_dir>/<hash>/ con los archivos de
+# salida (CSV, TXT, PNG) y un meta.json con el resumen del análisis.
+# El hash se calcula sobre el diccionario `datos` normalizado, la versión
+# de la herramienta y las opciones que cambian el contenido de las salidas.
+# Las posiciones de los diagramas (toc_graf) se guardan aparte, en
+# <cache_dir>/layouts/<hash de la topología>.json.
+
+DEFAULT_CACHE_DIR = os.environ.get("TOC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "toc_tool"))
+DEFAULT_MAX_MB = 500
+DEFAULT_MAX_AGE_DAYS = 30
+META_FILE = "meta.json"
+LAYOUT_DIR = "layouts"
+
+
+def cache_key(datos, version, **options):
+    """
+    Hash SHA-256 del contenido normalizado de `datos` (claves ordenadas) más
+    la versión de la herramienta y las opciones de la corrida.
+    """
+    payload = json.dumps({"datos": datos, "version": version, "options": options},
+                         sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(key, outputs, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Busca una entrada y, si existe, copia sus archivos a las rutas de `outputs`
+    (dict nombre_en_cache -> ruta_destino).
+
+    Returns:
+        dict | None: El resumen guardado en meta.json, o None si no hay entrada.
+    """
+    entry = os.path.join(cache_dir, key)
+    meta_path = os.path.join(entry, META_FILE)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        for name, destination in outputs.items():
+            if name in meta["files"]:
+                shutil.copyfile(os.path.join(entry, name), destination)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # La fecha de modificación de meta.json marca el último uso (política LRU)
+    os.utime(meta_path)
+    return meta["summary"]
+
+
+def store(key, outputs, summary, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Guarda los archivos de `outputs` (dict nombre_en_cache -> ruta_origen) que
+    existan, junto con el resumen. La entrada se escribe en un directorio
+    temporal y se renombra al final, por lo que los procesos de un lote
+    pueden escribir en la misma caché sin ver entradas a medias.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, key)
+    if os.path.exists(entry):
+        return
+    tmp_entry = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=cache_dir)
+    try:
+        files = []
+        for name, source in outputs.items():
+            if os.path.exists(source):
+                shutil.copyfile(source, os.path.join(tmp_entry, name))
+                files.append(name)
+        with open(os.path.join(tmp_entry, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "files": files, "created": time.time()}, f, ensure_ascii=False)
+        os.rename(tmp_entry, entry)
+    except OSError:
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+
+
+def evict(cache_dir=DEFAULT_CACHE_DIR, max_mb=DEFAULT_MAX_MB, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """
+    Elimina las entradas no usadas en más de `max_age_days` días y, si la
+    caché sigue ocupando más de `max_mb` MB, las menos usadas recientemente.
+
+    Returns:
+        int: Número de entradas eliminadas.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    now = time.time()
+    entries = []
+    removed = 0
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        meta_path = os.path.join(entry, META_FILE)
+        if name == LAYOUT_DIR:
+            removed += _evict_layouts(entry, now - max_age_days * 86400)
+            continue
+        # Los procesos de un lote limpian la misma caché a la vez: otro puede
+        # borrar la entrada mientras se lee, y entonces se omite
+        try:
+            if name.startswith(".") or not os.path.exists(meta_path):
+                # Directorios temporales abandonados por un proceso interrumpido
+                if name.startswith(".") and now - os.path.getmtime(entry) > 3600:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((os.path.getmtime(meta_path), size, entry))
+        except OSError:
+            continue
+
+    entries.sort()  # Menos usadas recientemente primero
+    total = sum(size for _, size, _ in entries)
+    for last_used, size, entry in entries:
+        if now - last_used > max_age_days * 86400 or total > max_mb * 1024 * 1024:
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+    return removed
+
+
+def _evict_layouts(layout_dir, oldest):
+    """Elimina las posiciones guardadas que no se usan desde antes de `oldest`."""
+    removed = 0
+    try:
+        names = os.listdir(layout_dir)
+    except OSError:
+        return 0
+    for name in names:
+        path = os.path.join(layout_dir, name)
+        try:
+            if os.path.getmtime(path) < oldest:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+import json
+import os
+import struct
+import sys
+import zipfile
+
+import numpy as np
+
+from toc_read import TocCatalog, TocDataError, load_catalog_from_file
+
+# ----------------------------------------------------------------------
+## FORMATO COLUMNAR (.npz) PARA CATÁLOGOS GRANDES
+# ----------------------------------------------------------------------
+# Un .npz sin compresión con tres tablas:
+#   - recursos:  resource_names, capacity
+#   - productos: product_names, demand, price, cost
+#   - consumo producto x recurso en formato disperso (CSR): indptr, indices, times
+# más gastos_operacion (expense_names, expense_values), 'generales' como JSON y,
+# si existen, las distribuciones de demanda y disponibilidad ('incertidumbre', JSON)
+# y el horizonte de varios periodos ('horizonte', JSON).
+# Al cargarlo, cada arreglo se mapea en memoria directamente desde el archivo.
+
+FORMAT_VERSION = 1
+REQUIRED_ARRAYS = ("format_version", "generales", "resource_names", "capacity", "product_names", "demand",
+                   "price", "cost", "indptr", "indices", "times", "expense_names", "expense_values")
+
+
+def save_catalog_npz(catalog, npz_path):
+    """Guarda un `TocCatalog` en el formato columnar (sin compresión, para poder mapearlo)."""
+    np.savez(
+        npz_path,
+        format_version=np.array(FORMAT_VERSION),
+        generales=np.array(json.dumps(catalog.generales, ensure_ascii=False, default=str)),
+        resource_names=np.array(catalog.resource_names, dtype=str),
+        capacity=np.asarray(catalog.capacity),
+        capacity_is_int=np.array([type(v) is int for v in catalog.capacity_values]),
+        product_names=np.array(catalog.product_names, dtype=str),
+        demand=np.asarray(catalog.demand),
+        price=np.asarray(catalog.price),
+        cost=np.asarray(catalog.cost),
+        indptr=np.asarray(catalog.indptr, dtype=np.int64),
+        indices=np.asarray(catalog.indices, dtype=np.int64),
+        times=np.asarray(catalog.times),
+        expense_names=np.array([str(k) for k in catalog.operating_expenses], dtype=str),
+        expense_values=np.array(list(catalog.operating_expenses.values())),
+        incertidumbre=np.array(json.dumps({
+            "demanda_dist": {str(p): spec for p, spec in catalog.demand_dist.items()},
+            "disponibilidad": {str(r): spec for r, spec in catalog.availability.items()},
+        })),
+        horizonte=np.array(json.dumps(catalog.horizon)),
+    )
+
+
+def _mmap_member(npz_path, info):
+    """
+    Mapea en memoria un arreglo .npy guardado sin compresión dentro del zip.
+    Si el miembro está comprimido (o vacío) se lee de forma normal.
+    """
+    with open(npz_path, "rb") as f:
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zipfile.ZipFile(npz_path) as zf, zf.open(info) as member:
+                return np.lib.format.read_array(member)
+        # Cabecera local del zip: 30 bytes + nombre + campo extra
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if int(np.prod(shape)) == 0 or dtype.hasobject:
+        with np.load(npz_path, allow_pickle=False) as data:
+            return data[info.filename[:-len(".npy")]]
+    return np.memmap(npz_path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def load_catalog_npz(npz_path, mmap=True):
+    """
+    Carga un catálogo columnar como `TocCatalog`. Con mmap=True los arreglos
+    (incluidos los nombres de productos) quedan mapeados en memoria, por lo
+    que abrir un catálogo de 50k productos no copia los datos ni construye
+    diccionarios por producto.
+    """
+    if not os.path.exists(npz_path):
+        raise FileNotFoundError(f"Error: El archivo no fue encontrado en la ruta especificada: {npz_path}")
+
+    with zipfile.ZipFile(npz_path) as zf:
+        members = {info.filename[:-len(".npy")]: info for info in zf.infolist()}
+    if mmap:
+        arrays = {name: _mmap_member(npz_path, info) for name, info in members.items()}
+    else:
+        with np.load(npz_path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+    missing = [name for name in REQUIRED_ARRAYS if name not in arrays]
+    if missing:
+        raise TocDataError(f"Al archivo columnar le faltan los arreglos: {', '.join(missing)}.", npz_path)
+    version = int(arrays["format_version"])
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versión de formato columnar no soportada: {version} (se esperaba {FORMAT_VERSION}).")
+    _validate_arrays(arrays, npz_path)
+
+    incertidumbre = json.loads(str(arrays["incertidumbre"][()])) if "incertidumbre" in arrays else {}
+    horizon = json.loads(str(arrays["horizonte"][()])) if "horizonte" in arrays else None
+
+    return TocCatalog(
+        generales=json.loads(str(arrays["generales"][()])),
+        resource_names=arrays["resource_names"].tolist(),
+        capacity=arrays["capacity"],
+        capacity_values=_capacity_values(arrays),
+        product_names=arrays["product_names"],
+        demand=arrays["demand"],
+        price=arrays["price"],
+        cost=arrays["cost"],
+        indptr=arrays["indptr"],
+        indices=arrays["indices"],
+        times=arrays["times"],
+        operating_expenses=dict(zip(arrays["expense_names"].tolist(), arrays["expense_values"].tolist())),
+        demand_dist={int(p): spec for p, spec in incertidumbre.get("demanda_dist", {}).items()},
+        availability={int(r): spec for r, spec in incertidumbre.get("disponibilidad", {}).items()},
+        horizon=_horizon_from_json(horizon),
+    )
+
+
+def _validate_arrays(arrays, npz_path):
+    """
+    Las mismas reglas que la validación del YAML, sobre los arreglos: tamaños
+    coherentes, CSR bien formado, recursos existentes, capacidades positivas
+    y demandas y tiempos no negativos. Cada regla es una operación vectorial.
+    """
+    def error(message):
+        return TocDataError(message, npz_path)
+
+    n_resources, n_products = len(arrays["resource_names"]), len(arrays["product_names"])
+    if n_resources == 0:
+        raise error("El catálogo debe definir al menos un recurso.")
+    if n_products == 0:
+        raise error("El catálogo debe definir al menos un producto.")
+    for name, expected in (("capacity", n_resources), ("capacity_is_int", n_resources), ("demand", n_products),
+                           ("price", n_products), ("cost", n_products), ("indptr", n_products + 1),
+                           ("indices", len(arrays["times"])), ("expense_values", len(arrays["expense_names"]))):
+        if name in arrays and arrays[name].shape != (expected,):
+            raise error(f"'{name}' tiene forma {arrays[name].shape}, se esperaba ({expected},).")
+    for name in ("capacity", "demand", "price", "cost", "times", "expense_values"):
+        if arrays[name].dtype.kind not in "iuf" or not np.isfinite(arrays[name]).all():
+            raise error(f"'{name}' debe contener solo números finitos.")
+    if arrays["indptr"].dtype.kind not in "iu" or arrays["indices"].dtype.kind not in "iu":
+        raise error("'indptr' e 'indices' deben ser enteros.")
+
+    indptr, indices = arrays["indptr"], arrays["indices"]
+    if indptr[0] != 0 or indptr[-1] != len(indices) or (np.diff(indptr) < 0).any():
+        raise error("'indptr' debe empezar en 0, no decrecer y terminar en el número de consumos.")
+    if len(indices) and (indices.min() < 0 or indices.max() >= n_resources):
+        raise error(f"'indices' se refiere a recursos fuera de 0..{n_resources - 1}.")
+    for name, names, strict in (("capacity", arrays["resource_names"], True),
+                                ("demand", arrays["product_names"], False)):
+        invalid = np.flatnonzero(arrays[name] <= 0 if strict else arrays[name] < 0)
+        if len(invalid):
+            rule = "mayor que 0" if strict else "no negativa"
+            raise error(f"'{name}' debe ser {rule}; '{names[invalid[0]]}' tiene {arrays[name][invalid[0]]}.")
+    if (arrays["times"] < 0).any():
+        raise error("Los tiempos de consumo ('times') no pueden ser negativos.")
+
+
+def _capacity_values(arrays):
+    """Capacidades con el tipo declarado en el YAML original (si el archivo lo guarda)."""
+    values = arrays["capacity"].tolist()
+    if "capacity_is_int" not in arrays:
+        return values
+    return [int(v) if is_int else v for v, is_int in zip(values, arrays["capacity_is_int"].tolist())]
+
+
+def _horizon_from_json(horizon):
+    """JSON convierte las claves enteras (índices) en texto; se restauran aquí."""
+    if horizon is None:
+        return None
+    horizon["capacidad"] = {int(r): v for r, v in horizon["capacidad"].items()}
+    horizon["demanda"] = {int(p): v for p, v in horizon["demanda"].items()}
+    if horizon["inventario"] is not None:
+        horizon["inventario"] = {key: ({int(p): v for p, v in value.items()} if isinstance(value, dict) else value)
+                                 for key, value in horizon["inventario"].items()}
+    return horizon
+
+
+def convert_yaml_to_npz(yaml_path, npz_path=None):
+    """Convierte un YAML (generales/recursos/productos/gastos_operacion) al formato columnar."""
+    npz_path = npz_path or os.path.splitext(yaml_path)[0] + ".npz"
+    catalog = load_catalog_from_file(yaml_path)
+    save_catalog_npz(catalog, npz_path)
+    return npz_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: ./toc_columnar.py <archivo_yaml> [archivo_npz]")
+        sys.exit(1)
+
+    output = convert_yaml_to_npz(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    catalog = load_catalog_npz(output)
+    print(f"Catálogo columnar guardado en: {output} ({len(catalog.product_names)} productos, "
+          f"{len(catalog.resource_names)} recursos, {len(catalog.times)} consumos)")
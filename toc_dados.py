@@ -1,8 +1,14 @@
 import random
+from array import array
 import matplotlib
 matplotlib.use('Agg') # Usar backend no interactivo para generar archivos
 import matplotlib.pyplot as plt
 
+from toc_estadistica import EstadisticoEnLinea, HistogramaEnLinea
+
+# Clases del histograma de WIP de la línea (los valores mayores van en la última)
+HISTOGRAMA_WIP_MAXIMO = 200
+
 class Jugador:
     """
     Representa a un jugador en la simulación del juego de dados.
@@ -10,21 +16,65 @@ class Jugador:
     inventario (recipiente) para las piezas procesadas.
     """
 
-    def __init__(self, nombre: str, caras_dado: int = 6):
+    def __init__(self, nombre: str, caras_dado: int = 6, historial_maximo: int | None = None):
         """
         Inicializa un nuevo jugador.
 
         Args:
             nombre (str): El nombre del jugador (estación de trabajo).
             caras_dado (int, optional): Número de caras del dado. Por defecto es 6.
+            historial_maximo (int, optional): Si se indica, solo se conservan los
+                últimos N lanzamientos en un anillo compacto. Por defecto None
+                (historial completo en una lista).
         """
         if caras_dado < 1:
             raise ValueError("El número de caras del dado no puede ser menor que 1.")
         self.nombre = nombre
         self.caras_dado = caras_dado
         self.inventario = 0
+        # Unidades procesadas que esperan completar un lote de transferencia
+        self.en_lote = 0
         self.historial_lanzamientos = []
         self.ultimo_lanzamiento = 0
+        # Agregados que no crecen con el número de turnos
+        self.conteo_lanzamientos = [0] * (caras_dado + 1)
+        self.suma_lanzamientos = 0
+        self.total_lanzamientos = 0
+        self._posicion_anillo = None
+        self._anillo_lleno = False
+        if historial_maximo is not None:
+            self.limitar_historial(historial_maximo)
+
+    def limitar_historial(self, historial_maximo: int):
+        """
+        Cambia el historial a un anillo de tamaño fijo (array('B'), o array('H')
+        si el dado tiene más de 255 caras) con los últimos lanzamientos.
+
+        Args:
+            historial_maximo (int): Número de lanzamientos a conservar.
+        """
+        if historial_maximo < 1:
+            raise ValueError("El historial debe conservar al menos un lanzamiento.")
+        recientes = self.ultimos_lanzamientos()[-historial_maximo:]
+        anillo = array('B' if self.caras_dado <= 255 else 'H', [0]) * historial_maximo
+        anillo[:len(recientes)] = array(anillo.typecode, recientes)
+        self.historial_lanzamientos = anillo
+        self._posicion_anillo = len(recientes) % historial_maximo
+        self._anillo_lleno = len(recientes) == historial_maximo
+
+    def ultimos_lanzamientos(self) -> list[int]:
+        """Lanzamientos conservados en el historial, en orden cronológico."""
+        if self._posicion_anillo is None:
+            return list(self.historial_lanzamientos)
+        p = self._posicion_anillo
+        if self._anillo_lleno:
+            return list(self.historial_lanzamientos[p:]) + list(self.historial_lanzamientos[:p])
+        return list(self.historial_lanzamientos[:p])
+
+    @property
+    def capacidad_promedio(self) -> float:
+        """Promedio de todos los lanzamientos, calculado con los agregados."""
+        return self.suma_lanzamientos / self.total_lanzamientos if self.total_lanzamientos else 0.0
 
     def lanzar_dado(self) -> int:
         """
@@ -35,7 +85,17 @@ class Jugador:
             int: Un número aleatorio entre 1 y el número de caras del dado.
         """
         resultado = random.randint(1, self.caras_dado)
-        self.historial_lanzamientos.append(resultado)
+        if self._posicion_anillo is None:
+            self.historial_lanzamientos.append(resultado)
+        else:
+            self.historial_lanzamientos[self._posicion_anillo] = resultado
+            self._posicion_anillo += 1
+            if self._posicion_anillo == len(self.historial_lanzamientos):
+                self._posicion_anillo = 0
+                self._anillo_lleno = True
+        self.conteo_lanzamientos[resultado] += 1
+        self.suma_lanzamientos += resultado
+        self.total_lanzamientos += 1
         self.ultimo_lanzamiento = resultado
         return resultado
 
@@ -46,41 +106,167 @@ class Jugador:
         return (f"Estación: {self.nombre} (Capacidad: 1-{self.caras_dado}, "
                 f"dado:{self.ultimo_lanzamiento}, Inventario actual: {self.inventario})")
 
+class PoliticaLiberacion:
+    """
+    Regla que decide cuánta materia prima entra a la línea en cada turno y
+    cuánto inventario puede acumular cada estación.
+
+    - "push": la primera estación procesa todo su lanzamiento (materia prima infinita).
+    - "dbr": Drum-Buffer-Rope. Solo se libera material mientras el inventario
+      entre la entrada y el tambor (la estación restricción) sea menor que `limite`.
+    - "conwip": solo se libera material mientras el WIP total de la línea sea menor que `limite`.
+    - "kanban": cada estación deja de producir cuando su inventario llega a su
+      límite (`limite` es un número para todas o una lista por estación; la
+      última estación no tiene límite).
+
+    Con `lote_transferencia` mayor que 1, cada estación entrega a la siguiente
+    solo lotes completos de ese tamaño; el resto espera en la estación.
+    """
+
+    TIPOS = ("push", "dbr", "conwip", "kanban")
+
+    def __init__(self, tipo: str = "push", limite=None, tambor=None, lote_transferencia: int = 1):
+        """
+        Args:
+            tipo (str, optional): "push", "dbr", "conwip" o "kanban". Por defecto "push".
+            limite (int | list[int], optional): Amortiguador del tambor (dbr),
+                WIP máximo (conwip) o límite por estación (kanban).
+            tambor (int | str | Jugador, optional): Estación restricción (solo dbr):
+                su posición en la línea, su nombre o el propio `Jugador`.
+            lote_transferencia (int, optional): Tamaño del lote de transferencia. Por defecto 1.
+        """
+        if tipo not in self.TIPOS:
+            raise ValueError(f"Política desconocida: '{tipo}'. Opciones: {', '.join(self.TIPOS)}")
+        if tipo != "push" and limite is None:
+            raise ValueError(f"La política '{tipo}' requiere un límite de WIP.")
+        if tipo == "dbr" and tambor is None:
+            raise ValueError("La política 'dbr' requiere la estación tambor (restricción).")
+        limites = limite if isinstance(limite, (list, tuple)) else [limite]
+        if tipo != "push" and any(l is not None and l < 0 for l in limites):
+            raise ValueError("El límite de WIP no puede ser negativo.")
+        if lote_transferencia < 1:
+            raise ValueError("El lote de transferencia debe ser al menos 1.")
+        self.tipo = tipo
+        self.limite = limite
+        self.tambor = tambor
+        self.lote_transferencia = int(lote_transferencia)
+
+    def __repr__(self) -> str:
+        return (f"PoliticaLiberacion({self.tipo!r}, limite={self.limite!r}, tambor={self.tambor!r}, "
+                f"lote_transferencia={self.lote_transferencia})")
+
+    def indice_tambor(self, nombres: list[str]) -> int | None:
+        """Posición del tambor en la línea (None si la política no es dbr)."""
+        if self.tipo != "dbr":
+            return None
+        tambor = self.tambor
+        if isinstance(tambor, Jugador):
+            tambor = tambor.nombre
+        if isinstance(tambor, str):
+            if tambor not in nombres:
+                raise ValueError(f"El tambor '{tambor}' no es una estación de la línea.")
+            return nombres.index(tambor)
+        if not 0 <= tambor < len(nombres):
+            raise ValueError(f"El tambor debe ser una posición entre 0 y {len(nombres) - 1}.")
+        return int(tambor)
+
+    def limites_kanban(self, numero_estaciones: int) -> list[float] | None:
+        """Inventario máximo de cada estación (None si la política no es kanban)."""
+        if self.tipo != "kanban":
+            return None
+        limites = list(self.limite) if isinstance(self.limite, (list, tuple)) else [self.limite] * numero_estaciones
+        if len(limites) != numero_estaciones:
+            raise ValueError(f"Se esperaba un límite kanban por estación ({numero_estaciones}), "
+                             f"se recibieron {len(limites)}.")
+        # La última estación entrega a producto terminado: no tiene límite
+        return [float('inf') if l is None else l for l in limites[:-1]] + [float('inf')]
+
+
 class LineaDeProduccion:
     """
     Gestiona la simulación de la línea de producción completa,
     orquestando a los jugadores y el flujo de inventario.
     """
 
-    def __init__(self, jugadores: list[Jugador]):
+    def __init__(self, jugadores: list[Jugador], destino_logs=None, historial_maximo: int | None = None,
+                 politica: PoliticaLiberacion | None = None):
         """
         Inicializa la línea de producción con una lista ordenada de jugadores.
 
         Args:
             jugadores (list[Jugador]): Una lista de objetos Jugador en el orden
                                        en que operan en la línea.
+            destino_logs (str | archivo | callable, optional): Modo de flujo.
+                Cada registro se envía en cuanto se produce a un archivo (ruta
+                u objeto con `write`) o a una función, en lugar de acumularse
+                en `self.logs`. Por defecto None (buffer en memoria).
+            historial_maximo (int, optional): Limita el historial de lanzamientos
+                de cada jugador a los últimos N valores.
+            politica (PoliticaLiberacion, optional): Regla de liberación de
+                material y límites de WIP. Por defecto "push".
         """
         self.estaciones = jugadores
+        self.politica = politica or PoliticaLiberacion()
+        nombres = [e.nombre for e in jugadores]
+        self._tambor = self.politica.indice_tambor(nombres)
+        self._limites = self.politica.limites_kanban(len(jugadores))
         self.producto_terminado = 0
+        # Estadísticas en línea (se actualizan en cada turno, sin historial)
+        self.turnos_simulados = 0
+        self.throughput_turno = EstadisticoEnLinea()
+        self.suma_wip = 0
+        self.histograma_wip = HistogramaEnLinea(HISTOGRAMA_WIP_MAXIMO)
+        self.throughput_bloques = None
         # Usamos un número muy grande para simular un suministro infinito de materia prima
         self.materia_prima = float('inf')
         self.logs = []
+        self._destino_logs = None
+        self._archivo_propio = None
+        if isinstance(destino_logs, str):
+            self._destino_logs = open(destino_logs, 'w', encoding='utf-8')
+            self._archivo_propio = destino_logs
+        elif destino_logs is not None:
+            self._destino_logs = destino_logs
+        if historial_maximo is not None:
+            for estacion in self.estaciones:
+                estacion.limitar_historial(historial_maximo)
 
     def _log(self, mensaje):
-        """Agrega un mensaje al buffer de logs."""
-        self.logs.append(mensaje)
+        """Agrega un mensaje al buffer de logs o lo envía al destino de flujo."""
+        if self._destino_logs is None:
+            self.logs.append(mensaje)
+        elif callable(self._destino_logs):
+            self._destino_logs(mensaje)
+        else:
+            self._destino_logs.write(mensaje + "\n")
 
     def guardar_reporte(self, nombre_archivo: str):
-        """Guarda los logs acumulados en un archivo."""
-        with open(nombre_archivo, 'w', encoding='utf-8') as f:
-            f.write("\n".join(self.logs))
+        """
+        Guarda los logs acumulados en un archivo. En modo de flujo los registros
+        ya fueron escritos; solo se cierra el archivo abierto por la línea. El
+        aviso "Reporte guardado en" se muestra solo si se escribió una ruta.
+        """
+        if self._destino_logs is None:
+            with open(nombre_archivo, 'w', encoding='utf-8') as f:
+                f.write("\n".join(self.logs))
+        elif self._archivo_propio:
+            self._destino_logs.close()
+            self._destino_logs = None
+            nombre_archivo, self._archivo_propio = self._archivo_propio, None
+        else:
+            # Función u objeto con `write` del usuario: no hay ruta que informar
+            if hasattr(self._destino_logs, 'flush'):
+                self._destino_logs.flush()
+            return
         print(f"Reporte guardado en: {nombre_archivo}")
 
     def simular_turno(self):
         """
         Simula un único turno (ej. una hora) para toda la línea de producción.
         """
-        inventario_anterior = self.materia_prima
+        # La política decide cuánta materia prima se libera al inicio del turno
+        inventario_anterior = self._liberacion()
+        lote = self.politica.lote_transferencia
 
         for i, estacion in enumerate(self.estaciones):
             capacidad_turno = estacion.lanzar_dado()
@@ -88,9 +274,19 @@ class LineaDeProduccion:
             # La cantidad que se puede procesar es el mínimo entre la capacidad
             # de la estación y el inventario disponible de la estación anterior.
             unidades_a_procesar = min(capacidad_turno, inventario_anterior)
+            if self._limites is not None:
+                espacio = self._limites[i] - estacion.inventario - estacion.en_lote
+                unidades_a_procesar = min(unidades_a_procesar, max(0, espacio))
 
             # La estación actual procesa las unidades, aumentando su propio inventario.
-            estacion.inventario += unidades_a_procesar
+            # Con lotes de transferencia, solo los lotes completos quedan disponibles.
+            if lote == 1:
+                estacion.inventario += unidades_a_procesar
+            else:
+                estacion.en_lote += unidades_a_procesar
+                transferido = estacion.en_lote // lote * lote
+                estacion.inventario += transferido
+                estacion.en_lote -= transferido
             
             # Las unidades procesadas se descuentan del inventario anterior.
             if i > 0:
@@ -100,9 +296,73 @@ class LineaDeProduccion:
             inventario_anterior = estacion.inventario
 
         # Al final del turno, el inventario de la última estación pasa a ser producto terminado.
-        self.producto_terminado += self.estaciones[-1].inventario
+        terminado_turno = self.estaciones[-1].inventario
+        self.producto_terminado += terminado_turno
         self.estaciones[-1].inventario = 0
 
+        wip = self.wip()
+        self.turnos_simulados += 1
+        self.throughput_turno.agregar(terminado_turno)
+        self.suma_wip += wip
+        self.histograma_wip.agregar(wip)
+
+    def wip(self) -> int:
+        """Inventario en proceso de la línea (incluye lo que espera un lote de transferencia)."""
+        return sum(e.inventario + e.en_lote for e in self.estaciones)
+
+    @property
+    def wip_promedio(self) -> float:
+        """WIP promedio en el tiempo (al final de cada turno)."""
+        return self.suma_wip / self.turnos_simulados if self.turnos_simulados else 0.0
+
+    def simular_hasta_precision(self, epsilon: float, confianza: float = 0.95, turnos_bloque: int = 50,
+                                min_bloques: int = 10, max_turnos: int = 1_000_000) -> int:
+        """
+        Simula hasta que el intervalo de confianza del throughput por turno
+        tenga un semiancho menor que `epsilon` (método de medias por bloques:
+        los turnos consecutivos están correlacionados, los promedios de
+        bloques largos casi no).
+
+        Args:
+            epsilon (float): Semiancho máximo del intervalo (unidades por turno).
+            confianza (float, optional): Nivel de confianza. Por defecto 0.95.
+            turnos_bloque (int, optional): Turnos por bloque. Por defecto 50.
+            min_bloques (int, optional): Bloques mínimos antes de evaluar. Por defecto 10.
+            max_turnos (int, optional): Límite de turnos. Por defecto 1,000,000.
+
+        Returns:
+            int: Turnos simulados en esta llamada.
+        """
+        if epsilon <= 0:
+            raise ValueError("La precisión (epsilon) debe ser mayor que 0.")
+        self.throughput_bloques = EstadisticoEnLinea()
+        turnos = 0
+        while turnos < max_turnos:
+            antes = self.producto_terminado
+            for _ in range(turnos_bloque):
+                self.simular_turno()
+            turnos += turnos_bloque
+            self.throughput_bloques.agregar((self.producto_terminado - antes) / turnos_bloque)
+            if (self.throughput_bloques.n >= min_bloques
+                    and self.throughput_bloques.semiancho(confianza) < epsilon):
+                break
+        self._log(f"Precisión: throughput {self.throughput_bloques.media:.3f} ± "
+                  f"{self.throughput_bloques.semiancho(confianza):.3f} por turno en {turnos} turnos")
+        return turnos
+
+    def _liberacion(self):
+        """Materia prima que la política permite liberar en este turno."""
+        tipo = self.politica.tipo
+        if tipo in ("push", "kanban"):
+            return self.materia_prima
+        if tipo == "dbr":
+            # Inventario entre la entrada y el tambor (lo que espera frente a él incluido)
+            estaciones = self.estaciones[:self._tambor]
+        else:
+            estaciones = self.estaciones
+        wip = sum(e.inventario + e.en_lote for e in estaciones)
+        return max(0, self.politica.limite - wip)
+
     def simular_jornada(self, numero_de_turnos: int):
         """
         Simula una jornada laboral completa ejecutando varios turnos.
@@ -110,27 +370,38 @@ class LineaDeProduccion:
         Args:
             numero_de_turnos (int): El número de turnos que componen la jornada.
         """
-        self._log("=== INICIO DE LA JORNADA LABORAL ===")
+        for mensaje in self.jornada_en_flujo(numero_de_turnos):
+            self._log(mensaje)
+
+    def jornada_en_flujo(self, numero_de_turnos: int):
+        """
+        Generador que simula la jornada y entrega cada registro en cuanto se
+        produce, sin guardarlo en la línea.
+
+        Args:
+            numero_de_turnos (int): El número de turnos que componen la jornada.
+
+        Yields:
+            str: Cada línea del registro de la jornada.
+        """
+        yield "=== INICIO DE LA JORNADA LABORAL ==="
         for turno in range(numero_de_turnos):
             self.simular_turno()
-            self._log(f"--- Fin del Turno {turno + 1} ---")
-            self._log(f"Producto Terminado Acumulado: {self.producto_terminado}")
+            yield f"--- Fin del Turno {turno + 1} ---"
+            yield f"Producto Terminado Acumulado: {self.producto_terminado}"
             for estacion in self.estaciones:
-                self._log(f"  - {estacion}")
-            self._log("-" * 25)
-        self._log("=== FIN DE LA JORNADA LABORAL ===")
+                yield f"  - {estacion}"
+            yield "-" * 25
+        yield "=== FIN DE LA JORNADA LABORAL ==="
 
     def generar_graficas(self, nombre_base: str):
         """Genera las gráficas solicitadas en PDF."""
         # 1. Gráfica de frecuencias (Líneas)
         plt.figure(figsize=(10, 6))
         for estacion in self.estaciones:
-            conteo = {}
-            for val in estacion.historial_lanzamientos:
-                conteo[val] = conteo.get(val, 0) + 1
-            
-            x_vals = sorted(conteo.keys())
-            y_vals = [conteo[k] for k in x_vals]
+            # Se usan los conteos agregados, no el historial (que puede estar acotado)
+            x_vals = [k for k, n in enumerate(estacion.conteo_lanzamientos) if n > 0]
+            y_vals = [estacion.conteo_lanzamientos[k] for k in x_vals]
             plt.plot(x_vals, y_vals, marker='o', label=estacion.nombre)
             
         plt.title(f"Frecuencia de Lanzamientos - {nombre_base}")
@@ -172,11 +443,14 @@ class LineaDeProduccion:
             self._log(f"  - {estacion.nombre}: {estacion.inventario}")
             wip_total += estacion.inventario
         self._log(f"Total WIP: {wip_total}")
+        if self.turnos_simulados:
+            self._log(f"WIP promedio en el tiempo: {self.wip_promedio:.2f}")
+            self._log(f"Throughput por turno: {self.throughput_turno.media:.2f} "
+                      f"(desv. est. {self.throughput_turno.desv:.2f})")
 
         self._log("\nCapacidad teórica vs. Real (lanzamientos de dados):")
         for estacion in self.estaciones:
-            promedio = sum(estacion.historial_lanzamientos) / len(estacion.historial_lanzamientos)
-            self._log(f"  - {estacion.nombre}: Capacidad promedio por turno: {promedio:.2f}")
+            self._log(f"  - {estacion.nombre}: Capacidad promedio por turno: {estacion.capacidad_promedio:.2f}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+
+from toc_optimize import SOLVER_MODES, TocModel
+from toc_read import load_catalog_from_file
+
+# ----------------------------------------------------------------------
+## PROGRAMA DRUM-BUFFER-ROPE (TAMBOR-AMORTIGUADOR-CUERDA)
+# ----------------------------------------------------------------------
+# La mezcla óptima se divide en órdenes (un lote por producto, o lotes de
+# `tamano_lote` unidades). Cada orden recorre sus recursos en el orden en
+# que aparecen en 'recursos' del producto.
+#   - Tambor: la restricción procesa las órdenes en el orden de prioridad
+#     T/C (el mismo de la explotación) una tras otra, empezando en `buffer`.
+#   - Amortiguador: tiempo de protección delante del tambor.
+#   - Cuerda: cada orden se libera `buffer` minutos antes de su inicio
+#     planeado en el tambor.
+# Con esas liberaciones se simula la planta con capacidad finita: cada
+# recurso atiende una operación a la vez, y su cola da prioridad a la orden
+# que el tambor necesita primero. Los eventos (liberaciones y fines de
+# operación) se guardan en un montículo (heapq).
+
+FACTOR_BUFFER = 3.0
+ZONAS_BUFFER = ("verde", "amarillo", "rojo", "tarde")
+
+# Tipos de evento; a igual tiempo se procesan primero los fines (liberan recursos)
+_FIN, _LIBERACION = 0, 1
+
+
+def ordenes_de_produccion(unidades, orden, tamano_lote=None):
+    """
+    Divide la mezcla en órdenes de producción, en el orden de prioridad.
+
+    Args:
+        unidades (np.ndarray): Unidades a producir por producto.
+        orden (np.ndarray): Índices de producto en orden de prioridad.
+        tamano_lote (float, optional): Unidades máximas por orden. Por
+            defecto, una orden por producto.
+
+    Returns:
+        tuple: índice de producto y unidades de cada orden.
+    """
+    unidades = np.asarray(unidades, dtype=float)[orden]
+    productos = np.asarray(orden)[unidades > 0]
+    unidades = unidades[unidades > 0]
+    if not tamano_lote:
+        return productos, unidades
+    if tamano_lote <= 0:
+        raise ValueError("El tamaño de lote debe ser mayor que 0.")
+    lotes = np.ceil(unidades / tamano_lote).astype(np.int64)
+    productos = np.repeat(productos, lotes)
+    # Lotes completos salvo el último de cada producto
+    tamanos = np.full(len(productos), float(tamano_lote))
+    ultimo = np.cumsum(lotes) - 1
+    tamanos[ultimo] = unidades - (lotes - 1) * tamano_lote
+    return productos, tamanos
+
+
+def programar_dbr(datos, unidades=None, modo="greedy", tamano_lote=None, buffer=None,
+                  factor_buffer=FACTOR_BUFFER):
+    """
+    Convierte la mezcla óptima en un programa con tiempos DBR.
+
+    Args:
+        datos (dict | TocCatalog): Datos de la planta.
+        unidades (array, optional): Unidades por producto (por ejemplo,
+            'Produccion_Optima'). Por defecto se resuelve la mezcla con `modo`.
+        modo (str, optional): Modo de solución de la mezcla (greedy, lp o mip).
+        tamano_lote (float, optional): Unidades máximas por orden.
+        buffer (float, optional): Amortiguador delante del tambor, en minutos.
+            Por defecto, `factor_buffer` veces el tiempo promedio de proceso
+            antes del tambor.
+        factor_buffer (float, optional): Ver `buffer`. Por defecto 3.
+
+    Returns:
+        dict: 'tambor' (nombre de la restricción), 'buffer' (minutos),
+        'ordenes' (una fila por orden: liberación, inicio planeado y real en
+        el tambor, zona del amortiguador y fin) y 'gantt' (una fila por
+        operación: recurso, orden, inicio y fin), más 'makespan' y
+        'uso_tambor' (fracción del makespan que el tambor trabaja).
+    """
+    modelo = TocModel(datos, mode=modo)
+    matrix = modelo.matrix
+    resultado = modelo.solve()
+    if unidades is None:
+        unidades = resultado.units
+    tambor = resultado.bottleneck_index
+    productos, cantidades = ordenes_de_produccion(unidades, resultado.order, tamano_lote)
+    n = len(productos)
+
+    # Ruta de cada orden: recursos del producto y duración de cada operación
+    pasos = np.diff(matrix.indptr)[productos]
+    primera_op = np.concatenate([[0], np.cumsum(pasos)])
+    orden_op = np.repeat(np.arange(n), pasos)
+    paso_op = np.arange(primera_op[-1]) - primera_op[orden_op]
+    entradas = matrix.indptr[productos][orden_op] + paso_op
+    recurso_op = matrix.indices[entradas]
+    duracion_op = matrix.times[entradas] * cantidades[orden_op]
+
+    # Paso del tambor en cada orden (-1 si la orden no pasa por el tambor)
+    en_tambor = recurso_op == tambor
+    paso_tambor = np.full(n, -1)
+    paso_tambor[orden_op[en_tambor]] = paso_op[en_tambor]
+    usa_tambor = paso_tambor >= 0
+
+    # Tiempo de proceso antes del tambor (define el amortiguador por defecto)
+    antes = paso_op < paso_tambor[orden_op]
+    previo = np.bincount(orden_op, weights=np.where(antes, duracion_op, 0), minlength=n)
+    if buffer is None:
+        buffer = factor_buffer * float(previo[usa_tambor].mean()) if usa_tambor.any() else 0.0
+    if buffer < 0:
+        raise ValueError("El amortiguador no puede ser negativo.")
+
+    # Operación del tambor de cada orden (solo se lee en las órdenes que usan el tambor)
+    op_tambor = (primera_op[:-1] + paso_tambor)[usa_tambor]
+
+    # Tambor: órdenes en secuencia de prioridad a partir de `buffer`; cuerda: liberación `buffer` antes
+    duracion_tambor = np.zeros(n)
+    duracion_tambor[usa_tambor] = duracion_op[op_tambor]
+    plan_tambor = np.where(usa_tambor, buffer + np.cumsum(duracion_tambor) - duracion_tambor, np.inf)
+    liberacion = np.where(usa_tambor, plan_tambor - buffer, 0.0)
+
+    inicio, fin, llegada_tambor = _simular(recurso_op.tolist(), duracion_op.tolist(), primera_op.tolist(),
+                                           paso_tambor.tolist(), liberacion.tolist(), plan_tambor.tolist(),
+                                           len(matrix.resource_names))
+
+    # Una orden sin operaciones (producto sin recursos) termina al liberarse
+    fin_orden = liberacion.copy()
+    con_pasos = pasos > 0
+    fin_orden[con_pasos] = fin[primera_op[1:][con_pasos] - 1]
+    inicio_tambor = np.full(n, np.nan)
+    inicio_tambor[usa_tambor] = inicio[op_tambor]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        consumo = np.where(usa_tambor, (llegada_tambor - liberacion) / buffer if buffer > 0 else 0.0, np.nan)
+    zona = np.select([consumo <= 1 / 3, consumo <= 2 / 3, consumo <= 1, consumo > 1], ZONAS_BUFFER, default="")
+
+    nombres_producto = np.asarray(matrix.product_names)[productos]
+    nombres_recurso = np.asarray(matrix.resource_names, dtype=object)
+    ordenes = pd.DataFrame({
+        'Orden': np.arange(1, n + 1),
+        'Producto': nombres_producto,
+        'Unidades': cantidades,
+        'Liberacion': liberacion,
+        'Inicio_Tambor_Plan': np.where(usa_tambor, plan_tambor, np.nan),
+        'Llegada_Tambor': np.where(usa_tambor, llegada_tambor, np.nan),
+        'Inicio_Tambor': inicio_tambor,
+        'Zona_Buffer': zona,
+        'Fin': fin_orden,
+    })
+    gantt = pd.DataFrame({
+        'Recurso': nombres_recurso[recurso_op],
+        'Orden': orden_op + 1,
+        'Producto': nombres_producto[orden_op],
+        'Paso': paso_op + 1,
+        'Inicio': inicio,
+        'Fin': fin,
+        'Duracion': duracion_op,
+        'Es_Tambor': en_tambor,
+    }).sort_values(['Recurso', 'Inicio'], kind='stable').reset_index(drop=True)
+
+    makespan = float(fin.max()) if len(fin) else 0.0
+    return {
+        'tambor': matrix.resource_names[tambor],
+        'buffer': float(buffer),
+        'ordenes': ordenes,
+        'gantt': gantt,
+        'makespan': makespan,
+        'uso_tambor': float(duracion_tambor.sum()) / makespan if makespan > 0 else 0.0,
+    }
+
+
+def _simular(recurso_op, duracion_op, primera_op, paso_tambor, liberacion, plan_tambor, n_recursos):
+    """
+    Simulación de capacidad finita con eventos en un montículo.
+
+    Cada recurso procesa una operación a la vez; en su cola las órdenes se
+    atienden por inicio planeado en el tambor (las que no pasan por el
+    tambor, al final) y luego por número de orden.
+
+    Returns:
+        tuple: inicio y fin de cada operación y llegada de cada orden a la cola del tambor.
+    """
+    n = len(liberacion)
+    inicio = [0.0] * len(recurso_op)
+    fin = [0.0] * len(recurso_op)
+    llegada_tambor = [np.nan] * n
+    siguiente = primera_op[:-1]
+    colas = [[] for _ in range(n_recursos)]
+    ocupado = [False] * n_recursos
+
+    # Las órdenes sin operaciones no se liberan: no tienen nada que procesar
+    eventos = [(liberacion[o], _LIBERACION, o) for o in range(n) if primera_op[o + 1] > primera_op[o]]
+    heapq.heapify(eventos)
+
+    def llegar(o, t):
+        op = siguiente[o]
+        r = recurso_op[op]
+        if op - primera_op[o] == paso_tambor[o]:
+            llegada_tambor[o] = t
+        if ocupado[r]:
+            heapq.heappush(colas[r], (plan_tambor[o], o))
+        else:
+            empezar(r, o, t)
+
+    def empezar(r, o, t):
+        op = siguiente[o]
+        ocupado[r] = True
+        inicio[op] = t
+        fin[op] = t + duracion_op[op]
+        heapq.heappush(eventos, (fin[op], _FIN, o))
+
+    while eventos:
+        t, tipo, o = heapq.heappop(eventos)
+        if tipo == _LIBERACION:
+            llegar(o, t)
+            continue
+        r = recurso_op[siguiente[o]]
+        ocupado[r] = False
+        siguiente[o] += 1
+        if colas[r]:
+            empezar(r, heapq.heappop(colas[r])[1], t)
+        if siguiente[o] < primera_op[o + 1]:
+            llegar(o, t)
+
+    return np.asarray(inicio), np.asarray(fin), np.asarray(llegada_tambor)
+
+
+def resumen_dbr(programa):
+    """Resumen en texto del programa DBR."""
+    ordenes = programa['ordenes']
+    zonas = ordenes['Zona_Buffer'].value_counts()
+    lineas = [f"=== PROGRAMA DBR ({len(ordenes)} órdenes) ===",
+              f"Tambor (restricción): {programa['tambor']}",
+              f"Amortiguador: {programa['buffer']:.2f} minutos",
+              f"Makespan: {programa['makespan']:.2f} minutos "
+              f"(el tambor trabaja el {100 * programa['uso_tambor']:.1f} %)",
+              "Llegada al tambor por zona del amortiguador:"]
+    for nombre in ZONAS_BUFFER:
+        lineas.append(f"  - {nombre}: {int(zonas.get(nombre, 0))}")
+    return "\n".join(lineas)
+
+# ----------------------------------------------------------------------
+## EJECUCIÓN DEL PROGRAMA
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Programa Drum-Buffer-Rope a partir de la mezcla óptima.")
+    parser.add_argument("archivo", help="Archivo YAML (o .npz columnar) de la planta.")
+    parser.add_argument("--plan", default=None,
+                        help="CSV de resultados de toc_tool (usa su columna Produccion_Optima).")
+    parser.add_argument("--modo", choices=SOLVER_MODES, default="greedy", help="Solución de la mezcla.")
+    parser.add_argument("--lote", type=float, default=None, help="Unidades máximas por orden.")
+    parser.add_argument("--buffer", type=float, default=None, help="Amortiguador delante del tambor (minutos).")
+    parser.add_argument("--factor-buffer", type=float, default=FACTOR_BUFFER,
+                        help="Amortiguador como múltiplo del tiempo promedio antes del tambor.")
+    parser.add_argument("--gantt", default="dbr_gantt.csv", help="CSV con una fila por operación (Gantt).")
+    parser.add_argument("--ordenes", default="dbr_ordenes.csv", help="CSV con una fila por orden.")
+    args = parser.parse_args()
+
+    catalog = load_catalog_from_file(args.archivo)
+    unidades = None
+    if args.plan:
+        plan = pd.read_csv(args.plan)
+        por_producto = dict(zip(plan['Producto'].astype(str), plan['Produccion_Optima']))
+        unidades = np.array([por_producto.get(str(p), 0) for p in catalog.product_names], dtype=float)
+
+    inicio = time.perf_counter()
+    programa = programar_dbr(catalog, unidades=unidades, modo=args.modo, tamano_lote=args.lote,
+                             buffer=args.buffer, factor_buffer=args.factor_buffer)
+    print(f"Tiempo: {time.perf_counter() - inicio:.2f} s\n")
+    print(resumen_dbr(programa))
+    programa['gantt'].to_csv(args.gantt, index=False, float_format='%.2f')
+    programa['ordenes'].to_csv(args.ordenes, index=False, float_format='%.2f')
+    print(f"\nGantt guardado en: {args.gantt}\nÓrdenes guardadas en: {args.ordenes}")
@@ -0,0 +1,119 @@
+from statistics import NormalDist
+
+# ----------------------------------------------------------------------
+## ESTADÍSTICAS EN LÍNEA PARA LAS SIMULACIONES
+# ----------------------------------------------------------------------
+# Acumuladores que se actualizan en cada turno sin guardar el historial:
+# media y varianza con el algoritmo de Welford (y la combinación de Chan
+# para unir bloques o réplicas), e histogramas de valores enteros. Funcionan
+# con números de Python o, elemento por elemento, con arreglos de NumPy.
+
+
+def z_confianza(confianza: float = 0.95) -> float:
+    """Cuantil normal del intervalo de confianza bilateral (1.96 para 95 %)."""
+    if not 0 < confianza < 1:
+        raise ValueError("El nivel de confianza debe estar entre 0 y 1.")
+    return NormalDist().inv_cdf(0.5 + confianza / 2)
+
+
+class EstadisticoEnLinea:
+    """
+    Media y varianza acumuladas con el algoritmo de Welford.
+
+    Cada `agregar` cuesta O(1) y no guarda los valores. Si se agregan
+    arreglos, se lleva una media y una varianza por elemento.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+
+    @classmethod
+    def desde_momentos(cls, n: int, media, desv) -> "EstadisticoEnLinea":
+        """Acumulador con `n` observaciones de media y desviación (muestral) conocidas."""
+        est = cls()
+        est.n, est.media, est._m2 = n, media, desv ** 2 * max(n - 1, 0)
+        return est
+
+    def agregar(self, x):
+        """Agrega una observación."""
+        self.n += 1
+        delta = x - self.media
+        self.media = self.media + delta / self.n
+        self._m2 = self._m2 + delta * (x - self.media)
+
+    def agregar_muestras(self, valores):
+        """Agrega un bloque de observaciones (arreglo de NumPy, una por fila)."""
+        if len(valores) == 0:
+            return
+        otro = EstadisticoEnLinea()
+        otro.n = len(valores)
+        otro.media = valores.mean(axis=0)
+        otro._m2 = ((valores - otro.media) ** 2).sum(axis=0)
+        self.combinar(otro)
+
+    def combinar(self, otro: "EstadisticoEnLinea"):
+        """Une las observaciones de otro acumulador (fórmula de Chan)."""
+        if otro.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.media, self._m2 = otro.n, otro.media, otro._m2
+            return
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.media = self.media + delta * otro.n / n
+        self._m2 = self._m2 + otro._m2 + delta ** 2 * self.n * otro.n / n
+        self.n = n
+
+    @property
+    def varianza(self):
+        """Varianza muestral (0 con menos de dos observaciones)."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0 * self._m2
+
+    @property
+    def desv(self):
+        return self.varianza ** 0.5
+
+    def semiancho(self, confianza: float = 0.95):
+        """Semiancho del intervalo de confianza de la media (infinito con menos de dos observaciones)."""
+        if self.n < 2:
+            return float('inf')
+        return z_confianza(confianza) * self.desv / self.n ** 0.5
+
+    def __repr__(self) -> str:
+        return f"EstadisticoEnLinea(n={self.n}, media={self.media}, desv={self.desv})"
+
+
+class HistogramaEnLinea:
+    """
+    Conteo de valores enteros entre 0 y `maximo`; los mayores se cuentan en
+    la última clase. Acepta un número o un arreglo de NumPy por llamada.
+    """
+
+    def __init__(self, maximo: int):
+        if maximo < 0:
+            raise ValueError("El máximo del histograma no puede ser negativo.")
+        self.maximo = int(maximo)
+        self.conteo = [0] * (self.maximo + 1)
+        self.total = 0
+
+    def agregar(self, valores):
+        """Cuenta un valor o todos los valores de un arreglo."""
+        if hasattr(valores, "ravel"):
+            import numpy as np
+            clases = np.bincount(np.clip(np.asarray(valores).ravel(), 0, self.maximo).astype(np.int64),
+                                 minlength=self.maximo + 1)
+            self.conteo = [a + b for a, b in zip(self.conteo, clases.tolist())]
+            self.total += int(clases.sum())
+        else:
+            self.conteo[min(max(int(valores), 0), self.maximo)] += 1
+            self.total += 1
+
+    def frecuencias(self) -> list[float]:
+        """Fracción de las observaciones en cada clase."""
+        return [c / self.total for c in self.conteo] if self.total else [0.0] * len(self.conteo)
+
+    def media(self) -> float:
+        """Media de los valores contados (la última clase cuenta como `maximo`)."""
+        return sum(k * c for k, c in enumerate(self.conteo)) / self.total if self.total else 0.0
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------------------------------
+## SIMULACIÓN DE EVENTOS DISCRETOS DE UNA LÍNEA EN TIEMPO CONTINUO
+# ----------------------------------------------------------------------
+# Los trabajos recorren las estaciones en orden; cada estación tiene una
+# cola FIFO sin límite y uno o varios servidores, y el tiempo de servicio
+# de cada trabajo se sortea de una distribución. Solo se procesan los
+# eventos que ocurren (fin de servicio y llegada de un trabajo), guardados
+# en un montículo (heapq); una estación ociosa no cuesta nada.
+#
+# Si todas las estaciones tienen un solo servidor, el mismo modelo se
+# resuelve sin montículo con la recurrencia de Lindley, vectorizada por
+# estación: salida_j = max(llegada_j, salida_{j-1}) + servicio_j, que con
+# S = cumsum(servicio) queda salida = S + max.acumulado(llegada - S + servicio).
+#
+# La unidad de tiempo es el turno del juego de dados: una estación "dado"
+# de c caras lanza un dado por turno y procesa esa cantidad de trabajos,
+# cada uno en 1/lanzamiento turnos.
+
+# Distribuciones del tiempo de servicio (o entre llegadas): parámetros obligatorios
+TIME_DISTRIBUTIONS = {
+    "fija": ("media",),
+    "exponencial": ("media",),
+    "normal": ("media", "desv"),
+    "lognormal": ("media", "desv"),
+    "triangular": ("min", "moda", "max"),
+    "uniforme": ("min", "max"),
+    "dado": ("caras",),
+}
+METODOS = ("auto", "lindley", "eventos")
+
+# Tipos de evento; a igual tiempo se procesan primero los fines de servicio
+_FIN, _LLEGADA = 0, 1
+
+
+def normalizar_distribucion(spec, que="El tiempo de servicio"):
+    """
+    Normaliza una distribución de tiempo: un entero es un dado de ese número
+    de caras (el comportamiento del juego de dados) y un mapeo debe tener
+    'tipo' y sus parámetros.
+    """
+    if isinstance(spec, (int, np.integer)) and not isinstance(spec, bool):
+        spec = {"tipo": "dado", "caras": int(spec)}
+    if not isinstance(spec, dict) or spec.get("tipo") not in TIME_DISTRIBUTIONS:
+        raise ValueError(f"{que} debe ser un número de caras o un mapeo con 'tipo' "
+                         f"({', '.join(TIME_DISTRIBUTIONS)}), se encontró {spec!r}.")
+    faltan = [p for p in TIME_DISTRIBUTIONS[spec["tipo"]] if p not in spec]
+    if faltan:
+        raise ValueError(f"{que} ({spec['tipo']}) requiere: {', '.join(faltan)}.")
+    normalizada = {"tipo": spec["tipo"]}
+    for p in TIME_DISTRIBUTIONS[spec["tipo"]]:
+        valor = spec[p]
+        if isinstance(valor, bool) or not isinstance(valor, (int, float, np.number)) or valor < 0:
+            raise ValueError(f"{que}: '{p}' debe ser un número no negativo, se encontró {valor!r}.")
+        normalizada[p] = valor
+    if spec["tipo"] == "dado" and normalizada["caras"] < 1:
+        raise ValueError(f"{que}: el dado debe tener al menos una cara.")
+    if spec["tipo"] in ("exponencial", "lognormal") and normalizada["media"] <= 0:
+        raise ValueError(f"{que}: la media debe ser mayor que 0.")
+    return normalizada
+
+
+def sortear_tiempos(spec, n, rng):
+    """Sortea n tiempos (no negativos) de una distribución normalizada."""
+    tipo = spec["tipo"]
+    if tipo == "fija":
+        return np.full(n, float(spec["media"]))
+    if tipo == "exponencial":
+        return rng.exponential(spec["media"], n)
+    if tipo == "normal":
+        return np.maximum(0.0, rng.normal(spec["media"], spec["desv"], n))
+    if tipo == "lognormal":
+        # Parámetros de la normal subyacente a partir de la media y desviación del tiempo
+        sigma2 = np.log1p((spec["desv"] / spec["media"]) ** 2)
+        return rng.lognormal(np.log(spec["media"]) - sigma2 / 2, np.sqrt(sigma2), n)
+    if tipo == "triangular":
+        if spec["min"] == spec["max"]:
+            return np.full(n, float(spec["min"]))
+        return rng.triangular(spec["min"], spec["moda"], spec["max"], n)
+    if tipo == "uniforme":
+        return rng.uniform(spec["min"], spec["max"], n)
+    # Dado: un lanzamiento por turno; los trabajos de ese turno tardan 1/lanzamiento cada uno
+    caras = int(spec["caras"])
+    lanzamientos = rng.integers(1, caras + 1, size=int(2 * n / (caras + 1)) + 16)
+    while lanzamientos.sum() < n:
+        lanzamientos = np.concatenate([lanzamientos, rng.integers(1, caras + 1, size=len(lanzamientos))])
+    return 1.0 / np.repeat(lanzamientos, lanzamientos)[:n]
+
+
+def _lindley(llegada, servicio):
+    """
+    Inicio y salida de cada trabajo en todas las estaciones (un servidor, FIFO)
+    con la recurrencia de Lindley, una operación vectorial por estación.
+    """
+    inicio = np.empty_like(servicio)
+    salida = np.empty_like(servicio)
+    for k in range(servicio.shape[1]):
+        s = servicio[:, k]
+        acumulado = np.cumsum(s)
+        salida[:, k] = acumulado + np.maximum.accumulate(llegada - acumulado + s)
+        inicio[:, k] = salida[:, k] - s
+        llegada = salida[:, k]
+    return inicio, salida
+
+
+def _eventos(llegada, servicio, servidores):
+    """
+    Inicio y salida de cada trabajo en todas las estaciones con un montículo
+    de eventos. Cada estación tiene `servidores[k]` servidores y una cola FIFO.
+    `llegada` es None si la primera estación nunca se queda sin material.
+    """
+    n, K = servicio.shape
+    # Arreglos planos (trabajo * K + estación) y funciones locales: el ciclo corre por evento
+    tiempos = servicio.ravel().tolist()
+    inicio = [0.0] * (n * K)
+    salida = [0.0] * (n * K)
+    libres = list(servidores)
+    colas = [deque() for _ in range(K)]
+    push, pop = heapq.heappush, heapq.heappop
+
+    eventos = []
+    pendientes = deque()
+    if llegada is None:
+        # Material ilimitado: la primera estación empieza un trabajo en cuanto se libera un servidor
+        pendientes.extend(range(n))
+        while pendientes and libres[0]:
+            j = pendientes.popleft()
+            libres[0] -= 1
+            push(eventos, (tiempos[j * K], _FIN, 0, j))
+    else:
+        eventos = [(t, _LLEGADA, 0, j) for j, t in enumerate(llegada.tolist())]
+        heapq.heapify(eventos)
+
+    while eventos:
+        t, tipo, k, j = pop(eventos)
+        if tipo == _FIN:
+            salida[j * K + k] = t
+            # El servidor toma el siguiente trabajo de su cola (o material nuevo)
+            cola = colas[k]
+            if cola or (k == 0 and pendientes):
+                siguiente = cola.popleft() if cola else pendientes.popleft()
+                op = siguiente * K + k
+                inicio[op] = t
+                push(eventos, (t + tiempos[op], _FIN, k, siguiente))
+            else:
+                libres[k] += 1
+            # El trabajo llega de inmediato a la siguiente estación
+            k += 1
+            if k == K:
+                continue
+        if libres[k]:
+            libres[k] -= 1
+            op = j * K + k
+            inicio[op] = t
+            push(eventos, (t + tiempos[op], _FIN, k, j))
+        else:
+            colas[k].append(j)
+
+    return np.array(inicio).reshape(n, K), np.array(salida).reshape(n, K)
+
+
+def simular_eventos(estaciones, trabajos, llegadas=None, servidores=None, semilla=None, metodo="auto"):
+    """
+    Simula `trabajos` trabajos que recorren las estaciones en orden.
+
+    Args:
+        estaciones (dict): Nombre -> distribución del tiempo de servicio (un
+            entero es un dado de ese número de caras; ver `TIME_DISTRIBUTIONS`).
+        trabajos (int): Número de trabajos.
+        llegadas (dict, optional): Distribución del tiempo entre llegadas. Por
+            defecto la primera estación tiene material ilimitado (como en el juego).
+        servidores (dict, optional): Nombre -> número de servidores en paralelo. Por defecto 1.
+        semilla (int, optional): Semilla de la corrida.
+        metodo (str, optional): "lindley" (solo un servidor por estación),
+            "eventos" (montículo) o "auto" (lindley si se puede). Por defecto "auto".
+
+    Returns:
+        dict: 'estaciones' (tabla por estación: utilización, espera y servicio
+        promedio), 'lead_time' (tiempo de cada trabajo en la línea),
+        'salida' (momento en que sale cada trabajo), 'throughput' (trabajos
+        por unidad de tiempo), 'wip_promedio' (ley de Little), 'makespan' y 'metodo'.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: '{metodo}'. Opciones: {', '.join(METODOS)}")
+    if not estaciones:
+        raise ValueError("La línea debe tener al menos una estación.")
+    if trabajos < 1:
+        raise ValueError("El número de trabajos debe ser al menos 1.")
+    nombres = [str(e) for e in estaciones]
+    specs = [normalizar_distribucion(spec, f"El tiempo de servicio de '{nombre}'")
+             for nombre, spec in zip(nombres, estaciones.values())]
+    servidores = servidores or {}
+    desconocidas = set(map(str, servidores)) - set(nombres)
+    if desconocidas:
+        raise ValueError(f"Servidores de estaciones no declaradas: {', '.join(sorted(desconocidas))}.")
+    c = [int(servidores.get(nombre, 1)) for nombre in nombres]
+    if min(c) < 1:
+        raise ValueError("Cada estación debe tener al menos un servidor.")
+    if metodo == "lindley" and max(c) > 1:
+        raise ValueError("El método 'lindley' solo admite un servidor por estación; use 'eventos'.")
+    if metodo == "auto":
+        metodo = "lindley" if max(c) == 1 else "eventos"
+
+    # Todos los tiempos se sortean antes, en bloque; la simulación solo los consume
+    rng = np.random.default_rng(semilla)
+    servicio = np.column_stack([sortear_tiempos(spec, trabajos, rng) for spec in specs])
+    llegada = None
+    if llegadas is not None:
+        llegada = np.cumsum(sortear_tiempos(normalizar_distribucion(llegadas, "El tiempo entre llegadas"),
+                                            trabajos, rng))
+
+    if metodo == "lindley":
+        inicio, salida = _lindley(np.zeros(trabajos) if llegada is None else llegada, servicio)
+    else:
+        inicio, salida = _eventos(llegada, servicio, c)
+
+    # Llegada a cada estación: la liberación en la primera, la salida de la anterior en las demás
+    liberacion = inicio[:, 0] if llegada is None else llegada
+    llegada_estacion = np.column_stack([liberacion, salida[:, :-1]])
+    fin = salida[:, -1]
+    lead_time = fin - liberacion
+    makespan = float(fin.max())
+    tabla = pd.DataFrame({
+        'estacion': nombres,
+        'servidores': c,
+        'utilizacion': servicio.sum(axis=0) / (np.array(c) * makespan) if makespan > 0 else 0.0,
+        'espera_promedio': (inicio - llegada_estacion).mean(axis=0),
+        'servicio_promedio': servicio.mean(axis=0),
+    })
+    return {
+        'estaciones': tabla,
+        'lead_time': lead_time,
+        'salida': fin,
+        'throughput': trabajos / makespan if makespan > 0 else float('inf'),
+        'wip_promedio': float(lead_time.sum()) / makespan if makespan > 0 else 0.0,
+        'makespan': makespan,
+        'metodo': metodo,
+    }
+
+
+def resumen_eventos(res):
+    """Resumen en texto de una simulación de eventos."""
+    lead = res['lead_time']
+    lineas = [f"=== {len(lead)} TRABAJOS (método {res['metodo']}) ===",
+              f"Makespan: {res['makespan']:.2f}  Throughput: {res['throughput']:.4f} por unidad de tiempo",
+              f"Lead time promedio: {lead.mean():.2f} (P50 {np.percentile(lead, 50):.2f}, "
+              f"P95 {np.percentile(lead, 95):.2f})",
+              f"WIP promedio (Little): {res['wip_promedio']:.2f}",
+              res['estaciones'].to_string(index=False, float_format='%.4f')]
+    return "\n".join(lineas)
+
+# ----------------------------------------------------------------------
+## EJECUCIÓN DEL PROGRAMA
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación de eventos discretos del juego de dados en tiempo continuo.")
+    parser.add_argument("--caras", type=int, nargs="+", default=[8, 8, 4, 8, 8],
+                        help="Caras del dado de cada estación (tiempo de servicio = 1/lanzamiento).")
+    parser.add_argument("--trabajos", type=int, default=1_000_000, help="Número de trabajos.")
+    parser.add_argument("--llegada-media", type=float, default=None,
+                        help="Llegadas exponenciales con esta media (por defecto, material ilimitado).")
+    parser.add_argument("--metodo", choices=METODOS, default="auto", help="Método de simulación.")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla de la corrida.")
+    args = parser.parse_args()
+
+    estaciones = {f"Estación {i + 1}": c for i, c in enumerate(args.caras)}
+    llegadas = {"tipo": "exponencial", "media": args.llegada_media} if args.llegada_media else None
+    inicio = time.perf_counter()
+    res = simular_eventos(estaciones, args.trabajos, llegadas=llegadas, semilla=args.semilla, metodo=args.metodo)
+    print(f"Tiempo: {time.perf_counter() - inicio:.2f} s\n")
+    print(resumen_eventos(res))
@@ -1,67 +1,159 @@
+import hashlib
+import json
+import os
+import tempfile
+
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
-import os
+
+from toc_optimize import TocModel
+
+# Por encima de este número de nodos (productos + recursos) el diagrama
+# detallado es ilegible y spring_layout tarda minutos: se dibuja la vista
+# agregada, de tamaño acotado, con los recursos más cargados.
+MAX_NODOS_DETALLE = 150
+TOP_RECURSOS = 15
 
 # ----------------------------------------------------------------------
 ## FUNCIÓN HELPER: CARGA DE DATOS YAML - MOVIDA A toc_read.py
+# ----------------------------------------------------------------------
+## CACHÉ DE POSICIONES (LAYOUT)
+# ----------------------------------------------------------------------
+# La posición de los nodos depende solo de la topología (nodos y aristas),
+# no de tiempos, capacidades ni precios: si se cambian los números y se
+# vuelve a graficar, se reutilizan las posiciones guardadas.
+
+def layout_key(G):
+    """Hash SHA-256 del conjunto de nodos y aristas del grafo."""
+    payload = json.dumps({"nodes": sorted(map(str, G.nodes())),
+                          "edges": sorted([str(u), str(v)] for u, v in G.edges())},
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_spring_layout(G, cache_dir=None, **kwargs):
+    """
+    `nx.spring_layout(G, **kwargs)` con caché en disco por topología.
+
+    Args:
+        G: Grafo a distribuir.
+        cache_dir: Directorio de la caché de posiciones (None: sin caché).
+        **kwargs: Argumentos de spring_layout (forman parte de la clave).
+
+    Returns:
+        dict: nodo -> (x, y).
+    """
+    if cache_dir is None:
+        return nx.spring_layout(G, **kwargs)
+
+    key = hashlib.sha256((layout_key(G) + json.dumps(kwargs, sort_keys=True, default=str)).encode("utf-8")).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        pos = {n: tuple(saved[str(n)]) for n in G.nodes()}
+        os.utime(path)  # Último uso, para la limpieza de toc_cache.evict
+        return pos
+    except (OSError, ValueError, KeyError):
+        pass
+
+    pos = nx.spring_layout(G, **kwargs)
+    try:
+        # Escritura atómica: varios procesos de un lote pueden graficar la misma topología
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".layout-", suffix=".json", dir=cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({str(n): [float(x), float(y)] for n, (x, y) in pos.items()}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return pos
+
 # ----------------------------------------------------------------------
 ## FUNCIÓN PRINCIPAL: EJECUCIÓN DE LA GRÁFICA
 # ----------------------------------------------------------------------
 
-def run_toc_graph(datos, output_filename):
-    """Genera y guarda el diagrama de procesos TOC usando networkx y bipartite_layout."""
-    
-    # 0. Datos ya cargados
-    # datos = load_data_from_file(yaml_file)
+def _toc_model(datos):
+    """
+    El `TocModel` del análisis: toc_tool pasa el mismo que usó para el
+    reporte; con `datos` o un TocCatalog se construye uno nuevo.
+    """
+    return datos if isinstance(datos, TocModel) else TocModel(datos)
+
+
+def _constraint_label(resource_name, max_factor):
+    """Parte del título sobre la restricción, con el mismo criterio que el reporte (carga > 1)."""
+    if max_factor > 1.0:
+        return f"Restricción: {resource_name} (Carga Máxima: {max_factor:.2f})"
+    return f"Sin restricción de capacidad (Carga Máxima: {max_factor:.2f})"
+
+
+def _save_figure(output_filename):
+    """Guarda la figura actual; el formato (png, svg, pdf...) sale de la extensión."""
+    fmt = os.path.splitext(output_filename)[1].lstrip(".").lower() or "png"
+    plt.savefig(output_filename, format=fmt, dpi=300 if fmt == "png" else None)
+    plt.close()
+
 
+def run_toc_graph(datos, output_filename, layout_cache_dir=None, max_nodes=MAX_NODOS_DETALLE,
+                  top_resources=TOP_RECURSOS):
+    """
+    Genera y guarda el diagrama de procesos TOC.
+
+    Recibe `datos`, un TocCatalog o el `TocModel` del análisis. El consumo,
+    los factores de carga, el throughput y la restricción salen del modelo,
+    por lo que el diagrama coincide con el reporte de toc_optimize.
+    Con pocos nodos se dibuja cada producto y recurso (spring_layout, con las
+    posiciones en caché si se indica `layout_cache_dir`). Con más de
+    `max_nodes` nodos se dibuja la vista agregada de `run_toc_graph_aggregated`.
+    La extensión de `output_filename` elige el formato (.png o .svg vectorial).
+    """
     # 1. Inicializar el grafo
+    model = _toc_model(datos)
+    matrix = model.matrix
+    if len(matrix.product_names) + len(matrix.resource_names) > max_nodes:
+        return run_toc_graph_aggregated(model, output_filename, top_resources=top_resources)
+
     G = nx.DiGraph()
-    resource_consumption = {r: 0 for r in datos["recursos"]}
-    product_nodes = set()
-    resource_nodes = set()
+    product_nodes = set(matrix.product_names)
+    resource_nodes = {matrix.resource_names[r] for r in set(matrix.indices.tolist())}
 
-    # 2. Construcción del Grafo y cálculo de consumo
-    for prod_name, prod_data in datos["productos"].items():
-        T = prod_data.get("precio", 0) - prod_data["costo_ventas"]
+    # 2. Construcción del Grafo con la matriz de consumo del modelo
+    # (cada producto seguido de sus recursos: el orden de los nodos fija el layout)
+    consumed_times = (matrix.demand[matrix.product_of_entry] * matrix.times).tolist()
+    resource_of_entry = matrix.indices.tolist()
+    for p, (prod_name, T) in enumerate(zip(matrix.product_names, matrix.throughput.tolist())):
         G.add_node(prod_name, node_type='Product', T=T)
-        product_nodes.add(prod_name)
-
-        for res_name, time_per_unit in prod_data["recursos"].items():
-            consumed_time = prod_data["demanda"] * time_per_unit
-            resource_consumption[res_name] += consumed_time
-            resource_nodes.add(res_name)
-            G.add_edge(prod_name, res_name, weight=consumed_time)
+        for k in range(matrix.indptr[p], matrix.indptr[p + 1]):
+            G.add_edge(prod_name, matrix.resource_names[resource_of_entry[k]], weight=consumed_times[k])
 
     # 3. Determinar el tamaño y color de los Nodos de Recurso
     resource_sizes = {}
     node_colors = {}
-    base_size = 2500 
-    max_factor_global = 0
-
-    for res_name, capacity in datos["recursos"].items():
-        consumed = resource_consumption[res_name]
-        factor_carga = consumed / capacity
-        
-        max_factor_global = max(max_factor_global, factor_carga)
-        
-        node_size = base_size * factor_carga 
+    base_size = 2500
+    bottleneck_index, max_factor_global = model.bottleneck()
+
+    for res_name, capacity, consumed, factor_carga in zip(matrix.resource_names, matrix.capacity.tolist(),
+                                                          model.consumption.tolist(), model.load_factors().tolist()):
+        node_size = base_size * factor_carga
         resource_sizes[res_name] = max(base_size / 2, node_size)
-        
+
         color = 'red' if factor_carga > 1.0 else 'skyblue'
         node_colors[res_name] = color
-        
-        G.add_node(res_name, node_type='Resource', capacity=capacity, 
+
+        G.add_node(res_name, node_type='Resource', capacity=capacity,
                    consumed=consumed, factor_carga=factor_carga)
 
     # 4. Preparación para la Visualización
     node_list = G.nodes()
-    sizes = [resource_sizes.get(n, base_size * 0.5) for n in node_list] 
+    sizes = [resource_sizes.get(n, base_size * 0.5) for n in node_list]
     colors = [node_colors.get(n, 'lightgreen') if G.nodes[n].get('node_type') == 'Resource' else 'yellow' for n in node_list]
 
     # Usar spring_layout para una distribución más orgánica (evita las dos columnas rígidas)
     # G: El grafo a dibujar; k controla la distancia entre nodos (valor más alto = más separados)
     # seed: Semilla para reproducibilidad del layout aleatorio
-    pos = nx.spring_layout(G, k=0.65, seed=42)  # seed=42 para reproducibilidad, None para aleatorio
+    pos = cached_spring_layout(G, layout_cache_dir, k=0.65, seed=42)  # seed=42 para reproducibilidad
     # pos = nx.kamada_kawai_layout(G)
 
     plt.figure(figsize=(10, 6))
@@ -71,15 +163,105 @@ def run_toc_graph(datos, output_filename):
 
     # Añadir etiquetas con información clave
     product_labels = {n: n for n in product_nodes}
-    resource_labels = {n: f"{n}\nCarga: {G.nodes[n]['factor_carga']:.2f}" 
+    resource_labels = {n: f"{n}\nCarga: {G.nodes[n]['factor_carga']:.2f}"
                       for n in resource_nodes}
 
     nx.draw_networkx_labels(G, pos, labels=product_labels, font_size=12, font_color='black')
     nx.draw_networkx_labels(G, pos, labels=resource_labels, font_size=9, font_color='black', verticalalignment='center')
 
 
-    plt.title(f"Diagrama de Procesos TOC - Restricción (Carga Máxima: {max_factor_global:.2f})", fontsize=14)
-    plt.axis('off') 
-    
+    plt.title(f"Diagrama de Procesos TOC - {_constraint_label(matrix.resource_names[bottleneck_index], max_factor_global)}",
+              fontsize=14)
+    plt.axis('off')
+
     # 5. Guardar la gráfica en un archivo
-    plt.savefig(output_filename, format="png", dpi=300)
\ No newline at end of file
+    _save_figure(output_filename)
+
+# ----------------------------------------------------------------------
+## VISTA AGREGADA PARA CATÁLOGOS GRANDES
+# ----------------------------------------------------------------------
+
+def run_toc_graph_aggregated(datos, output_filename, top_resources=TOP_RECURSOS):
+    """
+    Diagrama bipartito de tamaño acotado para catálogos grandes.
+
+    A la derecha, los `top_resources` recursos con mayor factor de carga y un
+    nodo "Otros recursos" con el resto. A la izquierda, los productos
+    agrupados por su recurso más cargado: el grupo de un recurso reúne a los
+    productos cuyo recurso de mayor carga es ese. El grosor de cada arista es
+    el tiempo consumido por el grupo en el recurso. Todo se calcula con
+    operaciones vectorizadas sobre la matriz CSR del `TocModel`, por lo que
+    el tiempo de dibujo no depende del número de productos.
+    """
+    model = _toc_model(datos)
+    matrix = model.matrix
+    n_products, n_resources = len(matrix.product_names), len(matrix.resource_names)
+    indptr, indices, product_of_entry = matrix.indptr, matrix.indices, matrix.product_of_entry
+
+    # 1. Carga de cada recurso (la misma del reporte)
+    consumed = (matrix.demand[product_of_entry] * matrix.times).astype(float)
+    factor_carga = model.load_factors().astype(float)
+    bottleneck_index, max_factor_global = model.bottleneck()
+
+    # 2. Recursos visibles: los más cargados; el resto va a la casilla "otros"
+    top = np.argsort(-factor_carga, kind='stable')[:top_resources]
+    n_top = len(top)
+    slot = np.full(n_resources, n_top)
+    slot[top] = np.arange(n_top)
+
+    # 3. Grupo de cada producto: su recurso de mayor carga (último de su
+    #    tramo al ordenar las entradas por producto y factor de carga)
+    group = np.full(n_products, n_top)
+    if len(indices):
+        order = np.lexsort((factor_carga[indices], product_of_entry))
+        has_entries = np.diff(indptr) > 0
+        group[has_entries] = slot[indices[order[indptr[1:][has_entries] - 1]]]
+    group_count = np.bincount(group, minlength=n_top + 1)
+    group_T = np.bincount(group, weights=matrix.throughput.astype(float), minlength=n_top + 1)
+
+    # 4. Aristas grupo -> recurso con el consumo sumado
+    edge_weight = np.bincount(group[product_of_entry] * (n_top + 1) + slot[indices], weights=consumed,
+                              minlength=(n_top + 1) ** 2).reshape(n_top + 1, n_top + 1)
+    others = np.setdiff1d(np.arange(n_resources), top)
+
+    resource_labels = [f"{matrix.resource_names[r]}\nCarga: {factor_carga[r]:.2f}" for r in top]
+    if len(others):
+        resource_labels.append(f"Otros recursos ({len(others)})\nCarga máx.: {factor_carga[others].max():.2f}")
+    resource_load = list(factor_carga[top]) + ([factor_carga[others].max()] if len(others) else [])
+    group_names = [matrix.resource_names[r] for r in top] + ["otros recursos"]
+
+    G = nx.DiGraph()
+    pos = {}
+    for i, (label, load) in enumerate(zip(resource_labels, resource_load)):
+        node = ('R', i)
+        G.add_node(node, label=label, size=600 + 600 * min(load, 2.0),
+                   color='red' if load > 1.0 else 'skyblue')
+        pos[node] = (1.0, -i)
+    groups = [g for g in range(n_top + 1) if group_count[g]]
+    for row, g in enumerate(groups):
+        node = ('P', g)
+        G.add_node(node, label=f"{group_count[g]} productos\n→ {group_names[g]}\nT: {group_T[g]:,.0f}",
+                   size=600 + 2400 * group_count[g] / n_products, color='yellow')
+        # Columnas alineadas: los grupos se reparten a lo alto de la columna de recursos
+        pos[node] = (0.0, -row * max(len(resource_labels) - 1, 1) / max(len(groups) - 1, 1))
+    for g in groups:
+        for s in range(len(resource_labels)):
+            if edge_weight[g, s] > 0:
+                G.add_edge(('P', g), ('R', s), weight=edge_weight[g, s])
+
+    # 5. Dibujo: grosor de las aristas proporcional al consumo
+    node_list = list(G.nodes())
+    max_weight = max((w for _, _, w in G.edges(data='weight')), default=1.0) or 1.0
+    plt.figure(figsize=(12, max(6, 0.5 * len(resource_labels))))
+    nx.draw(G, pos, nodelist=node_list, with_labels=False,
+            node_size=[G.nodes[n]['size'] for n in node_list],
+            node_color=[G.nodes[n]['color'] for n in node_list],
+            width=[0.5 + 6 * w / max_weight for _, _, w in G.edges(data='weight')],
+            edge_color='gray', arrows=True)
+    nx.draw_networkx_labels(G, pos, labels={n: G.nodes[n]['label'] for n in node_list}, font_size=8)
+    plt.title(f"Diagrama de Procesos TOC - Vista agregada: {n_products} productos, {n_resources} recursos - "
+              f"{_constraint_label(matrix.resource_names[bottleneck_index], max_factor_global)}",
+              fontsize=12)
+    plt.axis('off')
+    plt.margins(x=0.2)
+    _save_figure(output_filename)
@@ -0,0 +1,286 @@
+import html
+import json
+
+from toc_optimize import TocModel
+
+# ----------------------------------------------------------------------
+## TABLERO HTML INTERACTIVO (ARCHIVO ÚNICO, SIN CONEXIÓN)
+# ----------------------------------------------------------------------
+# El tablero es un solo archivo HTML sin librerías externas: lleva los datos
+# del catálogo como JSON compacto (la matriz de consumo en CSR, igual que
+# toc_read) y un modelo greedy T/C en JavaScript que repite
+# TocModel.solve(). Los deslizadores de capacidad y demanda se resuelven en
+# el navegador, sin volver a ejecutar Python. El DOM se limita a los
+# recursos más cargados y a las primeras filas de la mezcla, de modo que un
+# catálogo de 10 000 productos sigue siendo fluido (el archivo pesa ~0.5 MB).
+
+MAX_FILAS_TABLA = 100
+MAX_BARRAS = 25
+
+
+def dashboard_data(model, result=None):
+    """
+    Datos del tablero: la matriz de consumo, los vectores del catálogo y el
+    resultado base del análisis.
+
+    Args:
+        model (TocModel): El modelo del análisis (el mismo que el reporte).
+        result (TocResult): Resultado base; si es None se resuelve el modelo.
+
+    Returns:
+        dict: Diccionario serializable a JSON.
+    """
+    result = result or model.solve()
+    matrix = model.matrix
+    catalog = matrix.catalog
+    return {
+        "empresa": str(catalog.company),
+        "fecha": str(catalog.date),
+        "modo": result.mode,
+        "recursos": [str(r) for r in matrix.resource_names],
+        "capacidad": matrix.capacity.tolist(),
+        "productos": [str(p) for p in matrix.product_names],
+        "demanda": matrix.demand.tolist(),
+        "throughput": matrix.throughput.tolist(),
+        "indptr": matrix.indptr.tolist(),
+        "indices": matrix.indices.tolist(),
+        "tiempos": matrix.times.tolist(),
+        "gastos": float(result.total_operating_expense),
+        "base": {
+            "restriccion": result.bottleneck,
+            "factor": float(result.max_factor),
+            "throughput": float(result.total_throughput),
+            "utilidad": float(result.net_profit),
+            "unidades": result.units.tolist(),
+        },
+    }
+
+
+def write_dashboard(datos, output_html, result=None):
+    """
+    Escribe el tablero HTML autocontenido.
+
+    Args:
+        datos: Un `TocModel`, un `TocCatalog` o el diccionario `datos`.
+        output_html (str): Ruta del archivo HTML.
+        result (TocResult): Resultado base ya calculado (opcional).
+
+    Returns:
+        int: Tamaño del archivo en bytes.
+    """
+    model = datos if isinstance(datos, TocModel) else TocModel(datos)
+    data = dashboard_data(model, result)
+    # JSON compacto; "</" se escapa para que un nombre no pueda cerrar la etiqueta <script>
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    title = html.escape(f"Tablero TOC - {data['empresa']} ({data['fecha']})")
+    page = (_PLANTILLA.replace("__TITULO__", title)
+            .replace("__MAX_FILAS__", str(MAX_FILAS_TABLA))
+            .replace("__MAX_BARRAS__", str(MAX_BARRAS))
+            .replace("__DATOS__", payload))
+    with open(output_html, "w", encoding="utf-8") as f:
+        f.write(page)
+    return len(page.encode("utf-8"))
+
+
+_PLANTILLA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>__TITULO__</title>
+<style>
+body { font-family: sans-serif; margin: 1.5em; color: #222; }
+h1 { font-size: 1.3em; }
+h2 { font-size: 1.1em; margin-top: 1.5em; }
+.kpis { display: flex; gap: 1em; flex-wrap: wrap; }
+.kpi { border: 1px solid #ccc; border-radius: 6px; padding: 0.6em 1em; min-width: 11em; }
+.kpi b { display: block; font-size: 1.2em; }
+.kpi small { color: #666; }
+.controles { display: grid; grid-template-columns: 16em 1fr 4em; gap: 0.4em 1em; align-items: center; max-width: 60em; }
+.barra { display: grid; grid-template-columns: 14em 1fr 4em; gap: 0.5em; align-items: center; font-size: 0.85em; }
+.pista { position: relative; background: #eee; height: 1em; }
+.relleno { background: skyblue; height: 100%; }
+.relleno.sobre { background: #e33; }
+.limite { position: absolute; top: -2px; bottom: -2px; border-left: 2px dashed #333; }
+table { border-collapse: collapse; font-size: 0.85em; }
+th, td { border-bottom: 1px solid #ddd; padding: 0.2em 0.6em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.nota { color: #666; font-size: 0.8em; }
+</style>
+</head>
+<body>
+<h1>__TITULO__</h1>
+<div class="kpis" id="kpis"></div>
+
+<h2>Escenario "qué pasa si"</h2>
+<div class="controles">
+  <label for="cap-global">Capacidad de todos los recursos</label>
+  <input type="range" id="cap-global" min="50" max="200" value="100"><span id="cap-global-v"></span>
+  <label for="dem-global">Demanda de todos los productos</label>
+  <input type="range" id="dem-global" min="0" max="300" value="100"><span id="dem-global-v"></span>
+  <select id="recurso"></select>
+  <input type="range" id="cap-recurso" min="50" max="300" value="100"><span id="cap-recurso-v"></span>
+  <input id="producto" list="lista-productos" placeholder="Producto (nombre exacto)">
+  <input type="range" id="dem-producto" min="0" max="300" value="100"><span id="dem-producto-v"></span>
+  <button id="restablecer">Restablecer</button>
+</div>
+<datalist id="lista-productos"></datalist>
+<p class="nota" id="nota-modelo"></p>
+
+<h2>Carga de los recursos</h2>
+<div id="cargas"></div>
+
+<h2>Mezcla de producción</h2>
+<input id="filtro" placeholder="Filtrar productos">
+<table><thead><tr><th>Producto</th><th>T/C (Prioridad)</th><th>Demanda</th><th>Producción</th>
+<th>Producción base</th><th>Throughput</th></tr></thead><tbody id="mezcla"></tbody></table>
+<p class="nota" id="nota-tabla"></p>
+
+<script id="datos" type="application/json">__DATOS__</script>
+<script>
+"use strict";
+const D = JSON.parse(document.getElementById("datos").textContent);
+const nP = D.productos.length, nR = D.recursos.length;
+const MAX_FILAS = __MAX_FILAS__, MAX_BARRAS = __MAX_BARRAS__;
+const fmt = (x, d = 2) => x.toLocaleString("es", {minimumFractionDigits: d, maximumFractionDigits: d});
+
+// Modelo greedy T/C: misma lógica que TocModel.solve() en modo "greedy"
+function resolver(cap, dem) {
+  const consumo = new Float64Array(nR);
+  for (let p = 0; p < nP; p++)
+    for (let k = D.indptr[p]; k < D.indptr[p + 1]; k++) consumo[D.indices[k]] += dem[p] * D.tiempos[k];
+  const factores = Array.from(consumo, (c, r) => c / cap[r]);
+  let b = 0;
+  for (let r = 1; r < nR; r++) if (factores[r] > factores[b]) b = r;
+  const maxFactor = Math.max(0, factores[b] || 0);
+  const T = D.throughput;
+  const C = new Float64Array(nP);
+  for (let p = 0; p < nP; p++)
+    for (let k = D.indptr[p]; k < D.indptr[p + 1]; k++) if (D.indices[k] === b) C[p] = D.tiempos[k];
+  const TC = Array.from(C, (c, p) => c > 0 ? T[p] / c : (T[p] > 0 ? T[p] : 0));
+  const unidades = new Float64Array(nP);
+  let orden = Array.from({length: nP}, (_, p) => p);
+
+  if (maxFactor > 1) {
+    // Orden por T/C descendente; a igual prioridad, los que no usan la restricción primero (np.lexsort)
+    orden.sort((a, c) => (TC[c] - TC[a]) || ((C[a] > 0) - (C[c] > 0)) || (a - c));
+    // Explotación de la restricción
+    let restante = cap[b];
+    const asignado = orden.map(p => {
+      if (C[p] > 0) {
+        const u = Math.min(dem[p], Math.floor(restante / C[p]));
+        restante -= u * C[p];
+        return u;
+      }
+      return dem[p];
+    });
+    // Subordinación a los demás recursos
+    const capRestante = Float64Array.from(cap);
+    orden.forEach((p, i) => {
+      let u = asignado[i];
+      for (let k = D.indptr[p]; k < D.indptr[p + 1]; k++)
+        if (D.tiempos[k] > 0) u = Math.min(u, Math.floor(capRestante[D.indices[k]] / D.tiempos[k]));
+      unidades[p] = u;
+      if (u) for (let k = D.indptr[p]; k < D.indptr[p + 1]; k++)
+        if (D.tiempos[k] > 0) capRestante[D.indices[k]] -= u * D.tiempos[k];
+    });
+  } else {
+    for (let p = 0; p < nP; p++) unidades[p] = dem[p];
+  }
+  let throughput = 0;
+  orden.forEach(p => { throughput += unidades[p] * T[p]; });
+  return {restriccion: b, maxFactor, factores, TC, orden, unidades, throughput,
+          utilidad: throughput - D.gastos};
+}
+
+const el = id => document.getElementById(id);
+const indiceProducto = new Map(D.productos.map((n, p) => [n, p]));
+const ajusteRecurso = new Map(), ajusteProducto = new Map();
+
+function escenario() {
+  const gCap = el("cap-global").value / 100, gDem = el("dem-global").value / 100;
+  const cap = D.capacidad.map((c, r) => c * gCap * (ajusteRecurso.get(r) ?? 100) / 100);
+  // La demanda son unidades enteras, como en el catálogo
+  const dem = D.demanda.map((d, p) => Math.round(d * gDem * (ajusteProducto.get(p) ?? 100) / 100));
+  return {cap, dem};
+}
+
+function kpi(nombre, valor, base) {
+  return `<div class="kpi"><small>${nombre}</small><b>${valor}</b><small>base: ${base}</small></div>`;
+}
+
+const texto = s => String(s).replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+
+function dibujar() {
+  const {cap, dem} = escenario();
+  const s = resolver(cap, dem);
+  el("kpis").innerHTML =
+    kpi("Restricción", texto(D.recursos[s.restriccion]) + (s.maxFactor > 1 ? "" : " (sin restricción)"),
+        texto(D.base.restriccion)) +
+    kpi("Carga máxima", fmt(s.maxFactor), fmt(D.base.factor)) +
+    kpi("Throughput (T)", fmt(s.throughput), fmt(D.base.throughput)) +
+    kpi("Gastos de operación (OE)", fmt(D.gastos), fmt(D.gastos)) +
+    kpi("Utilidad neta", fmt(s.utilidad), fmt(D.base.utilidad));
+
+  const top = Array.from({length: nR}, (_, r) => r).sort((a, c) => s.factores[c] - s.factores[a]).slice(0, MAX_BARRAS);
+  const escala = Math.max(1.2, ...top.map(r => s.factores[r]));
+  el("cargas").innerHTML = top.map(r =>
+    `<div class="barra"><span>${texto(D.recursos[r])}</span><div class="pista">` +
+    `<div class="relleno${s.factores[r] > 1 ? " sobre" : ""}" style="width:${100 * s.factores[r] / escala}%"></div>` +
+    `<div class="limite" style="left:${100 / escala}%"></div></div><span>${fmt(s.factores[r])}</span></div>`).join("") +
+    (nR > MAX_BARRAS ? `<p class="nota">Los ${MAX_BARRAS} recursos más cargados de ${nR}.</p>` : "");
+
+  const filtro = el("filtro").value.trim().toLowerCase();
+  const filas = [];
+  for (const p of s.orden) {
+    if (filtro && !D.productos[p].toLowerCase().includes(filtro)) continue;
+    filas.push(`<tr><td>${texto(D.productos[p])}</td><td>${fmt(s.TC[p])}</td><td>${dem[p]}</td>` +
+               `<td>${s.unidades[p]}</td><td>${D.base.unidades[p]}</td><td>${fmt(s.unidades[p] * D.throughput[p])}</td></tr>`);
+    if (filas.length === MAX_FILAS) break;
+  }
+  el("mezcla").innerHTML = filas.join("");
+  el("nota-tabla").textContent = filas.length === MAX_FILAS
+    ? `Primeras ${MAX_FILAS} filas en orden de prioridad (${nP} productos); use el filtro para buscar otros.` : "";
+  el("cap-global-v").textContent = el("cap-global").value + " %";
+  el("dem-global-v").textContent = el("dem-global").value + " %";
+  el("cap-recurso-v").textContent = el("cap-recurso").value + " %";
+  el("dem-producto-v").textContent = el("dem-producto").value + " %";
+}
+
+// Se redibuja a lo más una vez por cuadro mientras se mueven los deslizadores
+let pendiente = false;
+function programar() {
+  if (!pendiente) { pendiente = true; requestAnimationFrame(() => { pendiente = false; dibujar(); }); }
+}
+
+const base = resolver(D.capacidad, D.demanda);
+el("recurso").innerHTML = Array.from({length: nR}, (_, r) => r).sort((a, c) => base.factores[c] - base.factores[a])
+  .map(r => `<option value="${r}">${texto(D.recursos[r])}</option>`).join("");
+el("lista-productos").innerHTML = D.productos.map(n => `<option value="${texto(n)}">`).join("");
+el("nota-modelo").textContent = "El escenario se resuelve en el navegador con el modelo greedy (prioridad T/C)" +
+  (D.modo !== "greedy" ? `; el reporte base se calculó en modo ${D.modo}.` : ".");
+
+el("recurso").addEventListener("change", () => {
+  el("cap-recurso").value = ajusteRecurso.get(+el("recurso").value) ?? 100; programar();
+});
+el("cap-recurso").addEventListener("input", () => { ajusteRecurso.set(+el("recurso").value, +el("cap-recurso").value); programar(); });
+el("producto").addEventListener("change", () => {
+  const p = indiceProducto.get(el("producto").value);
+  el("dem-producto").value = p === undefined ? 100 : (ajusteProducto.get(p) ?? 100); programar();
+});
+el("dem-producto").addEventListener("input", () => {
+  const p = indiceProducto.get(el("producto").value);
+  if (p !== undefined) ajusteProducto.set(p, +el("dem-producto").value);
+  programar();
+});
+for (const id of ["cap-global", "dem-global"]) el(id).addEventListener("input", programar);
+el("filtro").addEventListener("input", programar);
+el("restablecer").addEventListener("click", () => {
+  ajusteRecurso.clear(); ajusteProducto.clear();
+  for (const id of ["cap-global", "dem-global", "cap-recurso", "dem-producto"]) el(id).value = 100;
+  programar();
+});
+dibujar();
+</script>
+</body>
+</html>
+"""
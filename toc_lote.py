@@ -0,0 +1,360 @@
+import numpy as np
+
+from toc_dados import Jugador, LineaDeProduccion, PoliticaLiberacion
+from toc_estadistica import EstadisticoEnLinea, z_confianza
+
+# ----------------------------------------------------------------------
+## MOTOR VECTORIZADO: R LÍNEAS DE PRODUCCIÓN INDEPENDIENTES A LA VEZ
+# ----------------------------------------------------------------------
+
+class LineaDeProduccionLote:
+    """
+    Simula R réplicas independientes de una línea de producción del juego
+    de dados en una sola corrida.
+
+    Aplica exactamente las mismas reglas que `LineaDeProduccion.simular_turno`,
+    pero los lanzamientos y el inventario se guardan en arreglos de forma
+    (réplicas × estaciones), de modo que cada turno cuesta unas pocas
+    operaciones de NumPy por estación en lugar de un ciclo de Python por réplica.
+    """
+
+    def __init__(self, caras_dados: list[int], replicas: int = 1000,
+                 semilla=None, nombres: list[str] | None = None,
+                 politica: PoliticaLiberacion | None = None):
+        """
+        Inicializa el lote de líneas de producción.
+
+        Args:
+            caras_dados (list[int]): Número de caras del dado de cada estación,
+                                     en el orden en que operan en la línea.
+            replicas (int, optional): Número de líneas independientes (R). Por defecto 1000.
+            semilla (int | np.random.SeedSequence, optional): Semilla para
+                reproducir la corrida. Por defecto None (aleatoria).
+            nombres (list[str], optional): Nombres de las estaciones.
+            politica (PoliticaLiberacion, optional): Regla de liberación de
+                material y límites de WIP. Por defecto "push".
+        """
+        if not caras_dados:
+            raise ValueError("La línea debe tener al menos una estación.")
+        if min(caras_dados) < 1:
+            raise ValueError("El número de caras del dado no puede ser menor que 1.")
+        if replicas < 1:
+            raise ValueError("El número de réplicas debe ser al menos 1.")
+
+        self.caras_dados = np.asarray(caras_dados, dtype=np.int64)
+        self.replicas = replicas
+        self.nombres = list(nombres) if nombres else [f"Estación {i + 1}" for i in range(len(caras_dados))]
+        self.rng = np.random.default_rng(semilla)
+        self.politica = politica or PoliticaLiberacion()
+        self._tambor = self.politica.indice_tambor(self.nombres)
+        limites = self.politica.limites_kanban(len(caras_dados))
+        self._limites = None if limites is None else [None if np.isinf(l) else int(l) for l in limites]
+
+        # Estado de cada réplica: inventario por estación y producto terminado
+        self.inventario = np.zeros((replicas, len(caras_dados)), dtype=np.int64)
+        self.producto_terminado = np.zeros(replicas, dtype=np.int64)
+        # Unidades procesadas que esperan completar un lote de transferencia
+        self.en_lote = np.zeros((replicas, len(caras_dados)), dtype=np.int64)
+        self.turnos_simulados = 0
+        # Suma del WIP al final de cada turno (WIP promedio = suma / turnos)
+        self.suma_wip = np.zeros(replicas, dtype=np.int64)
+        # Suma de lanzamientos por réplica y estación (capacidad promedio real)
+        self.suma_lanzamientos = np.zeros((replicas, len(caras_dados)), dtype=np.int64)
+
+    @classmethod
+    def desde_linea(cls, linea: LineaDeProduccion, replicas: int = 1000, semilla=None):
+        """Construye un lote con la misma configuración que una `LineaDeProduccion`."""
+        return cls([e.caras_dado for e in linea.estaciones], replicas=replicas,
+                   semilla=semilla, nombres=[e.nombre for e in linea.estaciones], politica=linea.politica)
+
+    @property
+    def numero_estaciones(self) -> int:
+        return len(self.caras_dados)
+
+    def lanzar_dados(self) -> np.ndarray:
+        """
+        Lanza todos los dados de todas las réplicas para un turno.
+
+        Returns:
+            np.ndarray: Arreglo (réplicas × estaciones) con valores entre 1 y
+                        el número de caras de cada estación.
+        """
+        return self.rng.integers(1, self.caras_dados + 1,
+                                 size=(self.replicas, self.numero_estaciones))
+
+    def simular_turno(self, lanzamientos: np.ndarray | None = None):
+        """
+        Simula un único turno en todas las réplicas.
+
+        Args:
+            lanzamientos (np.ndarray, optional): Lanzamientos (réplicas × estaciones)
+                a usar en lugar de tirar los dados; sirve para reproducir
+                exactamente una corrida de la versión escalar.
+        """
+        if lanzamientos is None:
+            lanzamientos = self.lanzar_dados()
+        inventario = self.inventario
+        politica = self.politica
+
+        if politica.tipo == "push" and politica.lote_transferencia == 1:
+            # La primera estación tiene materia prima infinita: procesa todo su lanzamiento.
+            inventario[:, 0] += lanzamientos[:, 0]
+            for i in range(1, self.numero_estaciones):
+                unidades_a_procesar = np.minimum(lanzamientos[:, i], inventario[:, i - 1])
+                inventario[:, i] += unidades_a_procesar
+                inventario[:, i - 1] -= unidades_a_procesar
+        else:
+            self._turno_con_politica(lanzamientos)
+
+        # El inventario de la última estación pasa a ser producto terminado.
+        self.producto_terminado += inventario[:, -1]
+        inventario[:, -1] = 0
+
+        self.suma_lanzamientos += lanzamientos
+        self.suma_wip += self.wip()
+        self.turnos_simulados += 1
+
+    def _turno_con_politica(self, lanzamientos: np.ndarray):
+        """Mismas reglas que `LineaDeProduccion.simular_turno` con liberación, kanban y lotes."""
+        inventario, en_lote = self.inventario, self.en_lote
+        lote = self.politica.lote_transferencia
+
+        # Materia prima liberada por réplica (None: ilimitada)
+        liberacion = None
+        if self.politica.tipo == "dbr":
+            wip = inventario[:, :self._tambor].sum(axis=1) + en_lote[:, :self._tambor].sum(axis=1)
+            liberacion = np.maximum(0, self.politica.limite - wip)
+        elif self.politica.tipo == "conwip":
+            liberacion = np.maximum(0, self.politica.limite - self.wip())
+
+        for i in range(self.numero_estaciones):
+            unidades_a_procesar = lanzamientos[:, i]
+            if i > 0:
+                unidades_a_procesar = np.minimum(unidades_a_procesar, inventario[:, i - 1])
+            elif liberacion is not None:
+                unidades_a_procesar = np.minimum(unidades_a_procesar, liberacion)
+            if self._limites is not None and self._limites[i] is not None:
+                espacio = self._limites[i] - inventario[:, i] - en_lote[:, i]
+                unidades_a_procesar = np.minimum(unidades_a_procesar, np.maximum(0, espacio))
+
+            if lote == 1:
+                inventario[:, i] += unidades_a_procesar
+            else:
+                en_lote[:, i] += unidades_a_procesar
+                transferido = en_lote[:, i] // lote * lote
+                inventario[:, i] += transferido
+                en_lote[:, i] -= transferido
+            if i > 0:
+                inventario[:, i - 1] -= unidades_a_procesar
+
+    def simular_jornada(self, numero_de_turnos: int):
+        """
+        Simula una jornada completa en todas las réplicas.
+
+        Args:
+            numero_de_turnos (int): El número de turnos que componen la jornada.
+        """
+        for _ in range(numero_de_turnos):
+            self.simular_turno()
+
+    def semiancho_throughput(self, confianza: float = 0.95) -> float:
+        """Semiancho del intervalo de confianza del throughput medio entre réplicas."""
+        if self.replicas < 2 or not self.turnos_simulados:
+            return float('inf')
+        throughput = self.producto_terminado / self.turnos_simulados
+        return z_confianza(confianza) * float(throughput.std(ddof=1)) / np.sqrt(self.replicas)
+
+    def simular_hasta_precision(self, epsilon: float, confianza: float = 0.95, turnos_bloque: int = 100,
+                                max_turnos: int = 1_000_000) -> int:
+        """
+        Simula bloques de turnos hasta que el intervalo de confianza del
+        throughput medio (entre réplicas) tenga un semiancho menor que `epsilon`.
+
+        Returns:
+            int: Turnos simulados en esta llamada.
+        """
+        if epsilon <= 0:
+            raise ValueError("La precisión (epsilon) debe ser mayor que 0.")
+        turnos = 0
+        while turnos < max_turnos:
+            self.simular_jornada(turnos_bloque)
+            turnos += turnos_bloque
+            if self.semiancho_throughput(confianza) < epsilon:
+                break
+        return turnos
+
+    def simular_lanzamientos(self, lanzamientos: np.ndarray):
+        """
+        Simula una secuencia de turnos con lanzamientos ya conocidos.
+
+        Args:
+            lanzamientos (np.ndarray): Arreglo (turnos × réplicas × estaciones).
+        """
+        lanzamientos = np.asarray(lanzamientos, dtype=np.int64)
+        if lanzamientos.ndim != 3 or lanzamientos.shape[1:] != self.inventario.shape:
+            raise ValueError(f"Se esperaba un arreglo (turnos, {self.replicas}, {self.numero_estaciones}), "
+                             f"se recibió {lanzamientos.shape}.")
+        for lanzamientos_turno in lanzamientos:
+            self.simular_turno(lanzamientos_turno)
+
+    def wip(self) -> np.ndarray:
+        """Inventario en proceso total de cada réplica (incluye lo que espera un lote de transferencia)."""
+        return self.inventario.sum(axis=1) + self.en_lote.sum(axis=1)
+
+    def resultados(self) -> dict:
+        """
+        Totales por réplica, equivalentes a los de `LineaDeProduccion`.
+
+        Returns:
+            dict: 'producto_terminado' (R,), 'inventario' (R × estaciones),
+                  'wip_total' (R,), 'wip_promedio' (R,, WIP promedio al
+                  final de cada turno), 'throughput' (R,, producto terminado
+                  por turno) y 'capacidad_promedio' (R × estaciones).
+        """
+        turnos = max(self.turnos_simulados, 1)
+        return {
+            'producto_terminado': self.producto_terminado.copy(),
+            'inventario': self.inventario + self.en_lote,
+            'wip_total': self.wip(),
+            'wip_promedio': self.suma_wip / turnos,
+            'throughput': self.producto_terminado / turnos,
+            'capacidad_promedio': self.suma_lanzamientos / turnos,
+        }
+
+    def resumen(self) -> str:
+        """Resumen en texto de las medias entre réplicas."""
+        res = self.resultados()
+        lineas = [f"=== RESULTADOS DE {self.replicas} RÉPLICAS ({self.turnos_simulados} turnos) ===",
+                  f"Producto Terminado promedio: {res['producto_terminado'].mean():.2f} "
+                  f"(desv. est. {res['producto_terminado'].std(ddof=1) if self.replicas > 1 else 0.0:.2f})",
+                  "Inventario final promedio por estación (WIP):"]
+        for nombre, wip in zip(self.nombres, res['inventario'].mean(axis=0)):
+            lineas.append(f"  - {nombre}: {wip:.2f}")
+        lineas.append(f"Total WIP promedio: {res['wip_total'].mean():.2f}")
+        return "\n".join(lineas)
+
+
+def comparar_con_escalar(caras_dados: list[int], numero_de_turnos: int = 20, semilla: int = 0,
+                         politica: PoliticaLiberacion | None = None) -> bool:
+    """
+    Verifica que el motor vectorizado reproduce la versión escalar.
+
+    Corre una `LineaDeProduccion` con `random` sembrado, reutiliza sus
+    lanzamientos en un lote de una réplica y compara los totales.
+
+    Returns:
+        bool: True si producto terminado e inventario por estación coinciden.
+    """
+    import random
+    random.seed(semilla)
+    linea = LineaDeProduccion([Jugador(f"Estación {i + 1}", c) for i, c in enumerate(caras_dados)],
+                              politica=politica)
+    for _ in range(numero_de_turnos):
+        linea.simular_turno()
+
+    lanzamientos = np.array([e.historial_lanzamientos for e in linea.estaciones]).T[:, None, :]
+    lote = LineaDeProduccionLote(caras_dados, replicas=1, politica=politica)
+    lote.simular_lanzamientos(lanzamientos)
+
+    return (int(lote.producto_terminado[0]) == linea.producto_terminado and
+            lote.inventario[0].tolist() == [e.inventario for e in linea.estaciones] and
+            lote.en_lote[0].tolist() == [e.en_lote for e in linea.estaciones])
+
+
+def replicar_hasta_precision(caras_dados: list[int], epsilon: float, numero_de_turnos: int,
+                             confianza: float = 0.95, bloque_replicas: int = 1000,
+                             max_replicas: int = 1_000_000, semilla=None,
+                             politica: PoliticaLiberacion | None = None) -> dict:
+    """
+    Agrega bloques de réplicas hasta que el intervalo de confianza del
+    throughput por turno tenga un semiancho menor que `epsilon`.
+
+    Cada bloque es un `LineaDeProduccionLote` con su propio flujo aleatorio
+    (`SeedSequence.spawn`); sus resultados se unen en acumuladores en línea,
+    sin guardar las réplicas anteriores.
+
+    Returns:
+        dict: 'throughput' y 'wip_promedio' (`EstadisticoEnLinea` sobre las
+        réplicas), 'replicas' usadas y 'semiancho' alcanzado.
+    """
+    if epsilon <= 0:
+        raise ValueError("La precisión (epsilon) debe ser mayor que 0.")
+    semilla = semilla if isinstance(semilla, np.random.SeedSequence) else np.random.SeedSequence(semilla)
+    throughput, wip = EstadisticoEnLinea(), EstadisticoEnLinea()
+    while throughput.n < max_replicas:
+        lote = LineaDeProduccionLote(caras_dados, replicas=min(bloque_replicas, max_replicas - throughput.n),
+                                     semilla=semilla.spawn(1)[0], politica=politica)
+        lote.simular_jornada(numero_de_turnos)
+        res = lote.resultados()
+        throughput.agregar_muestras(res['throughput'])
+        wip.agregar_muestras(res['wip_promedio'])
+        if throughput.semiancho(confianza) < epsilon:
+            break
+    return {'throughput': throughput, 'wip_promedio': wip, 'replicas': throughput.n,
+            'semiancho': throughput.semiancho(confianza)}
+
+
+def comparar_politicas(caras_dados: list[int], politicas: dict, numero_de_turnos: int = 1000,
+                       replicas: int = 1000, semilla: int | None = None,
+                       nombres: list[str] | None = None) -> dict:
+    """
+    Simula la misma línea con cada política y compara throughput contra WIP.
+
+    Todas las políticas usan la misma semilla, es decir, los mismos
+    lanzamientos de dados (números aleatorios comunes): las diferencias entre
+    políticas no se deben al azar del muestreo.
+
+    Args:
+        caras_dados (list[int]): Caras del dado de cada estación.
+        politicas (dict): Nombre -> `PoliticaLiberacion`.
+        numero_de_turnos (int, optional): Turnos por réplica. Por defecto 1000.
+        replicas (int, optional): Réplicas por política. Por defecto 1000.
+        semilla (int, optional): Semilla común a todas las políticas.
+        nombres (list[str], optional): Nombres de las estaciones.
+
+    Returns:
+        dict: Nombre -> 'throughput' y 'wip_promedio' (medias entre réplicas),
+        'throughput_desv' y 'wip_desv' (desviaciones estándar).
+    """
+    semilla = np.random.SeedSequence(semilla)
+    comparacion = {}
+    for nombre, politica in politicas.items():
+        lote = LineaDeProduccionLote(caras_dados, replicas=replicas, semilla=semilla,
+                                     nombres=nombres, politica=politica)
+        lote.simular_jornada(numero_de_turnos)
+        res = lote.resultados()
+        comparacion[nombre] = {
+            'throughput': float(res['throughput'].mean()),
+            'throughput_desv': float(res['throughput'].std(ddof=1)) if replicas > 1 else 0.0,
+            'wip_promedio': float(res['wip_promedio'].mean()),
+            'wip_desv': float(res['wip_promedio'].std(ddof=1)) if replicas > 1 else 0.0,
+        }
+    return comparacion
+
+
+if __name__ == '__main__':
+    # Mismo escenario con cuello de botella que toc_dados.py, ahora con 10,000 réplicas.
+    politicas = {
+        "push": PoliticaLiberacion(),
+        "dbr (buffer 8)": PoliticaLiberacion("dbr", limite=8, tambor="Operario C (Lento)"),
+        "conwip (12)": PoliticaLiberacion("conwip", limite=12),
+        "kanban (3 por estación)": PoliticaLiberacion("kanban", limite=3),
+        "push, lotes de 4": PoliticaLiberacion(lote_transferencia=4),
+    }
+    print(">>> Verificación contra la versión escalar:",
+          all(comparar_con_escalar([8, 8, 4, 8, 8], 50, semilla=s,
+                                   politica=PoliticaLiberacion(p.tipo, p.limite, 2 if p.tambor else None,
+                                                               p.lote_transferencia))
+              for s in range(20) for p in politicas.values()))
+
+    lote = LineaDeProduccionLote([8, 8, 4, 8, 8], replicas=10_000, semilla=42,
+                                 nombres=["Operario A", "Operario B", "Operario C (Lento)",
+                                          "Operario D", "Operario E"])
+    lote.simular_jornada(numero_de_turnos=1000)
+    print(lote.resumen())
+
+    print("\n>>> Throughput contra WIP por política (10,000 réplicas x 1000 turnos)")
+    nombres = ["Operario A", "Operario B", "Operario C (Lento)", "Operario D", "Operario E"]
+    for nombre, res in comparar_politicas([8, 8, 4, 8, 8], politicas, 1000, replicas=10_000,
+                                          semilla=42, nombres=nombres).items():
+        print(f"  - {nombre:<24} throughput {res['throughput']:.3f} por turno, WIP promedio {res['wip_promedio']:.2f}")
@@ -0,0 +1,238 @@
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+# ----------------------------------------------------------------------
+## MÉTRICAS DE EJECUCIÓN: ETAPAS, MEMORIA, CONTADORES Y PERFILADO
+# ----------------------------------------------------------------------
+# `Metrics` registra la duración de cada etapa (span), el pico de memoria
+# opcional (tracemalloc) y contadores, y los exporta como JSON o como
+# archivo de texto de Prometheus (node_exporter, textfile collector).
+# Si las métricas están desactivadas se usa `DISABLED`, cuyos métodos no
+# hacen nada: el costo en toc_tool es una llamada vacía por etapa.
+# Solo usa la biblioteca estándar, para no encarecer el arranque.
+
+METRIC_FORMATS = ("json", "prometheus")
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class Metrics:
+    """
+    Métricas de una ejecución.
+
+        metrics = Metrics(labels={"file": "textiles.yml"}, memory=True)
+        with metrics.span("carga"):
+            catalog = load_catalog_from_file(...)
+        metrics.count("productos", len(catalog.product_names))
+        metrics.write("metricas.prom")
+
+    Las etapas anidadas se nombran con su ruta ("analisis.reportes"). Una
+    etapa repetida acumula su tiempo y cuenta las veces que se ejecutó.
+    """
+
+    enabled = True
+
+    def __init__(self, labels=None, memory=False):
+        self.labels = dict(labels or {})
+        self.memory = memory
+        self.spans = {}
+        self.counters = {}
+        self.gauges = {}
+        self._stack = []
+        self._peaks = []
+        self._start = time.perf_counter()
+        self._own_tracemalloc = False
+        if memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Mide el tiempo (y el pico de memoria, si memory=True) del bloque."""
+        self._stack.append(name)
+        full_name = ".".join(self._stack)
+        if self.memory:
+            import tracemalloc
+            # El pico se reinicia por etapa; el que ya alcanzó la etapa contenedora se guarda en su nivel
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            self._peaks.append(0)
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - start
+            span = self.spans.setdefault(full_name, {"seconds": 0.0, "calls": 0, "peak_bytes": None})
+            span["seconds"] += seconds
+            span["calls"] += 1
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1], self._peaks.pop())
+                span["peak_bytes"] = max(span["peak_bytes"] or 0, peak)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                tracemalloc.reset_peak()
+            self._stack.pop()
+
+    def count(self, name, value=1):
+        """Suma `value` al contador `name`."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        """Fija el valor de una medida instantánea."""
+        self.gauges[name] = value
+
+    def close(self):
+        """Registra el tiempo total y la memoria máxima del proceso, y detiene tracemalloc si lo inició."""
+        self.gauges["total_seconds"] = time.perf_counter() - self._start
+        try:
+            import resource
+            # ru_maxrss está en KB en Linux y en bytes en macOS
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.gauges["max_rss_bytes"] = rss if os.uname().sysname == "Darwin" else rss * 1024
+        except (ImportError, AttributeError):
+            pass
+        if self._own_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+        return self
+
+    def as_dict(self):
+        """Métricas como diccionario serializable a JSON."""
+        return {"labels": self.labels, "spans": self.spans, "counters": self.counters, "gauges": self.gauges}
+
+    def write(self, path, fmt=None):
+        """Escribe las métricas; el formato sale de la extensión (.prom = Prometheus) si no se indica."""
+        write_metrics(path, [self.as_dict()], fmt)
+
+
+class _DisabledMetrics:
+    """Métricas desactivadas: misma interfaz que `Metrics`, sin registrar nada."""
+
+    enabled = False
+    _null_span = contextlib.nullcontext()
+
+    def span(self, name):
+        return self._null_span
+
+    def count(self, name, value=1):
+        pass
+
+    def gauge(self, name, value):
+        pass
+
+    def close(self):
+        return self
+
+    def as_dict(self):
+        return None
+
+
+DISABLED = _DisabledMetrics()
+
+# ----------------------------------------------------------------------
+## EXPORTACIÓN: JSON Y ARCHIVO DE TEXTO DE PROMETHEUS
+# ----------------------------------------------------------------------
+
+def _prometheus_labels(labels):
+    """Etiquetas {k="v",...}; en los valores se escapan la barra invertida, las comillas y los saltos de línea."""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def to_prometheus(runs, prefix="toc"):
+    """
+    Texto en el formato de exposición de Prometheus para una o varias
+    ejecuciones (`Metrics.as_dict()`); las etiquetas distinguen cada archivo.
+    """
+    series = {
+        f"{prefix}_stage_seconds": ("gauge", "Duración de cada etapa de toc_tool en segundos.", []),
+        f"{prefix}_stage_calls": ("gauge", "Veces que se ejecutó cada etapa.", []),
+        f"{prefix}_stage_peak_bytes": ("gauge", "Pico de memoria de Python (tracemalloc) en cada etapa.", []),
+        f"{prefix}_count": ("gauge", "Contadores de la ejecución (productos, recursos, iteraciones...).", []),
+        f"{prefix}_run": ("gauge", "Medidas de la ejecución completa (tiempo total, memoria máxima).", []),
+    }
+    for run in runs:
+        labels = run["labels"]
+        for stage, span in run["spans"].items():
+            stage_labels = _prometheus_labels({**labels, "stage": stage})
+            series[f"{prefix}_stage_seconds"][2].append(f"{prefix}_stage_seconds{stage_labels} {span['seconds']:.6f}")
+            series[f"{prefix}_stage_calls"][2].append(f"{prefix}_stage_calls{stage_labels} {span['calls']}")
+            if span["peak_bytes"] is not None:
+                series[f"{prefix}_stage_peak_bytes"][2].append(
+                    f"{prefix}_stage_peak_bytes{stage_labels} {span['peak_bytes']}")
+        for name, value in run["counters"].items():
+            series[f"{prefix}_count"][2].append(f"{prefix}_count{_prometheus_labels({**labels, 'name': name})} {value}")
+        for name, value in run["gauges"].items():
+            series[f"{prefix}_run"][2].append(f"{prefix}_run{_prometheus_labels({**labels, 'name': name})} {value}")
+
+    lines = []
+    for metric, (kind, help_text, samples) in series.items():
+        if samples:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", *samples]
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path, runs, fmt=None):
+    """
+    Escribe las métricas de una o varias ejecuciones en JSON o en formato
+    Prometheus. La escritura es atómica (archivo temporal y renombrado),
+    porque el textfile collector puede leer el archivo en cualquier momento.
+    """
+    fmt = fmt or ("prometheus" if path.endswith(".prom") else "json")
+    if fmt not in METRIC_FORMATS:
+        raise ValueError(f"Formato de métricas desconocido: '{fmt}'. Opciones: {', '.join(METRIC_FORMATS)}")
+    runs = [r for r in runs if r]
+    text = to_prometheus(runs) if fmt == "prometheus" else json.dumps(runs, ensure_ascii=False, indent=2)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".metricas-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# ----------------------------------------------------------------------
+## PERFILADO OPCIONAL (cProfile o pyinstrument)
+# ----------------------------------------------------------------------
+
+@contextlib.contextmanager
+def profile(profiler, output_path):
+    """
+    Perfila el bloque con cProfile (estadísticas en `output_path`, legibles
+    con pstats o snakeviz) o con pyinstrument (reporte HTML en `output_path`).
+    Con profiler=None no hace nada.
+    """
+    if profiler is None:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Perfilador desconocido: '{profiler}'. Opciones: {', '.join(PROFILERS)}")
+
+    if profiler == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(output_path)
+    else:
+        from pyinstrument import Profiler
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
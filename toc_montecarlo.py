@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from toc_optimize import TocModel
+from toc_read import load_catalog_from_file
+
+# ----------------------------------------------------------------------
+## MONTE CARLO DE LA MEZCLA CON DEMANDA Y DISPONIBILIDAD INCIERTAS
+# ----------------------------------------------------------------------
+# Cada muestra sortea la demanda de los productos con 'demanda_dist' y la
+# disponibilidad (%) de los recursos de la sección 'disponibilidad', y
+# resuelve la mezcla con el mismo algoritmo voraz de toc_optimize
+# (explotación por T/C y subordinación). Las muestras se resuelven en
+# bloque: las que comparten restricción comparten el orden por T/C, así
+# que el recorrido por productos se hace una vez por grupo con operaciones
+# vectoriales sobre todas sus muestras.
+
+TAMANO_BLOQUE = 10_000
+PERCENTILES = (5, 25, 50, 75, 95)
+SIN_RESTRICCION = "(sin restricción)"
+
+# Modelo de cada proceso trabajador (se construye una sola vez por proceso)
+_MODELO = None
+
+
+def _sortear(rng, spec, n):
+    """Sortea n valores de una distribución normalizada por toc_read."""
+    tipo = spec["tipo"]
+    if tipo == "fija":
+        return np.full(n, float(spec["media"]))
+    if tipo == "normal":
+        return rng.normal(spec["media"], spec["desv"], n)
+    if tipo == "triangular":
+        if spec["min"] == spec["max"]:
+            return np.full(n, float(spec["min"]))
+        return rng.triangular(spec["min"], spec["moda"], spec["max"], n)
+    if tipo == "poisson":
+        return rng.poisson(spec["media"], n).astype(float)
+    return rng.uniform(spec["min"], spec["max"], n)
+
+
+def sortear_muestras(catalog, n, rng):
+    """
+    Sortea n escenarios de la planta.
+
+    Returns:
+        tuple: demanda (n x productos, entera y no negativa) y capacidad
+        (n x recursos, minutos disponibles según la disponibilidad sorteada).
+    """
+    demand = np.tile(np.asarray(catalog.demand), (n, 1))
+    if catalog.demand_dist:
+        demand = demand.astype(np.int64) if demand.dtype.kind == "i" else demand.round().astype(np.int64)
+        for p, spec in catalog.demand_dist.items():
+            demand[:, p] = np.maximum(0, np.rint(_sortear(rng, spec, n)))
+
+    capacity = np.tile(np.asarray(catalog.capacity, dtype=float), (n, 1))
+    for r, spec in catalog.availability.items():
+        capacity[:, r] *= np.clip(_sortear(rng, spec, n), 0, 100) / 100
+    return demand, capacity
+
+
+def resolver_muestras(modelo, demand, capacity):
+    """
+    Resuelve la mezcla (greedy) de cada muestra.
+
+    Args:
+        modelo (TocModel): Modelo de la planta (aporta la matriz de consumo,
+            el throughput unitario y el orden por T/C de cada restricción).
+        demand (np.ndarray): Demanda por muestra (n x productos).
+        capacity (np.ndarray): Capacidad por muestra (n x recursos).
+
+    Returns:
+        tuple: índice de la restricción (-1 si no hay) y throughput total de cada muestra.
+    """
+    matrix = modelo.matrix
+    n = len(demand)
+    T = matrix.throughput.astype(float)
+
+    # Restricción de cada muestra: recurso con el mayor factor de carga
+    consumption = np.asarray(matrix.to_sparse() @ demand.T, dtype=float).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = np.where(capacity > 0, consumption / np.where(capacity > 0, capacity, 1),
+                           np.where(consumption > 0, np.inf, 0))
+    bottleneck = factors.argmax(axis=1)
+    has_bottleneck = factors[np.arange(n), bottleneck] > 1.0
+
+    # Sin restricción se produce la demanda completa
+    throughput = demand @ T
+    rows = modelo.relevant_rows()
+
+    for b in np.unique(bottleneck[has_bottleneck]).tolist():
+        grupo = np.flatnonzero(has_bottleneck & (bottleneck == b))
+        C, _, order = modelo.priority_order(b)
+        # Productos y recursos por filas: cada fila es un vector sobre las muestras del grupo
+        demand_g = demand[grupo].T.astype(float)
+        capacity_g = capacity[grupo].T.copy()
+
+        # 4a. Explotación: capacidad de la restricción asignada por prioridad T/C
+        remaining = capacity_g[b].copy()
+        allocated = np.empty_like(demand_g)
+        for p, time_per_unit in zip(order.tolist(), C[order].tolist()):
+            if time_per_unit > 0:
+                units = np.minimum(demand_g[p], np.floor_divide(remaining, time_per_unit))
+                remaining -= units * time_per_unit
+            else:
+                units = demand_g[p]
+            allocated[p] = units
+
+        # 4b. Subordinación a los demás recursos, en el mismo orden
+        units_g = np.empty_like(demand_g)
+        for p in order.tolist():
+            res_idx, times = rows[p]
+            units = allocated[p]
+            for r, t in zip(res_idx, times):
+                units = np.minimum(units, np.floor_divide(capacity_g[r], t))
+            for r, t in zip(res_idx, times):
+                capacity_g[r] -= units * t
+            units_g[p] = units
+
+        throughput[grupo] = T @ units_g
+
+    return np.where(has_bottleneck, bottleneck, -1), throughput
+
+
+def _iniciar_trabajador(catalog):
+    global _MODELO
+    _MODELO = TocModel(catalog)
+
+
+def _simular_bloque(tarea):
+    """Sortea y resuelve un bloque de muestras en un proceso trabajador."""
+    n, semilla = tarea
+    modelo = _MODELO
+    demand, capacity = sortear_muestras(modelo.matrix.catalog, n, np.random.default_rng(semilla))
+    return resolver_muestras(modelo, demand, capacity)
+
+
+def montecarlo(datos, muestras=10_000, semilla=None, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Resuelve la mezcla sobre `muestras` escenarios de demanda y disponibilidad.
+
+    Las muestras se reparten en bloques de `tamano_bloque`, cada uno con su
+    propio flujo aleatorio derivado con `SeedSequence.spawn`, de modo que los
+    resultados no dependen del número de procesos.
+
+    Args:
+        datos (dict | TocCatalog): Datos de la planta (con 'demanda_dist' y/o 'disponibilidad').
+        muestras (int, optional): Número de muestras. Por defecto 10,000.
+        semilla (int, optional): Semilla maestra.
+        procesos (int, optional): Procesos trabajadores. Por defecto, todos los núcleos.
+        tamano_bloque (int, optional): Muestras por bloque.
+
+    Returns:
+        dict: 'restriccion' (nombre por muestra), 'throughput_total' y
+        'utilidad_neta' (arreglos por muestra), 'frecuencia_restriccion' y
+        'percentiles' (tablas resumen).
+    """
+    modelo = TocModel(datos)
+    catalog = modelo.matrix.catalog
+    tamanos = [tamano_bloque] * (muestras // tamano_bloque)
+    if muestras % tamano_bloque:
+        tamanos.append(muestras % tamano_bloque)
+    tareas = list(zip(tamanos, np.random.SeedSequence(semilla).spawn(len(tamanos))))
+
+    procesos = min(procesos or os.cpu_count() or 1, max(1, len(tareas)))
+    if procesos == 1:
+        global _MODELO
+        _MODELO = modelo
+        bloques = [_simular_bloque(t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(catalog,)) as pool:
+            bloques = list(pool.map(_simular_bloque, tareas))
+
+    bottleneck = np.concatenate([b for b, _ in bloques])
+    throughput = np.concatenate([t for _, t in bloques])
+    net_profit = throughput - sum(modelo.operating_expenses.values())
+    return {
+        'restriccion': bottleneck,
+        'throughput_total': throughput,
+        'utilidad_neta': net_profit,
+        'frecuencia_restriccion': frecuencia_restriccion(bottleneck, catalog.resource_names),
+        'percentiles': bandas_percentiles({'throughput_total': throughput, 'utilidad_neta': net_profit}),
+    }
+
+
+def frecuencia_restriccion(bottleneck, resource_names):
+    """Veces (y fracción de las muestras) que cada recurso resultó ser la restricción."""
+    veces = np.bincount(bottleneck + 1, minlength=len(resource_names) + 1)
+    tabla = pd.DataFrame({'recurso': [SIN_RESTRICCION] + [str(r) for r in resource_names],
+                          'veces': veces, 'frecuencia': veces / max(1, len(bottleneck))})
+    return tabla[tabla['veces'] > 0].sort_values('veces', ascending=False).reset_index(drop=True)
+
+
+def bandas_percentiles(series):
+    """Media y percentiles (P5 a P95) de cada serie."""
+    filas = []
+    for nombre, valores in series.items():
+        fila = {'medida': nombre, 'media': float(valores.mean())}
+        fila.update({f"p{q}": v for q, v in zip(PERCENTILES, np.percentile(valores, PERCENTILES).tolist())})
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+# ----------------------------------------------------------------------
+## EJECUCIÓN DEL PROGRAMA
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo de la mezcla TOC con demanda y disponibilidad inciertas.")
+    parser.add_argument("archivo", help="Archivo YAML (o .npz columnar) con 'demanda_dist' y/o 'disponibilidad'.")
+    parser.add_argument("--muestras", type=int, default=10_000, help="Número de muestras.")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla maestra.")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores.")
+    parser.add_argument("--salida", default=None, help="Guarda cada muestra en un CSV (restricción, throughput, utilidad).")
+    args = parser.parse_args()
+
+    catalog = load_catalog_from_file(args.archivo)
+    if not catalog.demand_dist and not catalog.availability:
+        print("⚠️ El archivo no define 'demanda_dist' ni 'disponibilidad': todas las muestras son iguales.")
+    print(f">>> Monte Carlo de {args.muestras} muestras ({len(catalog.demand_dist)} demandas y "
+          f"{len(catalog.availability)} disponibilidades inciertas)")
+    inicio = time.perf_counter()
+    res = montecarlo(catalog, muestras=args.muestras, semilla=args.semilla, procesos=args.procesos)
+    print(f"Tiempo: {time.perf_counter() - inicio:.2f} s\n")
+
+    print("Frecuencia de cada recurso como restricción:")
+    print(res['frecuencia_restriccion'].to_string(index=False, float_format='%.3f') + "\n")
+    print("Bandas de percentiles:")
+    print(res['percentiles'].to_string(index=False, float_format='%.2f'))
+
+    if args.salida:
+        names = np.array([SIN_RESTRICCION] + [str(r) for r in catalog.resource_names])
+        pd.DataFrame({'restriccion': names[res['restriccion'] + 1],
+                      'throughput_total': res['throughput_total'],
+                      'utilidad_neta': res['utilidad_neta']}).to_csv(args.salida, index=False, float_format='%.2f')
+        print(f"\nMuestras guardadas en: {args.salida}")
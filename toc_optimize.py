@@ -1,184 +1,857 @@
 import os
+import numpy as np
 import pandas as pd
 
+from toc_read import TocCatalog
+
+# Modos de solución disponibles para la mezcla de productos
+SOLVER_MODES = ("greedy", "lp", "mip")
+
 # ----------------------------------------------------------------------
-## FUNCIÓN PRINCIPAL: EJECUCIÓN DEL ANÁLISIS TOC (VERSION FINAL)
+## FUNCIÓN HELPER: MATRIZ DE CONSUMO PRODUCTO x RECURSO
 # ----------------------------------------------------------------------
 
-def run_toc_analysis(datos, output_csv_file, output_txt_file, input_filename="Datos en Memoria"):
+class ConsumptionMatrix:
     """
-    Ejecuta el análisis TOC completo, manejando la asignación de recursos
-    con y sin la restricción principal para una asignación más precisa.
-    Recibe el diccionario de datos ya cargado.
-    """
-    
-    # 1. Cargar datos (YA RECIBIDOS COMO ARGUMENTO)
-    # datos = load_data_from_file(file_to_load)
-
-    # 2. Identificar la Restricción Global (Cálculo de Consumo Total)
-    resource_consumption = {r: 0 for r in datos["recursos"]}
-    resource_factors = {}
-    
-    for prod_name, prod_data in datos["productos"].items():
-        for res_name, time_per_unit in prod_data["recursos"].items():
-            resource_consumption[res_name] += prod_data["demanda"] * time_per_unit
-
-    max_factor = 0
-    global_bottleneck = None
-    
-    for res_name, capacity in datos["recursos"].items():
-        consumed = resource_consumption[res_name]
-        factor_carga = consumed / capacity
-        resource_factors[res_name] = factor_carga
-        
-        if factor_carga > max_factor:
-            max_factor = factor_carga
-            global_bottleneck = res_name
-            
-    has_bottleneck = max_factor > 1.0
-    global_bottleneck = global_bottleneck if has_bottleneck else max(resource_factors, key=resource_factors.get)
-
-    # 3. PREPARACIÓN DEL DATAFRAME y CÁLCULO T/C
-    optimization_data = []
-    
-    for prod_name, prod_data in datos["productos"].items():
-        precio = prod_data.get("precio") or prod_data.get("precio_venta", 0)
-        T = precio - prod_data["costo_ventas"]
-        
+    Matriz de consumo producto x recurso construida una sola vez a partir de
+    `datos` (diccionario) o de un `TocCatalog` ya validado.
+
+    Se guarda por filas en formato disperso (CSR: indptr, indices, times), de
+    modo que el consumo de cada producto se lee como dos rebanadas de arreglos
+    en lugar de volver a recorrer `datos['productos'][...]['recursos']`.
+    También guarda los vectores de capacidad, demanda y throughput unitario.
+    """
+
+    def __init__(self, datos):
+        catalog = datos if isinstance(datos, TocCatalog) else TocCatalog.from_datos(datos)
+        self.catalog = catalog
+        self.resource_names = catalog.resource_names
+        self.product_names = catalog.product_names
+
+        # Los arreglos del catálogo ya son enteros ('q') o flotantes ('d'), igual que la inferencia de pandas
+        self.indptr = np.asarray(catalog.indptr, dtype=np.int64)
+        self.indices = np.asarray(catalog.indices, dtype=np.int64)
+        self.times = np.asarray(catalog.times)
+        self.capacity = np.asarray(catalog.capacity)
+        self.demand = np.asarray(catalog.demand)
+        self.throughput = np.asarray(catalog.price) - np.asarray(catalog.cost)
+        # Fila del producto de cada entrada (para operaciones por columna)
+        self.product_of_entry = np.repeat(np.arange(len(self.product_names)), np.diff(self.indptr))
+
+    def capacity_value(self, res_index):
+        """
+        Capacidad de un recurso con el tipo declarado en los datos (252 y no
+        252.0), o el valor actual si se modificó en un análisis "qué pasa si".
+        """
+        value = self.capacity[res_index].item()
+        declared = self.catalog.capacity_values[res_index]
+        return declared if value == declared else value
+
+    def row(self, prod_index):
+        """Índices de recurso y tiempos por unidad que consume un producto."""
+        start, end = self.indptr[prod_index], self.indptr[prod_index + 1]
+        return self.indices[start:end], self.times[start:end]
+
+    def resource_column(self, res_index):
+        """Tiempo por unidad de cada producto en un recurso (0 si no lo usa)."""
+        column = np.zeros(len(self.product_names), dtype=self.times.dtype)
+        mask = self.indices == res_index
+        column[self.product_of_entry[mask]] = self.times[mask]
+        return column
+
+    def resource_consumption(self, units):
+        """
+        Minutos consumidos en cada recurso para un vector de unidades por producto.
+        Se acumula en el orden de los productos, igual que la suma secuencial.
+        """
+        units = np.asarray(units)
+        consumption = np.zeros(len(self.resource_names),
+                               dtype=np.result_type(units, self.times, self.capacity))
+        np.add.at(consumption, self.indices, units[self.product_of_entry] * self.times)
+        return consumption
+
+    def to_sparse(self):
+        """Matriz recurso x producto en formato scipy.sparse (para el solver LP/MIP)."""
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.times, self.indices, self.indptr),
+                          shape=(len(self.product_names), len(self.resource_names))).T.tocsr()
+
+# ----------------------------------------------------------------------
+## FUNCIÓN HELPER: SOLUCIÓN EXACTA LP/MIP DE LA MEZCLA (HiGHS)
+# ----------------------------------------------------------------------
+
+def solve_product_mix(matrix, order=None, integer=False, time_limit=None):
+    """
+    Resuelve exactamente el problema de mezcla de productos multi-recurso:
+
+        max  sum_p T_p x_p
+        s.a. sum_p a_pr x_p <= capacidad_r   para cada recurso r
+             0 <= x_p <= demanda_p           (x_p entero si integer=True)
+
+    Usa HiGHS a través de scipy. Los precios sombra se obtienen de la
+    relajación continua (en modo MIP no existen duales del problema entero).
+
+    Returns:
+        dict | None: 'units' (lista en el orden de `order`, o de los productos
+        de `matrix` si es None), 'shadow_prices' (dict recurso -> valor por
+        unidad de capacidad) e 'iterations' (iteraciones del simplex o nodos
+        del branch and bound en modo MIP), o None si scipy no está disponible o el solver
+        no encontró solución.
+    """
+    try:
+        from scipy.optimize import linprog, milp, LinearConstraint, Bounds
+    except ImportError:
+        print("⚠️ scipy no está instalado; se usa el algoritmo voraz (greedy).")
+        return None
+
+    if order is None:
+        order = np.arange(len(matrix.product_names))
+    A = matrix.to_sparse()[:, order]
+    throughput = matrix.throughput[order].astype(float)
+    demand = matrix.demand[order].astype(float)
+    capacity = matrix.capacity.astype(float)
+
+    # Relajación continua: da la mezcla LP y los precios sombra
+    lp = linprog(-throughput, A_ub=A, b_ub=capacity, bounds=np.column_stack([np.zeros_like(demand), demand]),
+                 method="highs")
+    if lp.status != 0:
+        print(f"⚠️ El solver LP no encontró solución ({lp.message}); se usa el algoritmo voraz.")
+        return None
+    shadow_prices = dict(zip(matrix.resource_names, (-lp.ineqlin.marginals).tolist()))
+    units = lp.x
+    iterations = int(lp.nit)
+
+    if integer:
+        options = {"time_limit": time_limit} if time_limit else {}
+        mip = milp(-throughput, constraints=LinearConstraint(A, -np.inf, capacity),
+                   integrality=np.ones(len(order)), bounds=Bounds(0, demand), options=options)
+        if mip.x is None:
+            print(f"⚠️ El solver MIP no encontró solución ({mip.message}); se usa el algoritmo voraz.")
+            return None
+        units = np.round(mip.x).astype(int)
+        iterations = int(getattr(mip, "mip_node_count", 0) or 0)
+
+    return {"units": units.tolist(), "shadow_prices": shadow_prices, "iterations": iterations}
+
+# ----------------------------------------------------------------------
+## MODELO EN MEMORIA PARA ANÁLISIS "QUÉ PASA SI" (WHAT-IF)
+# ----------------------------------------------------------------------
+
+class TocResult:
+    """
+    Resultado liviano de `TocModel.solve()`: la mezcla, la restricción y las
+    finanzas, sin DataFrames ni archivos.
+
+    `units` y `priority` (T/C) están en el orden de los productos del
+    catálogo; `order` es el orden de la tabla de resultados (por prioridad si
+    hay restricción, el del catálogo si no la hay).
+    """
+
+    __slots__ = ("mode", "bottleneck", "bottleneck_index", "has_bottleneck", "max_factor",
+                 "bottleneck_capacity", "remaining_capacity", "units", "priority", "order",
+                 "total_throughput", "total_operating_expense", "net_profit", "shadow_prices", "iterations")
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def summary(self):
+        """Resumen como diccionario (el mismo que devuelve run_toc_analysis)."""
+        return {
+            "mode": self.mode,
+            "bottleneck": self.bottleneck,
+            "has_bottleneck": self.has_bottleneck,
+            "max_factor": self.max_factor,
+            "total_throughput": float(self.total_throughput),
+            "total_operating_expense": float(self.total_operating_expense),
+            "net_profit": float(self.net_profit),
+            "shadow_prices": self.shadow_prices,
+        }
+
+    def __repr__(self):
+        return (f"TocResult(mode={self.mode!r}, bottleneck={self.bottleneck!r}, "
+                f"has_bottleneck={self.has_bottleneck}, net_profit={float(self.net_profit):.2f})")
+
+
+class TocModel:
+    """
+    Modelo TOC construido una sola vez a partir de `datos` (o de un
+    `TocCatalog`) para responder preguntas "qué pasa si" sin volver a leer
+    archivos ni a recorrer todo el catálogo:
+
+        model = TocModel(datos)
+        model.scale_capacity("maquina_coser", 1.10)
+        model.set_demand("camisa_mujer", 2 * model.demand_of("camisa_mujer"))
+        result = model.solve()   # mezcla, restricción y utilidad neta
+
+    Solo se recalcula lo afectado por cada cambio: el consumo total por
+    recurso se actualiza con la fila del producto modificado, los factores de
+    carga se recalculan solo al resolver (un vector por recurso), y la columna
+    de la restricción y el orden por T/C se guardan por restricción hasta que
+    cambie un precio o un costo. Si nada cambió, `solve()` devuelve el último
+    resultado. La escritura de CSV/TXT es opcional (`write_reports`).
+    """
+
+    def __init__(self, datos, mode="greedy", time_limit=None):
+        if mode not in SOLVER_MODES:
+            raise ValueError(f"Modo de solución desconocido: '{mode}'. Opciones: {', '.join(SOLVER_MODES)}")
+        self.mode = mode
+        self.time_limit = time_limit
+        # La matriz es propia del modelo: sus vectores se modifican en cada cambio
+        matrix = ConsumptionMatrix(datos)
+        matrix.capacity = matrix.capacity.copy()
+        matrix.demand = matrix.demand.copy()
+        self.matrix = matrix
+        self.price = np.array(matrix.catalog.price)
+        self.cost = np.array(matrix.catalog.cost)
+        self.operating_expenses = dict(matrix.catalog.operating_expenses)
+
+        self.consumption = matrix.resource_consumption(matrix.demand)
+        self._priority_cache = {}
+        self._product_index = None
+        self._row_lists = None
+        self._result = None
+
+    # -- Búsqueda por nombre o posición --
+
+    def _resource(self, resource):
+        if isinstance(resource, (int, np.integer)):
+            return int(resource)
+        try:
+            return self.matrix.catalog.resource_index[str(resource)]
+        except KeyError:
+            raise KeyError(f"Recurso desconocido: '{resource}'.") from None
+
+    def _product(self, product):
+        if isinstance(product, (int, np.integer)):
+            return int(product)
+        if self._product_index is None:
+            # Solo se indexa por nombre la primera vez que se pide un producto por nombre
+            self._product_index = {str(name): i for i, name in enumerate(self.matrix.product_names)}
+        try:
+            return self._product_index[str(product)]
+        except KeyError:
+            raise KeyError(f"Producto desconocido: '{product}'.") from None
+
+    @staticmethod
+    def _assign(values, index, value):
+        """Asigna value en values[index]; pasa a flotante si value no cabe en un arreglo entero."""
+        if not np.can_cast(np.result_type(value), values.dtype, casting="safe"):
+            values = values.astype(np.result_type(values, value))
+        values[index] = value
+        return values
+
+    # -- Cambios "qué pasa si" --
+
+    def capacity_of(self, resource):
+        return self.matrix.capacity[self._resource(resource)].item()
+
+    def demand_of(self, product):
+        return self.matrix.demand[self._product(product)].item()
+
+    def price_of(self, product):
+        return self.price[self._product(product)].item()
+
+    def cost_of(self, product):
+        return self.cost[self._product(product)].item()
+
+    def set_capacity(self, resource, value):
+        """Cambia la capacidad (minutos) de un recurso."""
+        if value <= 0:
+            raise ValueError(f"La capacidad debe ser mayor que 0, se recibió {value}.")
+        self.matrix.capacity = self._assign(self.matrix.capacity, self._resource(resource), value)
+        self._result = None
+        return self
+
+    def scale_capacity(self, resource, factor):
+        """Multiplica la capacidad de un recurso (por ejemplo 1.10 = 10% más minutos)."""
+        return self.set_capacity(resource, self.capacity_of(resource) * factor)
+
+    def set_demand(self, product, value):
+        """Cambia la demanda de un producto y actualiza solo los recursos que consume."""
+        if value < 0:
+            raise ValueError(f"La demanda debe ser mayor o igual que 0, se recibió {value}.")
+        p = self._product(product)
+        delta = value - self.matrix.demand[p]
+        self.matrix.demand = self._assign(self.matrix.demand, p, value)
+        res_idx, times = self.matrix.row(p)
+        self.consumption = self.consumption.astype(np.result_type(self.consumption, delta * times), copy=False)
+        self.consumption[res_idx] += delta * times
+        self._result = None
+        return self
+
+    def set_price(self, product, value):
+        """Cambia el precio de venta de un producto (cambia su throughput y su T/C)."""
+        p = self._product(product)
+        self.price = self._assign(self.price, p, value)
+        self._update_throughput(p)
+        return self
+
+    def set_cost(self, product, value):
+        """Cambia el costo de ventas (totalmente variable) de un producto."""
+        p = self._product(product)
+        self.cost = self._assign(self.cost, p, value)
+        self._update_throughput(p)
+        return self
+
+    def _update_throughput(self, p):
+        self.matrix.throughput = self._assign(self.matrix.throughput, p, self.price[p] - self.cost[p])
+        # El orden por T/C depende del throughput: se recalcula en el próximo solve
+        self._priority_cache.clear()
+        self._result = None
+
+    def update(self, capacity=None, demand=None, price=None, cost=None):
+        """
+        Reemplaza vectores completos (por ejemplo, los datos de otro periodo)
+        sin reconstruir la matriz de consumo. Con `demand` el consumo por
+        recurso se recalcula en un solo paso sobre la matriz.
+        """
+        matrix = self.matrix
+        if capacity is not None:
+            capacity = np.asarray(capacity)
+            if (capacity <= 0).any():
+                raise ValueError("Las capacidades deben ser mayores que 0.")
+            matrix.capacity = capacity.copy()
+        if demand is not None:
+            demand = np.asarray(demand)
+            if (demand < 0).any():
+                raise ValueError("Las demandas deben ser mayores o iguales que 0.")
+            matrix.demand = demand.copy()
+            self.consumption = matrix.resource_consumption(matrix.demand)
+        if price is not None or cost is not None:
+            self.price = np.array(price) if price is not None else self.price
+            self.cost = np.array(cost) if cost is not None else self.cost
+            matrix.throughput = self.price - self.cost
+            self._priority_cache.clear()
+        self._result = None
+        return self
+
+    # -- Solución --
+
+    def load_factors(self):
+        """Factor de carga (consumo / capacidad) de cada recurso con los datos actuales."""
+        return self.consumption / self.matrix.capacity
+
+    def bottleneck(self):
+        """
+        Restricción global: el primer recurso con el factor de carga máximo
+        (como en el recorrido secuencial). La usan el reporte y el diagrama.
+
+        Returns:
+            tuple: (índice del recurso, factor de carga máximo, no menor que 0).
+        """
+        resource_factors = self.load_factors()
+        bottleneck_index = int(np.argmax(resource_factors))
+        return bottleneck_index, max(0, resource_factors[bottleneck_index].item())
+
+    def priority_order(self, bottleneck_index):
+        """Columna de la restricción, T/C y orden por prioridad (guardados por restricción)."""
+        cached = self._priority_cache.get(bottleneck_index)
+        if cached is not None:
+            return cached
+
+        T = self.matrix.throughput
         # El tiempo C siempre es respecto al RECURSO PRINCIPAL IDENTIFICADO
-        C = prod_data["recursos"].get(global_bottleneck, 0)
+        C = self.matrix.resource_column(bottleneck_index)
         # Si C=0 y T>0, T/C debe ser alto para priorizar (usamos T como proxy)
-        T_C = T / C if C > 0 else (T if T > 0 else 0) 
-        
-        # Solución al bug: Inicializar Produccion_Optima con la demanda si NO hay restricción.
-        units_to_produce = prod_data["demanda"] if not has_bottleneck else 0 
-        
-        optimization_data.append({
-            'Producto': prod_name,
-            'Throughput_Unitario (T)': T,
-            'Tiempo_Restriccion (C)': prod_data["recursos"].get(global_bottleneck, 0) if has_bottleneck else 0,
-            'T_por_C (Prioridad)': T_C,
-            'Demanda': prod_data["demanda"],
-            'Produccion_Optima': units_to_produce, 
-            'Throughput_Generado': units_to_produce * T
-        })
+        with np.errstate(divide='ignore', invalid='ignore'):
+            T_C = np.where(C > 0, T / np.where(C > 0, C, 1), np.where(T > 0, T, 0))
+        if not (C > 0).any():
+            T_C = T_C.astype(T.dtype)
+        # Ordenar: 1. Por T/C (Prioridad), 2. Productos que no usan la restricción (C=0) al final.
+        # lexsort es estable: a igual prioridad se conserva el orden del catálogo
+        order = np.lexsort((C > 0, -T_C))
 
-    df_opt = pd.DataFrame(optimization_data)
-    total_throughput = df_opt['Throughput_Generado'].sum() # Inicializar T total
+        self._priority_cache[bottleneck_index] = cached = (C, T_C, order)
+        return cached
 
-    # 4. ALGORITMO DE EXPLOTACIÓN Y SUBORDINACIÓN (Lógica Mejorada)
-    
-    if has_bottleneck:
+    def _greedy_mix(self, order, C, bottleneck_capacity):
+        """Explotación por T/C sobre la restricción y subordinación a los demás recursos."""
+        matrix = self.matrix
         # 4a. Priorizar por T/C y asignar capacidad del Cuello de Botella
-        
-        # Ordenar: 1. Por T/C (Prioridad), 2. Productos que no usan la restricción (C=0) al final.
-        df_opt['Es_Restriccion'] = df_opt['Tiempo_Restriccion (C)'] > 0
-        df_opt = df_opt.sort_values(by=['T_por_C (Prioridad)', 'Es_Restriccion'], 
-                                    ascending=[False, True]).reset_index(drop=True)
-        
-        bottleneck_capacity = datos["recursos"][global_bottleneck]
         remaining_capacity = bottleneck_capacity
-        
-        # Reasignación inicial basada en el Cuello de Botella
-        for index, row in df_opt.iterrows():
-            demand = row['Demanda']
-            time_per_unit = row['Tiempo_Restriccion (C)']
-            
+
+        # Reasignación inicial basada en el Cuello de Botella (secuencial: cada producto
+        # consume lo que dejan los de mayor prioridad; se recorre sobre listas, no filas)
+        allocated = []
+        for demand, time_per_unit in zip(matrix.demand[order].tolist(), C[order].tolist()):
             if time_per_unit > 0:
                 capacity_units = int(remaining_capacity // time_per_unit)
                 units_to_produce = min(demand, capacity_units)
-                
+
                 remaining_capacity -= units_to_produce * time_per_unit
             else:
                 # Si C=0, asignar demanda total (la limitación vendrá de recursos secundarios)
                 units_to_produce = demand
-                
-            df_opt.loc[index, 'Produccion_Optima'] = units_to_produce
-            
+            allocated.append(units_to_produce)
+
         # 4b. Subordinación: Ajustar la Producción por Recursos Secundarios
-        subordinate_resource_capacity = datos["recursos"].copy() 
-        total_throughput = 0 # Resetear para calcular el valor final
+        # Capacidad restante de todos los recursos; las filas son pocas entradas por producto,
+        # por eso se recorren como listas de Python (mismo tipo numérico que el arreglo de NumPy)
+        subordinate_resource_capacity = matrix.capacity.astype(
+            np.result_type(matrix.capacity, matrix.times, matrix.demand)).tolist()
+        rows = self.relevant_rows()
+        total_throughput = 0
+        final_units = []
 
-        for index, row in df_opt.iterrows():
-            prod_name = row['Producto']
-            current_production = row['Produccion_Optima']
+        for prod_index, current_production, T_unit in zip(order.tolist(), allocated, matrix.throughput[order].tolist()):
             limiting_factor_units = current_production
-            
+            # Solo los recursos relevantes (tiempo > 0) de este producto
+            res_idx, times = rows[prod_index]
+
             # Verificar todos los recursos subordinados que consume este producto
-            for res_name, time_per_unit in datos['productos'][prod_name]['recursos'].items():
-                if time_per_unit > 0: # Solo si el recurso es relevante
-                    capacity = subordinate_resource_capacity[res_name]
-                    max_units_by_res = int(capacity // time_per_unit)
-                    
-                    limiting_factor_units = min(limiting_factor_units, max_units_by_res)
-            
+            if res_idx:
+                max_units_by_res = min(subordinate_resource_capacity[r] // t for r, t in zip(res_idx, times))
+                limiting_factor_units = min(limiting_factor_units, int(max_units_by_res))
+
             # La producción final es el mínimo entre lo ya asignado y lo que permiten los subordinados.
-            final_units_to_produce = limiting_factor_units
-            
-            # Aplicar el ajuste final
-            T_unit = row['Throughput_Unitario (T)']
-            df_opt.loc[index, 'Produccion_Optima'] = final_units_to_produce
-            df_opt.loc[index, 'Throughput_Generado'] = final_units_to_produce * T_unit
-            total_throughput += final_units_to_produce * T_unit
-            
+            final_units.append(limiting_factor_units)
+            total_throughput += limiting_factor_units * T_unit
+
             # Actualizar la capacidad restante de TODOS los recursos (incluyendo el cuello de botella)
-            for res_name, time_per_unit in datos['productos'][prod_name]['recursos'].items():
-                 subordinate_resource_capacity[res_name] -= final_units_to_produce * time_per_unit
-
-        # Capacidad Residual Final del Cuello de Botella
-        remaining_capacity = subordinate_resource_capacity[global_bottleneck]
-
-
-    else:
-        # CASO SIN RESTRICCIÓN (Bug Corregido):
-        # La Producción Óptima ya está en df_opt (igual a la Demanda) desde el Paso 3.
-        most_loaded_resource = global_bottleneck # Ya está definido como el recurso más cargado
-        bottleneck_capacity = datos["recursos"][most_loaded_resource]
-        
-        # Calcular consumo real con la demanda completa
-        resource_consumption_actual = df_opt['Demanda'].apply(lambda x: x * datos['productos'][df_opt.loc[df_opt['Produccion_Optima'] == x].iloc[0]['Producto']]['recursos'].get(most_loaded_resource, 0)).sum()
-        
-        # Calcular capacidad sobrante
-        remaining_capacity = bottleneck_capacity - resource_consumption[most_loaded_resource]
-        most_loaded_resource_name = most_loaded_resource
-        
-        # total_throughput ya fue calculado correctamente en el Paso 3.
-    
-    # 4c. CÁLCULO FINAL DE UTILIDAD NETA (Después de que total_throughput se ha calculado)
-    # Sumar todos los gastos operativos (OE)
-    total_operating_expense = sum(datos["gastos_operacion"].values())
-    # Calcular Utilidad Neta
-    net_profit = total_throughput - total_operating_expense
-
-    # 5. EXPORTAR RESULTADOS (CSV y TXT)
-    
-    df_final = df_opt[['Producto', 'T_por_C (Prioridad)', 'Demanda', 'Produccion_Optima', 'Throughput_Generado']]
-    
-    # Exportar CSV
-    df_final.to_csv(output_csv_file, index=False, float_format='%.2f')
-
-    # Crear archivo de texto con el resumen
-    with open(output_txt_file, "w") as f:
-        f.write(f"*** RESULTADOS DEL MODELO DE OPTIMIZACIÓN TOC ***\n")
+            if limiting_factor_units:
+                for r, t in zip(res_idx, times):
+                    subordinate_resource_capacity[r] -= limiting_factor_units * t
+
+        return np.array(final_units), total_throughput, subordinate_resource_capacity
+
+    def relevant_rows(self):
+        """Filas de la matriz como listas (recursos con tiempo > 0), calculadas una sola vez."""
+        if self._row_lists is None:
+            matrix = self.matrix
+            relevant = matrix.times > 0
+            counts = np.bincount(matrix.product_of_entry[relevant], minlength=len(matrix.product_names))
+            indptr = np.concatenate(([0], np.cumsum(counts)))
+            indices, times = matrix.indices[relevant].tolist(), matrix.times[relevant].tolist()
+            self._row_lists = [(indices[start:end], times[start:end])
+                               for start, end in zip(indptr[:-1].tolist(), indptr[1:].tolist())]
+        return self._row_lists
+
+    def solve(self):
+        """
+        Resuelve la mezcla con los datos actuales.
+
+        Returns:
+            TocResult: El resultado (el mismo objeto si no hubo cambios desde el último solve).
+        """
+        if self._result is not None:
+            return self._result
+        matrix = self.matrix
+        mode = self.mode
+
+        # 2. Identificar la Restricción Global con el consumo total mantenido por recurso
+        bottleneck_index, max_factor = self.bottleneck()
+        has_bottleneck = max_factor > 1.0
+        bottleneck_capacity = matrix.capacity_value(bottleneck_index)
+
+        # 3. CÁLCULO T/C
+        C, T_C, order = self.priority_order(bottleneck_index)
+        T = matrix.throughput
+        shadow_prices = {r: 0.0 for r in matrix.resource_names}
+
+        # 4. ALGORITMO DE EXPLOTACIÓN Y SUBORDINACIÓN
+        exact_solution = None
+        if has_bottleneck and mode != "greedy":
+            exact_solution = solve_product_mix(matrix, order, integer=(mode == "mip"), time_limit=self.time_limit)
+            if exact_solution is None:
+                mode = "greedy"
+
+        if exact_solution is not None:
+            # 4'. SOLUCIÓN EXACTA (LP/MIP): todos los recursos se respetan a la vez
+            sorted_units = np.array(exact_solution["units"])
+            total_throughput = (sorted_units * T[order]).sum()
+            shadow_prices = exact_solution["shadow_prices"]
+            used_capacity = float(np.dot(sorted_units, C[order]))
+            remaining_capacity = bottleneck_capacity - used_capacity
+            iterations = exact_solution["iterations"]
+        elif has_bottleneck:
+            sorted_units, total_throughput, remaining = self._greedy_mix(order, C, bottleneck_capacity)
+            # Capacidad Residual Final del Cuello de Botella
+            remaining_capacity = remaining[bottleneck_index]
+            # Productos recorridos en la explotación y la subordinación
+            iterations = len(order)
+        else:
+            # CASO SIN RESTRICCIÓN: se produce la demanda completa; el consumo del
+            # recurso más cargado ya está en el consumo total mantenido por recurso
+            order = np.arange(len(matrix.product_names))
+            sorted_units = matrix.demand
+            total_throughput = (sorted_units * T).sum()
+            remaining_capacity = bottleneck_capacity - self.consumption[bottleneck_index].item()
+            iterations = 0
+
+        units = np.empty(len(order), dtype=sorted_units.dtype)
+        units[order] = sorted_units
+
+        # 4c. CÁLCULO FINAL DE UTILIDAD NETA
+        total_operating_expense = sum(self.operating_expenses.values())
+        self._result = TocResult(
+            mode=mode,
+            bottleneck=matrix.resource_names[bottleneck_index],
+            bottleneck_index=bottleneck_index,
+            has_bottleneck=has_bottleneck,
+            max_factor=max_factor,
+            bottleneck_capacity=bottleneck_capacity,
+            remaining_capacity=remaining_capacity,
+            units=units,
+            priority=T_C,
+            order=order,
+            total_throughput=total_throughput,
+            total_operating_expense=total_operating_expense,
+            net_profit=total_throughput - total_operating_expense,
+            shadow_prices=shadow_prices,
+            iterations=iterations,
+        )
+        return self._result
+
+    def write_reports(self, result, output_csv_file, output_txt_file, input_filename="Datos en Memoria"):
+        """Exporta la tabla de la mezcla (CSV) y el resumen (TXT) de un resultado."""
+        order = result.order
+        units = result.units[order]
+        df_final = pd.DataFrame({
+            'Producto': np.asarray(self.matrix.product_names)[order],
+            'T_por_C (Prioridad)': result.priority[order],
+            'Demanda': self.matrix.demand[order],
+            'Produccion_Optima': units,
+            'Throughput_Generado': units * self.matrix.throughput[order],
+        })
+
+        # Exportar CSV
+        df_final.to_csv(output_csv_file, index=False, float_format='%.2f')
+
+        # Crear archivo de texto con el resumen
+        with open(output_txt_file, "w") as f:
+            f.write(f"*** RESULTADOS DEL MODELO DE OPTIMIZACIÓN TOC ***\n")
+            f.write(f"Datos de Entrada: {input_filename}\n")
+            f.write(f"---------------------------------------------------\n")
+
+            if result.has_bottleneck:
+                f.write(f"Restricción Global (Cuello de Botella): {result.bottleneck}\n")
+                f.write(f"Capacidad de Restricción (unidades): {result.bottleneck_capacity}\n")
+                f.write(f"Factor de Carga Original: {result.max_factor:.2f}\n")
+                f.write(f"Capacidad de Restricción Residual: {result.remaining_capacity:.2f} minutos\n\n")
+                f.write("Instrucción de Subordinación: Todos los recursos NO restringidos deben limitar su producción al mix óptimo de la tabla para evitar acumulación de inventario (Drum-Buffer-Rope). La producción ya ha sido ajustada por restricciones secundarias.\n\n")
+            else:
+                f.write(f"¡NO HAY RESTRICCIONES DE CAPACIDAD! (Uso Máximo: {result.max_factor:.2f})\n")
+                f.write(f"El recurso más cargado ({result.bottleneck}) tiene una capacidad sobrante de: {result.remaining_capacity:.2f} minutos.\n\n")
+                f.write("Instrucción: Producir la Demanda Completa. Enfocarse en reducir Costos de Operación o aumentar Demanda.\n\n")
+            # NUEVA SECCIÓN DE FINANZAS TOC
+            f.write("--- ANÁLISIS FINANCIERO TOC ---\n")
+            f.write(f"Throughput Total Máximo Alcanzado (T): {result.total_throughput:.2f}\n")
+            f.write(f"Gastos Operativos Totales (OE): {result.total_operating_expense:.2f}\n")
+            f.write(f"Utilidad Neta (Net Profit): {result.net_profit:.2f}\n")
+            f.write("----------------------------------------------\n\n")
+            f.write(f"Throughput Total Máximo Alcanzado: {result.total_throughput:.2f}\n\n")
+            if result.mode != "greedy":
+                f.write(f"--- PRECIOS SOMBRA POR RECURSO (Modo {result.mode.upper()}) ---\n")
+                for res_name, price in result.shadow_prices.items():
+                    f.write(f"{res_name}: {price:.2f} por minuto adicional\n")
+                f.write("\n")
+            f.write("Mezcla de Producción Óptima:\n")
+            f.write(df_final.to_string(index=False, float_format='%.2f') + "\n")
+
+# ----------------------------------------------------------------------
+## FUNCIÓN PRINCIPAL: EJECUCIÓN DEL ANÁLISIS TOC (VERSION FINAL)
+# ----------------------------------------------------------------------
+
+def run_toc_analysis(datos, output_csv_file, output_txt_file, input_filename="Datos en Memoria", mode="greedy",
+                     time_limit=None):
+    """
+    Ejecuta el análisis TOC completo, manejando la asignación de recursos
+    con y sin la restricción principal para una asignación más precisa.
+    Recibe el diccionario de datos ya cargado, un `TocCatalog` de toc_read o
+    un `TocModel` ya construido (toc_tool lo comparte con toc_graf para que el
+    catálogo se recorra una sola vez y el diagrama coincida con el reporte;
+    en ese caso se usan su modo y su límite de tiempo).
+
+    mode: "greedy" (prioridad T/C sobre la restricción global y subordinación),
+    "lp" (mezcla continua exacta) o "mip" (unidades enteras exactas). Si el
+    solver exacto no está disponible o falla, se usa "greedy". time_limit (segundos)
+    acota el tiempo del solver MIP; al agotarse se usa la mejor solución entera hallada.
+
+    Devuelve un diccionario con el resumen (restricción, throughput, utilidad neta,
+    precios sombra y modo realmente usado). Para varias preguntas "qué pasa si"
+    sobre los mismos datos, use `TocModel` directamente.
+    """
+    model = datos if isinstance(datos, TocModel) else TocModel(datos, mode=mode, time_limit=time_limit)
+    result = model.solve()
+    model.write_reports(result, output_csv_file, output_txt_file, input_filename)
+    return result.summary()
+
+# ----------------------------------------------------------------------
+## HORIZONTE DE PLANEACIÓN DE VARIOS PERIODOS
+# ----------------------------------------------------------------------
+
+class PlanningHorizon:
+    """
+    Datos de un horizonte de varios periodos sobre una misma matriz de
+    consumo: capacidad (periodos x recursos), demanda y throughput unitario
+    (periodos x productos) y gastos de operación por periodo. Si `inventory`
+    no es None, el producto terminado puede pasar de un periodo al siguiente
+    (inventario inicial, máximo y costo por unidad y periodo, por producto).
+    """
+
+    def __init__(self, matrix, periods, capacity, demand, throughput, operating_expenses, inventory=None):
+        self.matrix = matrix
+        self.periods = [str(t) for t in periods]
+        self.capacity = np.asarray(capacity)
+        self.demand = np.asarray(demand)
+        self.throughput = np.asarray(throughput)
+        self.operating_expenses = np.asarray(operating_expenses, dtype=float)
+        self.inventory = inventory
+
+    @classmethod
+    def from_catalog(cls, datos):
+        """Horizonte de la sección 'horizonte' de un solo archivo."""
+        matrix = ConsumptionMatrix(datos)
+        spec = matrix.catalog.horizon
+        if spec is None:
+            raise ValueError("Los datos no tienen la sección 'horizonte'.")
+        n = len(spec["periodos"])
+        capacity = np.tile(matrix.capacity, (n, 1))
+        for r, values in spec["capacidad"].items():
+            capacity = capacity.astype(np.result_type(capacity, *values))
+            capacity[:, r] = values
+        demand = np.tile(matrix.demand, (n, 1))
+        for p, values in spec["demanda"].items():
+            demand = demand.astype(np.result_type(demand, *values))
+            demand[:, p] = values
+        operating_expense = sum(matrix.catalog.operating_expenses.values())
+        return cls(matrix, spec["periodos"], capacity, demand, np.tile(matrix.throughput, (n, 1)),
+                   [operating_expense] * n, inventory=cls._inventory_vectors(spec["inventario"], len(demand[0])))
+
+    @classmethod
+    def from_catalogs(cls, catalogs, inventory=None):
+        """
+        Horizonte con un archivo por periodo (por ejemplo, un YAML por mes).
+        Todos deben tener los mismos recursos, productos y tiempos; cambian
+        las capacidades, demandas, precios, costos y gastos de operación.
+        """
+        catalogs = [c if isinstance(c, TocCatalog) else TocCatalog.from_datos(c) for c in catalogs]
+        matrix = ConsumptionMatrix(catalogs[0])
+        for c in catalogs[1:]:
+            if (list(c.resource_names) != list(matrix.resource_names)
+                    or list(c.product_names) != list(matrix.product_names)
+                    or not np.array_equal(np.asarray(c.indptr), matrix.indptr)
+                    or not np.array_equal(np.asarray(c.indices), matrix.indices)
+                    or not np.array_equal(np.asarray(c.times), matrix.times)):
+                raise ValueError(f"El periodo '{c.date}' no tiene los mismos recursos, productos y tiempos que "
+                                 f"'{catalogs[0].date}'. Todos los archivos del horizonte deben compartirlos.")
+        return cls(matrix, [c.date for c in catalogs],
+                   np.array([np.asarray(c.capacity) for c in catalogs]),
+                   np.array([np.asarray(c.demand) for c in catalogs]),
+                   np.array([np.asarray(c.price) - np.asarray(c.cost) for c in catalogs]),
+                   [sum(c.operating_expenses.values()) for c in catalogs],
+                   inventory=cls._inventory_vectors(inventory, len(matrix.product_names)))
+
+    @staticmethod
+    def _inventory_vectors(spec, n_products):
+        """Inventario inicial, máximo y costo como vectores por producto (None si no hay inventario)."""
+        if spec is None:
+            return None
+
+        def vector(value, default):
+            if isinstance(value, dict):
+                result = np.full(n_products, default, dtype=float)
+                for p, v in value.items():
+                    result[p] = v
+                return result
+            return np.full(n_products, default if value is None else value, dtype=float)
+
+        return {
+            "initial": vector(spec.get("inicial", 0), 0.0),
+            "maximum": vector(spec.get("maximo"), np.inf),
+            "holding_cost": vector(spec.get("costo", 0), 0.0),
+        }
+
+
+def _horizon_constraints(matrix, n_periods, carry):
+    """
+    Matrices dispersas del LP de un horizonte de `n_periods` periodos (se
+    construyen una sola vez y se reutilizan en cada ventana). Variables por
+    periodo y producto: ventas s (y, con inventario, producción x e
+    inventario final I, en el orden [x, s, I]).
+    """
+    from scipy import sparse
+
+    A = matrix.to_sparse()
+    n_products = A.shape[1]
+    capacity_rows = sparse.kron(sparse.identity(n_periods, format="csr"), A, format="csr")
+    if not carry:
+        return capacity_rows, None
+    size = n_periods * n_products
+    identity = sparse.identity(size, format="csr")
+    zeros = sparse.csr_matrix(capacity_rows.shape)
+    A_ub = sparse.hstack([capacity_rows, zeros, zeros], format="csr")
+    # Balance: I[t-1] + x[t] - s[t] - I[t] = 0 (para t = 0, I[-1] es el inventario inicial)
+    previous = sparse.kron(sparse.eye(n_periods, k=-1, format="csr"), sparse.identity(n_products), format="csr")
+    A_eq = sparse.hstack([identity, -identity, previous - identity], format="csr")
+    return A_ub, A_eq
+
+
+def solve_horizon(horizon, mode="lp", window=None, time_limit=None):
+    """
+    Plan combinado del horizonte.
+
+    En modo "lp"/"mip" se resuelve un solo LP disperso con todos los periodos
+    (o, con `window`, un horizonte rodante: se resuelven `window` periodos,
+    se fija el primero y se avanza un periodo). La estructura del LP se
+    construye una vez; entre ventanas solo cambian los lados derechos y las
+    cotas. En modo "greedy" cada periodo se resuelve con el mismo `TocModel`
+    (T/C y subordinación); el inventario disponible se vende primero y no se
+    produce por adelantado.
+
+    Returns:
+        dict: 'production', 'sales' e 'inventory' (periodos x productos) y 'mode'.
+    """
+    if mode not in SOLVER_MODES:
+        raise ValueError(f"Modo de solución desconocido: '{mode}'. Opciones: {', '.join(SOLVER_MODES)}")
+    n_periods, n_products = horizon.demand.shape
+    inventory = horizon.inventory
+    initial = inventory["initial"] if inventory is not None else np.zeros(n_products)
+
+    if mode != "greedy":
+        try:
+            from scipy.optimize import milp, LinearConstraint, Bounds
+        except ImportError:
+            print("⚠️ scipy no está instalado; se usa el algoritmo voraz (greedy).")
+            mode = "greedy"
+
+    if mode == "greedy":
+        model = TocModel(horizon.matrix.catalog)
+        production = np.zeros(horizon.demand.shape, dtype=np.result_type(horizon.demand, float))
+        sales, stock = np.zeros_like(production), np.zeros_like(production)
+        on_hand = initial.astype(float)
+        for t in range(n_periods):
+            from_stock = np.minimum(on_hand, horizon.demand[t])
+            model.update(capacity=horizon.capacity[t], demand=horizon.demand[t] - from_stock,
+                         price=horizon.throughput[t], cost=np.zeros(n_products))
+            production[t] = model.solve().units
+            sales[t] = production[t] + from_stock
+            on_hand = on_hand - from_stock
+            stock[t] = on_hand
+        return {"production": production, "sales": sales, "inventory": stock, "mode": mode}
+
+    carry = inventory is not None
+    W = min(window or n_periods, n_periods)
+    A_ub, A_eq = _horizon_constraints(horizon.matrix, W, carry)
+    size = W * n_products
+    integrality = np.ones(A_ub.shape[1]) if mode == "mip" else np.zeros(A_ub.shape[1])
+    options = {"time_limit": time_limit} if time_limit else {}
+
+    production = np.zeros((n_periods, n_products))
+    sales, stock = np.zeros_like(production), np.zeros_like(production)
+    on_hand = initial.astype(float)
+    start = 0
+    while start < n_periods:
+        # Periodos de la ventana; más allá del horizonte se completa con periodos vacíos
+        span = list(range(start, min(start + W, n_periods)))
+        pad = W - len(span)
+        demand = np.vstack([horizon.demand[span], np.zeros((pad, n_products))]).ravel()
+        capacity = np.vstack([horizon.capacity[span], np.zeros((pad, horizon.capacity.shape[1]))]).ravel()
+        throughput = np.vstack([horizon.throughput[span], np.zeros((pad, n_products))]).ravel()
+
+        if carry:
+            holding = np.tile(inventory["holding_cost"], W)
+            c = np.concatenate([np.zeros(size), -throughput, holding])
+            lower = np.zeros(3 * size)
+            upper = np.concatenate([np.full(size, np.inf), demand, np.tile(inventory["maximum"], W)])
+            b_eq = np.zeros(size)
+            b_eq[:n_products] = -on_hand
+            constraints = [LinearConstraint(A_ub, -np.inf, capacity), LinearConstraint(A_eq, b_eq, b_eq)]
+        else:
+            c = -throughput
+            lower, upper = np.zeros(size), demand
+            constraints = [LinearConstraint(A_ub, -np.inf, capacity)]
+
+        res = milp(c, constraints=constraints, integrality=integrality, bounds=Bounds(lower, upper), options=options)
+        if res.x is None:
+            raise ValueError(f"El plan del horizonte no tiene solución desde el periodo "
+                             f"'{horizon.periods[start]}' ({res.message}). Revise el inventario inicial y el máximo.")
+        # Las variables son no negativas: se descarta el ruido numérico del solver (-0.00)
+        x = np.round(res.x) if mode == "mip" else np.clip(res.x, 0, None)
+        x += 0.0
+        blocks = x.reshape(3 if carry else 1, W, n_products)
+        # Con ventana se fija solo el primer periodo; sin ventana, todos
+        keep = 1 if window else len(span)
+        sold = blocks[1] if carry else blocks[0]
+        production[start:start + keep] = blocks[0][:keep]
+        sales[start:start + keep] = sold[:keep]
+        if carry:
+            stock[start:start + keep] = blocks[2][:keep]
+            on_hand = blocks[2][keep - 1]
+        start += keep
+
+    return {"production": production, "sales": sales, "inventory": stock, "mode": mode}
+
+
+def run_horizon_analysis(horizon, output_dir, mode="lp", window=None, time_limit=None,
+                         input_filename="Datos en Memoria"):
+    """
+    Resuelve el horizonte y escribe un CSV por periodo
+    (<periodo>_plan_toc.csv) más el resumen del horizonte
+    (horizonte_resumen.csv y horizonte_resumen.txt) en `output_dir`.
+
+    Returns:
+        dict: Resumen del horizonte (modo, throughput, gastos, costo de inventario y utilidad neta).
+    """
+    plan = solve_horizon(horizon, mode=mode, window=window, time_limit=time_limit)
+    matrix = horizon.matrix
+    A = matrix.to_sparse()
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Restricción de cada periodo (factor de carga con la demanda) y uso de la capacidad con el plan
+    load = np.asarray(A @ horizon.demand.T).T / horizon.capacity
+    used = np.asarray(A @ plan["production"].T).T / horizon.capacity
+    bottleneck = load.argmax(axis=1)
+    throughput = (plan["sales"] * horizon.throughput).sum(axis=1)
+    holding = ((plan["inventory"] * horizon.inventory["holding_cost"]).sum(axis=1)
+               if horizon.inventory is not None else np.zeros(len(horizon.periods)))
+    net_profit = throughput - horizon.operating_expenses - holding
+
+    names = np.asarray(matrix.product_names)
+    for t, period in enumerate(horizon.periods):
+        safe_period = period.strip().replace('/', '-').replace('\\', '-').replace(' ', '_')
+        pd.DataFrame({
+            'Producto': names,
+            'Demanda': horizon.demand[t],
+            'Produccion_Optima': plan["production"][t],
+            'Ventas': plan["sales"][t],
+            'Inventario_Final': plan["inventory"][t],
+            'Throughput_Generado': plan["sales"][t] * horizon.throughput[t],
+        }).to_csv(os.path.join(output_dir, f"{safe_period}_plan_toc.csv"), index=False, float_format='%.2f')
+
+    df_summary = pd.DataFrame({
+        'Periodo': horizon.periods,
+        'Restriccion': [matrix.resource_names[b] for b in bottleneck.tolist()],
+        'Factor_Carga': load.max(axis=1),
+        'Uso_Restriccion': used[np.arange(len(bottleneck)), bottleneck],
+        'Throughput': throughput,
+        'Gastos_Operacion': horizon.operating_expenses,
+        'Costo_Inventario': holding,
+        'Utilidad_Neta': net_profit,
+        'Inventario_Final': plan["inventory"].sum(axis=1),
+    })
+    df_summary.to_csv(os.path.join(output_dir, "horizonte_resumen.csv"), index=False, float_format='%.2f')
+
+    summary = {
+        "mode": plan["mode"],
+        "periods": len(horizon.periods),
+        "total_throughput": float(throughput.sum()),
+        "total_operating_expense": float(horizon.operating_expenses.sum()),
+        "total_holding_cost": float(holding.sum()),
+        "net_profit": float(net_profit.sum()),
+    }
+    with open(os.path.join(output_dir, "horizonte_resumen.txt"), "w") as f:
+        f.write(f"*** PLAN TOC DEL HORIZONTE ({len(horizon.periods)} periodos, modo {plan['mode'].upper()}) ***\n")
         f.write(f"Datos de Entrada: {input_filename}\n")
+        if window:
+            f.write(f"Horizonte rodante: ventana de {window} periodos\n")
         f.write(f"---------------------------------------------------\n")
-        
-        if has_bottleneck:
-            f.write(f"Restricción Global (Cuello de Botella): {global_bottleneck}\n")
-            f.write(f"Capacidad de Restricción (unidades): {datos['recursos'][global_bottleneck]}\n") 
-            f.write(f"Factor de Carga Original: {max_factor:.2f}\n")
-            f.write(f"Capacidad de Restricción Residual: {remaining_capacity:.2f} minutos\n\n")
-            f.write("Instrucción de Subordinación: Todos los recursos NO restringidos deben limitar su producción al mix óptimo de la tabla para evitar acumulación de inventario (Drum-Buffer-Rope). La producción ya ha sido ajustada por restricciones secundarias.\n\n")
-        else:
-            f.write(f"¡NO HAY RESTRICCIONES DE CAPACIDAD! (Uso Máximo: {max_factor:.2f})\n")
-            f.write(f"El recurso más cargado ({most_loaded_resource_name}) tiene una capacidad sobrante de: {remaining_capacity:.2f} minutos.\n\n")
-            f.write("Instrucción: Producir la Demanda Completa. Enfocarse en reducir Costos de Operación o aumentar Demanda.\n\n")
-        # NUEVA SECCIÓN DE FINANZAS TOC
-        f.write("--- ANÁLISIS FINANCIERO TOC ---\n")
-        f.write(f"Throughput Total Máximo Alcanzado (T): {total_throughput:.2f}\n")
-        f.write(f"Gastos Operativos Totales (OE): {total_operating_expense:.2f}\n")
-        f.write(f"Utilidad Neta (Net Profit): {net_profit:.2f}\n")
+        f.write(f"Throughput Total del Horizonte (T): {summary['total_throughput']:.2f}\n")
+        f.write(f"Gastos Operativos Totales (OE): {summary['total_operating_expense']:.2f}\n")
+        f.write(f"Costo de Inventario: {summary['total_holding_cost']:.2f}\n")
+        f.write(f"Utilidad Neta (Net Profit): {summary['net_profit']:.2f}\n")
         f.write("----------------------------------------------\n\n")
-        f.write(f"Throughput Total Máximo Alcanzado: {total_throughput:.2f}\n\n")
-        f.write("Mezcla de Producción Óptima:\n")
-        f.write(df_final.to_string(index=False, float_format='%.2f') + "\n")
\ No newline at end of file
+        f.write("Resumen por Periodo:\n")
+        f.write(df_summary.to_string(index=False, float_format='%.2f') + "\n")
+    return summary
@@ -1,42 +1,473 @@
+import hashlib
+import json
 import os
+from array import array
 import yaml
 from yaml.loader import SafeLoader
 
+# libyaml (extensión en C) es mucho más rápida que el cargador en Python puro
+YamlLoader = getattr(yaml, "CSafeLoader", SafeLoader)
+
+REQUIRED_SECTIONS = ["generales", "recursos", "productos", "gastos_operacion"]
+
+# Distribuciones para la demanda incierta ('demanda_dist') y la disponibilidad
+# de los recursos (sección opcional 'disponibilidad'): parámetros obligatorios
+# y opcionales de cada una. 'media' y 'moda' toman por defecto el valor base.
+DISTRIBUTIONS = {
+    "normal": (("desv",), ("media",)),
+    "triangular": (("min", "max"), ("moda",)),
+    "poisson": ((), ("media",)),
+    "uniforme": (("min", "max"), ()),
+}
+
+# ----------------------------------------------------------------------
+## MODELO NORMALIZADO: RECURSOS Y PRODUCTOS INDEXADOS POR ENTERO
+# ----------------------------------------------------------------------
+
+class TocDataError(ValueError):
+    """Error de validación de los datos de entrada, con línea y columna si se conocen."""
+
+    def __init__(self, message, source=None, line=None, column=None):
+        self.line = line
+        self.column = column
+        if line is not None:
+            message = f"{source or 'datos'}, línea {line}, columna {column}: {message}"
+        super().__init__(message)
+
+
+class TocCatalog:
+    """
+    Versión compacta y validada de los datos de una planta.
+
+    Los recursos y productos se identifican por su posición (entero). Los
+    vectores numéricos son `array` de tipo 'q' (todos enteros) o 'd' (hay
+    algún decimal), y el consumo producto x recurso se guarda por filas en
+    formato disperso (CSR): los recursos del producto p son
+    `indices[indptr[p]:indptr[p + 1]]` con tiempos `times[...]`.
+    NumPy puede usar estos arreglos sin copiarlos (`np.asarray`).
+    """
+
+    def __init__(self, generales, resource_names, capacity, product_names, demand, price, cost,
+                 indptr, indices, times, operating_expenses, datos=None, demand_dist=None, availability=None,
+                 horizon=None, capacity_values=None):
+        self.generales = generales
+        self.resource_names = resource_names
+        self.capacity = capacity
+        # Capacidades con el tipo declarado de cada una (int o float): `capacity`
+        # pasa todas a float si alguna es decimal, y el reporte las muestra como en el YAML
+        self.capacity_values = list(capacity_values) if capacity_values is not None else capacity.tolist()
+        self.product_names = product_names
+        self.demand = demand
+        self.price = price
+        self.cost = cost
+        self.indptr = indptr
+        self.indices = indices
+        self.times = times
+        self.operating_expenses = operating_expenses
+        # Incertidumbre (opcional): producto -> distribución de la demanda y
+        # recurso -> disponibilidad en porcentaje (número fijo o distribución)
+        self.demand_dist = demand_dist or {}
+        self.availability = availability or {}
+        # Horizonte de varios periodos (opcional, sección 'horizonte')
+        self.horizon = horizon
+        # Diccionario original (None si el catálogo no viene de YAML)
+        self.datos = datos
+        self.resource_index = {r: i for i, r in enumerate(resource_names)}
+
+    @property
+    def company(self):
+        return str(self.generales.get("empresa", "Empresa_TOC")).strip()
+
+    @property
+    def date(self):
+        return self.generales.get("fecha", "YYYY-MM-DD")
+
+    @classmethod
+    def from_datos(cls, datos, source=None):
+        """Valida un diccionario `datos` ya cargado y construye el catálogo."""
+        return _Validator(source).validate(datos)
+
+    def cache_payload(self):
+        """
+        Contenido que identifica al catálogo para la caché: el diccionario
+        original si existe o, para catálogos columnares, un hash de los arreglos.
+        """
+        if self.datos is not None:
+            return self.datos
+        digest = hashlib.sha256(json.dumps(self.generales, sort_keys=True, default=str).encode("utf-8"))
+        digest.update("\0".join(map(str, self.resource_names)).encode("utf-8"))
+        digest.update("\0".join(map(str, self.product_names)).encode("utf-8"))
+        for values in (self.capacity, self.demand, self.price, self.cost, self.indptr, self.indices, self.times):
+            digest.update(memoryview(values).cast("B"))
+        digest.update(json.dumps(self.operating_expenses, sort_keys=True, default=str).encode("utf-8"))
+        return {"columnar_sha256": digest.hexdigest()}
+
+# ----------------------------------------------------------------------
+## VALIDACIÓN TIPADA EN UNA SOLA PASADA
+# ----------------------------------------------------------------------
+
+def _typed_array(values):
+    """array('q') si todos los valores son enteros, array('d') si hay decimales."""
+    if all(type(v) is int for v in values):
+        return array('q', values)
+    return array('d', values)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Validator:
+    """
+    Recorre `datos` junto con el árbol de nodos YAML (si existe) para
+    validar tipos y referencias, y construye el `TocCatalog` en el mismo paso.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+
+    def error(self, message, node=None):
+        if node is None:
+            return TocDataError(message, self.source)
+        mark = node.start_mark
+        return TocDataError(message, self.source, mark.line + 1, mark.column + 1)
+
+    @staticmethod
+    def children(node):
+        """Nodos hijos de un mapeo YAML: clave -> (nodo_clave, nodo_valor)."""
+        if node is None or not isinstance(node, yaml.MappingNode):
+            return {}
+        return {str(key.value): (key, value) for key, value in node.value}
+
+    def number(self, value, what, node, minimum=None, strict=False):
+        if not _is_number(value):
+            raise self.error(f"{what} debe ser un número, se encontró {value!r}.", node)
+        if minimum is not None and (value <= minimum if strict else value < minimum):
+            relation = "mayor que" if strict else "mayor o igual que"
+            raise self.error(f"{what} debe ser {relation} {minimum}, se encontró {value}.", node)
+        return value
+
+    def distribution(self, spec, what, node, base=None, limits=None):
+        """
+        Valida una distribución {tipo: ..., parámetros} y la devuelve normalizada.
+        `base` es el valor por defecto de 'media'/'moda'; `limits` acota los parámetros.
+        """
+        if not isinstance(spec, dict) or spec.get("tipo") not in DISTRIBUTIONS:
+            raise self.error(f"{what} debe ser un mapeo con 'tipo' ({', '.join(DISTRIBUTIONS)}) "
+                             f"y sus parámetros, se encontró {spec!r}.", node)
+        fields = self.children(node)
+        required, optional = DISTRIBUTIONS[spec["tipo"]]
+        normalized = {"tipo": spec["tipo"]}
+        for name in required + optional:
+            if name not in spec:
+                if name in required or base is None:
+                    raise self.error(f"{what} ({spec['tipo']}) requiere el parámetro '{name}'.", node)
+                normalized[name] = base
+                continue
+            value_node = fields.get(name, (None, None))[1]
+            value = self.number(spec[name], f"{what}: '{name}'", value_node, minimum=0)
+            if limits is not None and not limits[0] <= value <= limits[1]:
+                raise self.error(f"{what}: '{name}' debe estar entre {limits[0]} y {limits[1]}, "
+                                 f"se encontró {value}.", value_node)
+            normalized[name] = value
+        if "min" in normalized and normalized["min"] > normalized["max"]:
+            raise self.error(f"{what}: 'min' no puede ser mayor que 'max'.", node)
+        if "moda" in normalized and not normalized["min"] <= normalized["moda"] <= normalized["max"]:
+            raise self.error(f"{what}: 'moda' debe estar entre 'min' y 'max'.", node)
+        return normalized
+
+    def per_product(self, value, what, node, product_index, minimum=0):
+        """Número común a todos los productos, o mapeo producto -> número (índice -> valor)."""
+        if not isinstance(value, dict):
+            return self.number(value, what, node, minimum=minimum)
+        value_nodes = self.children(node)
+        result = {}
+        for name, amount in value.items():
+            key_node, amount_node = value_nodes.get(str(name), (None, None))
+            if str(name) not in product_index:
+                raise self.error(f"{what}: el producto '{name}' no está declarado en la sección 'productos'.", key_node)
+            result[product_index[str(name)]] = self.number(amount, f"{what} de '{name}'", amount_node, minimum=minimum)
+        return result
+
+    def horizon(self, spec, node, resource_index, product_index):
+        """
+        Valida la sección 'horizonte': periodos, capacidades y demandas por
+        periodo (listas) e inventario de producto terminado entre periodos.
+        """
+        if not isinstance(spec, dict) or "periodos" not in spec:
+            raise self.error("La sección 'horizonte' debe ser un mapeo con 'periodos' (lista de nombres o número).", node)
+        fields = self.children(node)
+
+        def field_node(name):
+            return fields.get(name, (None, None))[1]
+
+        periodos = spec["periodos"]
+        if isinstance(periodos, int) and not isinstance(periodos, bool):
+            periodos = [str(t + 1) for t in range(periodos)]
+        if not isinstance(periodos, list) or not periodos:
+            raise self.error("'periodos' debe ser una lista de nombres o un número mayor que 0.", field_node("periodos"))
+        periodos = [str(t) for t in periodos]
+
+        def per_period(section, index, kind, minimum, strict=False):
+            values = spec.get(section) or {}
+            if not isinstance(values, dict):
+                raise self.error(f"'{section}' del horizonte debe ser un mapeo {kind}: lista por periodo.",
+                                 field_node(section))
+            value_nodes = self.children(field_node(section))
+            result = {}
+            for name, series in values.items():
+                key_node, series_node = value_nodes.get(str(name), (None, None))
+                if str(name) not in index:
+                    raise self.error(f"'{section}' del horizonte se refiere al {kind} '{name}', que no está declarado.",
+                                     key_node)
+                if not isinstance(series, list) or len(series) != len(periodos):
+                    raise self.error(f"'{section}' de '{name}' debe ser una lista con un valor por periodo "
+                                     f"({len(periodos)}).", series_node)
+                item_nodes = series_node.value if isinstance(series_node, yaml.SequenceNode) else [None] * len(series)
+                result[index[str(name)]] = [
+                    self.number(v, f"'{section}' de '{name}' en el periodo {periodos[t]}", item_nodes[t],
+                                minimum=minimum, strict=strict)
+                    for t, v in enumerate(series)]
+            return result
+
+        horizon = {
+            "periodos": periodos,
+            "capacidad": per_period("capacidad", resource_index, "recurso", 0, strict=True),
+            "demanda": per_period("demanda", product_index, "producto", 0),
+            "inventario": None,
+        }
+        if "inventario" in spec:
+            inventario = spec["inventario"] or {}
+            inventario_node = field_node("inventario")
+            if not isinstance(inventario, dict):
+                raise self.error("'inventario' del horizonte debe ser un mapeo con 'inicial', 'maximo' y/o 'costo'.",
+                                 inventario_node)
+            inv_fields = self.children(inventario_node)
+
+            def inv_node(name):
+                return inv_fields.get(name, (None, None))[1]
+
+            horizon["inventario"] = {
+                "inicial": self.per_product(inventario.get("inicial") or {}, "El inventario inicial",
+                                            inv_node("inicial"), product_index),
+                "maximo": (self.per_product(inventario["maximo"], "El inventario máximo", inv_node("maximo"),
+                                            product_index) if inventario.get("maximo") is not None else None),
+                "costo": self.per_product(inventario.get("costo", 0), "El costo de inventario",
+                                          inv_node("costo"), product_index),
+            }
+        return horizon
+
+    def validate(self, datos, root=None):
+        if not isinstance(datos, dict):
+            raise self.error("El archivo debe contener un mapeo con las secciones "
+                             f"{', '.join(REQUIRED_SECTIONS)}.", root)
+
+        # Validar existencia de secciones principales
+        missing_sections = [sec for sec in REQUIRED_SECTIONS if sec not in datos]
+        if missing_sections:
+            raise self.error("El archivo YAML está incompleto. Faltan las siguientes secciones obligatorias: "
+                             f"{', '.join(missing_sections)}", root)
+        sections = self.children(root)
+
+        def section_node(name):
+            return sections.get(name, (None, None))
+
+        # Validar contenido de la sección 'generales'
+        generales = datos["generales"]
+        if not isinstance(generales, dict) or "empresa" not in generales or "fecha" not in generales:
+            raise self.error("La sección 'generales' debe contener los campos 'empresa' y 'fecha'.",
+                             section_node("generales")[0])
+
+        # Recursos: nombre -> capacidad (minutos disponibles)
+        key_node, recursos_node = section_node("recursos")
+        recursos = datos["recursos"]
+        if not recursos:
+            raise self.error("La sección 'recursos' no puede estar vacía. Debe definir al menos un recurso.", key_node)
+        if not isinstance(recursos, dict):
+            raise self.error("La sección 'recursos' debe ser un mapeo recurso: capacidad.", recursos_node)
+        resource_nodes = self.children(recursos_node)
+        # Los nombres se normalizan a texto (YAML permite claves numéricas)
+        resource_names = [str(r) for r in recursos]
+        resource_index = {r: i for i, r in enumerate(resource_names)}
+        capacity = [self.number(c, f"La capacidad del recurso '{r}'", resource_nodes.get(r, (None, None))[1],
+                                minimum=0, strict=True)
+                    for r, c in zip(resource_names, recursos.values())]
+
+        # Productos: consumo por recurso, costo, precio y demanda
+        key_node, productos_node = section_node("productos")
+        productos = datos["productos"]
+        if not productos:
+            raise self.error("La sección 'productos' no puede estar vacía. Debe definir al menos un producto.", key_node)
+        if not isinstance(productos, dict):
+            raise self.error("La sección 'productos' debe ser un mapeo de productos.", productos_node)
+        product_nodes = self.children(productos_node)
+
+        product_names, demand, price, cost = [], [], [], []
+        demand_dist = {}
+        indptr, indices, times = [0], [], []
+        for prod_name, prod_data in productos.items():
+            prod_name = str(prod_name)
+            prod_key, prod_node = product_nodes.get(prod_name, (None, None))
+            if not isinstance(prod_data, dict):
+                raise self.error(f"El producto '{prod_name}' debe ser un mapeo con costo_ventas, "
+                                 "recursos, precio y demanda.", prod_node)
+            fields = self.children(prod_node)
+
+            def field_node(name):
+                return fields.get(name, (None, None))[1]
+
+            for required in ("costo_ventas", "recursos", "demanda"):
+                if required not in prod_data:
+                    raise self.error(f"Al producto '{prod_name}' le falta el campo obligatorio '{required}'.", prod_key)
+
+            cost.append(self.number(prod_data["costo_ventas"], f"'costo_ventas' de '{prod_name}'",
+                                    field_node("costo_ventas")))
+            demand.append(self.number(prod_data["demanda"], f"'demanda' de '{prod_name}'",
+                                      field_node("demanda"), minimum=0))
+            # Mismo criterio que el optimizador: 'precio' y, si falta o es 0, 'precio_venta'
+            if prod_data.get("precio"):
+                precio = self.number(prod_data["precio"], f"'precio' de '{prod_name}'", field_node("precio"))
+            elif "precio_venta" in prod_data:
+                precio = self.number(prod_data["precio_venta"], f"'precio_venta' de '{prod_name}'",
+                                     field_node("precio_venta"))
+            else:
+                precio = prod_data.get("precio", 0) if _is_number(prod_data.get("precio", 0)) else 0
+            price.append(precio)
+
+            prod_recursos = prod_data["recursos"] or {}
+            if not isinstance(prod_recursos, dict):
+                raise self.error(f"'recursos' de '{prod_name}' debe ser un mapeo recurso: minutos por unidad.",
+                                 field_node("recursos"))
+            usage_nodes = self.children(field_node("recursos"))
+            for res_name, time_per_unit in prod_recursos.items():
+                res_name = str(res_name)
+                res_key, res_node = usage_nodes.get(res_name, (None, None))
+                if res_name not in resource_index:
+                    raise self.error(f"El producto '{prod_name}' usa el recurso '{res_name}', que no está "
+                                     "declarado en la sección 'recursos'.", res_key)
+                indices.append(resource_index[res_name])
+                times.append(self.number(time_per_unit, f"El tiempo de '{res_name}' en '{prod_name}'",
+                                         res_node, minimum=0))
+            indptr.append(len(indices))
+            product_names.append(prod_name)
+
+            # Demanda incierta (opcional) alrededor de 'demanda'
+            if "demanda_dist" in prod_data:
+                demand_dist[len(product_names) - 1] = self.distribution(
+                    prod_data["demanda_dist"], f"'demanda_dist' de '{prod_name}'", field_node("demanda_dist"),
+                    base=demand[-1])
+
+        # Gastos de operación
+        key_node, gastos_node = section_node("gastos_operacion")
+        gastos = datos["gastos_operacion"]
+        if not gastos:
+            raise self.error("La sección 'gastos_operacion' no puede estar vacía. Debe definir al menos un gasto operativo.", key_node)
+        if not isinstance(gastos, dict):
+            raise self.error("La sección 'gastos_operacion' debe ser un mapeo gasto: monto.", gastos_node)
+        gasto_nodes = self.children(gastos_node)
+        for name, amount in gastos.items():
+            self.number(amount, f"El gasto '{name}'", gasto_nodes.get(str(name), (None, None))[1])
+
+        # Disponibilidad de los recursos en porcentaje (sección opcional)
+        availability = {}
+        key_node, disponibilidad_node = section_node("disponibilidad")
+        disponibilidad = datos.get("disponibilidad") or {}
+        if not isinstance(disponibilidad, dict):
+            raise self.error("La sección 'disponibilidad' debe ser un mapeo recurso: porcentaje o distribución.",
+                             disponibilidad_node)
+        availability_nodes = self.children(disponibilidad_node)
+        for res_name, spec in disponibilidad.items():
+            res_name = str(res_name)
+            res_key, res_node = availability_nodes.get(res_name, (None, None))
+            if res_name not in resource_index:
+                raise self.error(f"La disponibilidad se refiere al recurso '{res_name}', que no está "
+                                 "declarado en la sección 'recursos'.", res_key)
+            what = f"La disponibilidad de '{res_name}'"
+            if isinstance(spec, dict):
+                availability[resource_index[res_name]] = self.distribution(spec, what, res_node, limits=(0, 100))
+            else:
+                percent = self.number(spec, what, res_node, minimum=0)
+                if percent > 100:
+                    raise self.error(f"{what} es un porcentaje entre 0 y 100, se encontró {percent}.", res_node)
+                availability[resource_index[res_name]] = {"tipo": "fija", "media": percent}
+
+        # Horizonte de varios periodos (sección opcional)
+        horizon = None
+        if datos.get("horizonte") is not None:
+            horizon = self.horizon(datos["horizonte"], section_node("horizonte")[1], resource_index,
+                                   {name: i for i, name in enumerate(product_names)})
+
+        return TocCatalog(
+            generales=generales,
+            resource_names=resource_names,
+            capacity=_typed_array(capacity),
+            capacity_values=capacity,
+            product_names=product_names,
+            demand=_typed_array(demand),
+            price=_typed_array(price),
+            cost=_typed_array(cost),
+            indptr=array('q', indptr),
+            indices=array('q', indices),
+            times=_typed_array(times),
+            operating_expenses=gastos,
+            datos=datos,
+            demand_dist=demand_dist,
+            availability=availability,
+            horizon=horizon,
+        )
+
 # ----------------------------------------------------------------------
 ## FUNCIÓN HELPER: CARGA DE DATOS YAML
 # ----------------------------------------------------------------------
 
-def load_data_from_file(file_path):
-    """Carga los datos de recursos y productos desde un archivo YAML."""
+COLUMNAR_EXTENSIONS = (".npz",)
+
+
+def is_columnar_file(file_path):
+    return os.path.splitext(str(file_path))[1].lower() in COLUMNAR_EXTENSIONS
+
+
+def load_catalog_from_file(file_path):
+    """
+    Carga y valida un archivo YAML en una sola pasada y devuelve el `TocCatalog`
+    (el diccionario original queda en `catalog.datos`). Los errores de
+    validación indican línea y columna.
+
+    Los archivos columnares (.npz, ver toc_columnar.py) se mapean en memoria
+    y devuelven un catálogo con `datos=None`.
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Error: El archivo no fue encontrado en la ruta especificada: {file_path}")
 
+    if is_columnar_file(file_path):
+        # NumPy solo se importa para el formato columnar
+        from toc_columnar import load_catalog_npz
+        return load_catalog_npz(file_path)
+
     with open(file_path, 'r', encoding='utf-8') as file:
+        loader = YamlLoader(file)
         try:
-            datos = yaml.load(file, Loader=SafeLoader)
+            # Se conserva el árbol de nodos para ubicar los errores de validación
+            root = loader.get_single_node()
+            datos = loader.construct_document(root) if root is not None else None
+        except yaml.MarkedYAMLError as e:
+            mark = e.problem_mark or e.context_mark
+            raise TocDataError(f"Error al parsear el archivo YAML. Revise el formato: {e.problem or e}",
+                               file_path, mark.line + 1 if mark else None, mark.column + 1 if mark else None)
         except Exception as e:
             raise Exception(f"Error al parsear el archivo YAML. Revise el formato: {e}")
-            
-    # Validar existencia de secciones principales
-    required_sections = ["generales", "recursos", "productos", "gastos_operacion"]
-    missing_sections = [sec for sec in required_sections if sec not in datos]
-    
-    if missing_sections:
-        raise ValueError(f"El archivo YAML está incompleto. Faltan las siguientes secciones obligatorias: {', '.join(missing_sections)}")
-
-    # Validar contenido de la sección 'generales'
-    generales = datos["generales"]
-    if not generales or "empresa" not in generales or "fecha" not in generales:
-        raise ValueError("La sección 'generales' debe contener los campos 'empresa' y 'fecha'.")
-    
-    # Validar que existan datos en 'recursos', 'productos' y 'gastos_operacion'
-    if not datos["recursos"]:
-         raise ValueError("La sección 'recursos' no puede estar vacía. Debe definir al menos un recurso.")
-         
-    if not datos["productos"]:
-         raise ValueError("La sección 'productos' no puede estar vacía. Debe definir al menos un producto.")
-         
-    if not datos["gastos_operacion"]:
-         raise ValueError("La sección 'gastos_operacion' no puede estar vacía. Debe definir al menos un gasto operativo.")
-
-    return datos
+        finally:
+            loader.dispose()
+
+    return _Validator(file_path).validate(datos, root)
+
+
+def load_data_from_file(file_path):
+    """
+    Carga los datos de recursos y productos desde un archivo YAML y devuelve
+    el diccionario validado. Los archivos columnares (.npz) no tienen
+    diccionario: se cargan con `load_catalog_from_file`.
+    """
+    if is_columnar_file(file_path):
+        raise ValueError(f"'{file_path}' es un archivo columnar; use load_catalog_from_file para obtener el TocCatalog.")
+    return load_catalog_from_file(file_path).datos
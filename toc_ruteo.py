@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import time
+
+import numpy as np
+
+from toc_read import TocCatalog, load_catalog_from_file
+
+# ----------------------------------------------------------------------
+## SIMULACIÓN POR TURNOS SOBRE UNA RED DE RUTEO (ENSAMBLES, MÁQUINAS PARALELAS, RETRABAJO)
+# ----------------------------------------------------------------------
+# Generaliza la línea del juego de dados (toc_dados / toc_lote) a una red:
+#   - Cada estación lanza un dado por máquina (máquinas paralelas = varios dados).
+#   - Las unidades esperan en una cola por arista (origen -> destino).
+#   - Una estación de ensamble necesita una unidad de cada arista de entrada;
+#     las demás toman de sus colas de entrada en orden.
+#   - Las estaciones con materia prima toman material ilimitado si les sobra capacidad.
+#   - La salida de una estación se reparte entre sus aristas (y producto
+#     terminado) según las fracciones de ruteo.
+#   - Retrabajo: una fracción de lo procesado vuelve a la cola de retrabajo de
+#     una estación anterior, que la atiende antes que el material nuevo.
+# Las estaciones se recorren en orden topológico (sin las aristas de
+# retrabajo), así que el material avanza en el mismo turno, igual que en la
+# línea. La red se guarda en arreglos enteros (CSR) calculados una sola vez,
+# y el estado de las R réplicas en arreglos (réplicas x aristas/estaciones).
+
+# Media del dado de seis caras del juego: por defecto, el periodo de 'recursos'
+# se divide en los turnos que dan al recurso más lento un dado de esta media
+MEDIA_DADO = 3.5
+
+
+def _orden_topologico(n, origen, destino):
+    """Orden topológico (Kahn) que respeta el orden de declaración; None si hay un ciclo."""
+    grado = np.bincount(destino, minlength=n).tolist()
+    sucesores = [[] for _ in range(n)]
+    for u, v in zip(origen.tolist(), destino.tolist()):
+        sucesores[u].append(v)
+    listos = [v for v in range(n) if grado[v] == 0]
+    orden = []
+    while listos:
+        u = heapq.heappop(listos)
+        orden.append(u)
+        for v in sucesores[u]:
+            grado[v] -= 1
+            if grado[v] == 0:
+                heapq.heappush(listos, v)
+    return orden if len(orden) == n else None
+
+
+class RedDeProduccion:
+    """
+    Simula R réplicas independientes de una red de estaciones por turnos.
+
+    Con una línea en serie (una arista de cada estación a la siguiente) da
+    exactamente los mismos resultados que `LineaDeProduccionLote`.
+    """
+
+    def __init__(self, estaciones: dict, aristas: list, replicas: int = 1000, semilla=None,
+                 maquinas: dict | None = None, ensambles=(), materia_prima=None, retrabajos=()):
+        """
+        Inicializa la red.
+
+        Args:
+            estaciones (dict): Nombre -> caras del dado de cada máquina de la estación.
+            aristas (list): Tuplas (origen, destino) o (origen, destino, fracción).
+                La fracción es la parte de la salida del origen que va por esa
+                arista; lo que no se asigna a ninguna arista sale como producto
+                terminado. Sin fracciones, la salida se reparte en partes iguales.
+            replicas (int, optional): Número de réplicas independientes. Por defecto 1000.
+            semilla (int | np.random.SeedSequence, optional): Semilla de la corrida.
+            maquinas (dict, optional): Nombre -> número de máquinas paralelas. Por defecto 1.
+            ensambles (iterable, optional): Estaciones que necesitan una unidad de
+                cada arista de entrada para producir una unidad.
+            materia_prima (iterable, optional): Estaciones con materia prima
+                ilimitada. Por defecto, las que no tienen aristas de entrada.
+            retrabajos (iterable, optional): Tuplas (origen, destino, probabilidad):
+                cada unidad procesada en el origen vuelve al destino con esa probabilidad.
+                Las probabilidades de un mismo origen son excluyentes y suman a lo más 1.
+        """
+        if not estaciones:
+            raise ValueError("La red debe tener al menos una estación.")
+        if replicas < 1:
+            raise ValueError("El número de réplicas debe ser al menos 1.")
+        self.nombres = [str(e) for e in estaciones]
+        indice = {nombre: i for i, nombre in enumerate(self.nombres)}
+        n = len(self.nombres)
+
+        def estacion(nombre, que):
+            if str(nombre) not in indice:
+                raise ValueError(f"{que} se refiere a la estación '{nombre}', que no está declarada.")
+            return indice[str(nombre)]
+
+        self.caras = np.array([int(c) for c in estaciones.values()], dtype=np.int64)
+        if self.caras.min() < 1:
+            raise ValueError("El número de caras del dado no puede ser menor que 1.")
+        maquinas = maquinas or {}
+        self.maquinas = np.array([int(maquinas.get(nombre, 1)) for nombre in self.nombres], dtype=np.int64)
+        if self.maquinas.min() < 1:
+            raise ValueError("Cada estación debe tener al menos una máquina.")
+
+        # Aristas de flujo: origen, destino y fracción de la salida del origen
+        origen, destino, fraccion = [], [], []
+        for arista in aristas:
+            origen.append(estacion(arista[0], "Una arista"))
+            destino.append(estacion(arista[1], "Una arista"))
+            fraccion.append(float(arista[2]) if len(arista) > 2 else np.nan)
+        self.origen = np.array(origen, dtype=np.int64)
+        self.destino = np.array(destino, dtype=np.int64)
+        fraccion = np.array(fraccion, dtype=float)
+        # Sin fracción explícita, la salida de la estación se reparte en partes iguales
+        salidas = np.bincount(self.origen, minlength=n)
+        sin_fraccion = np.isnan(fraccion)
+        fraccion[sin_fraccion] = 1.0 / salidas[self.origen[sin_fraccion]]
+        if (fraccion < 0).any():
+            raise ValueError("Las fracciones de ruteo no pueden ser negativas.")
+        total = np.bincount(self.origen, weights=fraccion, minlength=n)
+        if (total > 1 + 1e-9).any():
+            excedidas = [self.nombres[i] for i in np.flatnonzero(total > 1 + 1e-9)]
+            raise ValueError(f"Las fracciones de salida de {', '.join(excedidas)} suman más de 1.")
+        self.fraccion = fraccion
+        self.fraccion_terminado = np.clip(1.0 - total, 0.0, 1.0)
+
+        orden = _orden_topologico(n, self.origen, self.destino)
+        if orden is None:
+            raise ValueError("Las aristas de flujo forman un ciclo. Declare los regresos como retrabajo.")
+        self.orden = orden
+
+        self.ensamble = np.zeros(n, dtype=bool)
+        for nombre in ensambles:
+            self.ensamble[estacion(nombre, "Un ensamble")] = True
+        entradas = np.bincount(self.destino, minlength=n)
+        if materia_prima is None:
+            self.materia_prima = entradas == 0
+        else:
+            self.materia_prima = np.zeros(n, dtype=bool)
+            for nombre in materia_prima:
+                self.materia_prima[estacion(nombre, "La materia prima")] = True
+        sin_entrada = (entradas == 0) & ~self.materia_prima
+        if sin_entrada.any():
+            raise ValueError(f"Las estaciones {', '.join(np.asarray(self.nombres)[sin_entrada])} no tienen "
+                             "aristas de entrada ni materia prima.")
+
+        self.retrabajos = []
+        for origen_r, destino_r, probabilidad in retrabajos:
+            if not 0 <= probabilidad <= 1:
+                raise ValueError("La probabilidad de retrabajo debe estar entre 0 y 1.")
+            self.retrabajos.append((estacion(origen_r, "Un retrabajo"), estacion(destino_r, "Un retrabajo"),
+                                    float(probabilidad)))
+        total_retrabajo = np.zeros(n)
+        for origen_r, _, probabilidad in self.retrabajos:
+            total_retrabajo[origen_r] += probabilidad
+        if (total_retrabajo > 1 + 1e-9).any():
+            excedidas = np.asarray(self.nombres)[total_retrabajo > 1 + 1e-9]
+            raise ValueError(f"Las probabilidades de retrabajo de {', '.join(excedidas)} suman más de 1.")
+
+        # Adyacencia en arreglos enteros (CSR), calculada una sola vez
+        por_destino = np.argsort(self.destino, kind="stable")
+        self.entrada_indptr = np.concatenate([[0], np.cumsum(entradas)])
+        self.entrada_aristas = por_destino
+        por_origen = np.argsort(self.origen, kind="stable")
+        self.salida_indptr = np.concatenate([[0], np.cumsum(salidas)])
+        self.salida_aristas = por_origen
+        # Primer dado de cada estación en el arreglo de lanzamientos
+        self.primer_dado = np.concatenate([[0], np.cumsum(self.maquinas)])
+        self._plan = self._plan_por_estacion()
+
+        self.replicas = replicas
+        self.rng = np.random.default_rng(semilla)
+        self.caras_dados = np.repeat(self.caras, self.maquinas)
+        self.cola = np.zeros((replicas, len(self.origen)), dtype=np.int64)
+        self.cola_retrabajo = np.zeros((replicas, n), dtype=np.int64)
+        self.producto_terminado = np.zeros(replicas, dtype=np.int64)
+        self.procesado = np.zeros((replicas, n), dtype=np.int64)
+        self.suma_lanzamientos = np.zeros((replicas, n), dtype=np.int64)
+        self.suma_wip = np.zeros(replicas, dtype=np.int64)
+        # Suma de las colas (por arista y de retrabajo) al final de cada turno
+        self.suma_cola = np.zeros((replicas, len(self.origen)), dtype=np.int64)
+        self.suma_cola_retrabajo = np.zeros((replicas, n), dtype=np.int64)
+        self.turnos_simulados = 0
+
+    def _plan_por_estacion(self):
+        """Datos de cada estación en orden topológico, como listas de Python (sin búsquedas por turno)."""
+        retrabajo_de = [([], []) for _ in self.nombres]
+        for origen_r, destino_r, probabilidad in self.retrabajos:
+            retrabajo_de[origen_r][0].append(destino_r)
+            retrabajo_de[origen_r][1].append(probabilidad)
+        plan = []
+        for i in self.orden:
+            entrada = self.entrada_aristas[self.entrada_indptr[i]:self.entrada_indptr[i + 1]].tolist()
+            salida = self.salida_aristas[self.salida_indptr[i]:self.salida_indptr[i + 1]].tolist()
+            terminado = float(self.fraccion_terminado[i])
+            # Reparto de la salida: aristas más producto terminado (si hay)
+            pvals = [float(self.fraccion[e]) for e in salida] + ([terminado] if terminado > 1e-12 else [])
+            if salida and pvals:
+                pvals = (np.array(pvals) / sum(pvals)).tolist()
+            # Retrabajo: destinos y probabilidades, más la de continuar (excluyentes)
+            destinos_r, pvals_r = retrabajo_de[i]
+            if destinos_r:
+                total_r = max(1.0, sum(pvals_r))  # Tolera el redondeo de probabilidades que suman 1
+                pvals_r = [p / total_r for p in pvals_r] + [max(0.0, 1.0 - sum(pvals_r) / total_r)]
+            plan.append((i, int(self.primer_dado[i]), int(self.primer_dado[i + 1]), entrada, salida,
+                         terminado > 1e-12, pvals, bool(self.ensamble[i]), bool(self.materia_prima[i]),
+                         (destinos_r, pvals_r)))
+        return plan
+
+    @classmethod
+    def desde_grafo(cls, grafo, replicas: int = 1000, semilla=None):
+        """
+        Construye la red desde un `networkx.DiGraph`. Atributos de nodo:
+        'caras' (obligatorio), 'maquinas', 'ensamble' y 'materia_prima'.
+        Atributos de arista: 'fraccion', o 'retrabajo' (probabilidad) para
+        marcar un regreso.
+        """
+        estaciones = {n: datos['caras'] for n, datos in grafo.nodes(data=True)}
+        aristas, retrabajos = [], []
+        for u, v, datos in grafo.edges(data=True):
+            if 'retrabajo' in datos:
+                retrabajos.append((u, v, datos['retrabajo']))
+            elif 'fraccion' in datos:
+                aristas.append((u, v, datos['fraccion']))
+            else:
+                aristas.append((u, v))
+        materia_prima = [n for n, datos in grafo.nodes(data=True) if datos.get('materia_prima')]
+        return cls(estaciones, aristas, replicas=replicas, semilla=semilla,
+                   maquinas={n: datos.get('maquinas', 1) for n, datos in grafo.nodes(data=True)},
+                   ensambles=[n for n, datos in grafo.nodes(data=True) if datos.get('ensamble')],
+                   materia_prima=materia_prima or None, retrabajos=retrabajos)
+
+    @classmethod
+    def desde_catalogo(cls, datos, replicas: int = 1000, semilla=None, turnos_por_periodo: int | None = None):
+        """
+        Construye la red desde los datos de la planta: cada producto recorre sus
+        'recursos' en el orden en que aparecen. Las fracciones de ruteo salen
+        de la demanda que pasa por cada arista, y el dado de cada recurso tiene
+        como media las unidades que su capacidad permite por turno (capacidad
+        entre el tiempo promedio por unidad y entre `turnos_por_periodo`).
+        Por defecto `turnos_por_periodo` sale de los datos: el recurso más
+        lento recibe un dado de media MEDIA_DADO o algo mayor (un solo turno
+        por periodo si su capacidad no alcanza). Si algún recurso
+        no alcanza una unidad por turno se lanza ValueError, porque su dado
+        no puede representar esa capacidad.
+        """
+        catalog = datos if isinstance(datos, TocCatalog) else TocCatalog.from_datos(datos)
+        n = len(catalog.resource_names)
+        indptr = np.asarray(catalog.indptr, dtype=np.int64)
+        indices = np.asarray(catalog.indices, dtype=np.int64)
+        times = np.asarray(catalog.times, dtype=float)
+        demand = np.asarray(catalog.demand, dtype=float)
+        producto = np.repeat(np.arange(len(demand)), np.diff(indptr))
+
+        # Unidades y minutos que pasan por cada recurso
+        unidades = np.bincount(indices, weights=demand[producto], minlength=n)
+        minutos = np.bincount(indices, weights=demand[producto] * times, minlength=n)
+        usado = minutos > 0
+        por_periodo = np.where(usado, np.asarray(catalog.capacity, dtype=float) * unidades
+                               / np.where(usado, minutos, 1), np.inf)
+        if turnos_por_periodo is None:
+            turnos_por_periodo = max(1, int(por_periodo.min() // MEDIA_DADO)) if usado.any() else 1
+        if turnos_por_periodo < 1:
+            raise ValueError("turnos_por_periodo debe ser al menos 1.")
+        por_turno = np.where(usado, por_periodo / turnos_por_periodo, 1.0)
+        lentos = np.flatnonzero(por_turno < 1)
+        if len(lentos):
+            nombres = ", ".join(f"{catalog.resource_names[r]} ({por_turno[r]:.2f})" for r in lentos[:5].tolist())
+            maximo = int(por_periodo.min())
+            sugerencia = (f" Use como máximo {maximo} turnos por periodo." if maximo >= 1 else
+                          " La planta no completa una unidad por periodo en esos recursos.")
+            raise ValueError(f"Con {turnos_por_periodo} turnos por periodo, estos recursos procesan menos de "
+                             f"una unidad por turno: {nombres}.{sugerencia}")
+        caras = np.rint(2 * por_turno - 1).astype(np.int64)
+
+        # Pasos consecutivos de cada ruta: flujo de demanda por arista
+        siguiente = np.ones(len(indices), dtype=bool)
+        siguiente[indptr[1:][indptr[1:] > 0] - 1] = False
+        desde = np.flatnonzero(siguiente)
+        flujo = {}
+        for u, v, d in zip(indices[desde].tolist(), indices[desde + 1].tolist(), demand[producto[desde]].tolist()):
+            if u != v:
+                flujo[(u, v)] = flujo.get((u, v), 0.0) + d
+        pares = [(u, v) for u, v in flujo if unidades[u] > 0]
+        if _orden_topologico(n, np.array([u for u, _ in pares], dtype=np.int64),
+                             np.array([v for _, v in pares], dtype=np.int64)) is None:
+            raise ValueError("Las rutas de los productos (orden de 'recursos') forman un ciclo entre recursos; "
+                             "declare la red explícitamente con los regresos como retrabajo.")
+        aristas = [(catalog.resource_names[u], catalog.resource_names[v], flujo[(u, v)] / unidades[u])
+                   for u, v in pares]
+        primeros = indices[indptr[:-1][np.diff(indptr) > 0]]
+        materia_prima = [catalog.resource_names[r] for r in np.unique(primeros).tolist()]
+        return cls(dict(zip(catalog.resource_names, caras.tolist())), aristas, replicas=replicas,
+                   semilla=semilla, materia_prima=materia_prima)
+
+    @property
+    def numero_estaciones(self) -> int:
+        return len(self.nombres)
+
+    def lanzar_dados(self) -> np.ndarray:
+        """Lanzamientos de un turno: (réplicas × dados), un dado por máquina."""
+        return self.rng.integers(1, self.caras_dados + 1, size=(self.replicas, len(self.caras_dados)))
+
+    def simular_turno(self, lanzamientos: np.ndarray | None = None):
+        """
+        Simula un turno en todas las réplicas.
+
+        Args:
+            lanzamientos (np.ndarray, optional): Lanzamientos (réplicas × dados)
+                a usar en lugar de tirar los dados.
+        """
+        if lanzamientos is None:
+            lanzamientos = self.lanzar_dados()
+        cola, cola_retrabajo = self.cola, self.cola_retrabajo
+        rng = self.rng
+
+        for i, d0, d1, entrada, salida, a_terminado, pvals, ensamble, materia_prima, retrabajo in self._plan:
+            capacidad = lanzamientos[:, d0] if d1 - d0 == 1 else lanzamientos[:, d0:d1].sum(axis=1)
+            self.suma_lanzamientos[:, i] += capacidad
+
+            # Primero el retrabajo pendiente, luego el material nuevo
+            unidades = np.minimum(capacidad, cola_retrabajo[:, i])
+            cola_retrabajo[:, i] -= unidades
+            restante = capacidad - unidades
+            if ensamble and entrada:
+                nuevas = np.minimum(restante, cola[:, entrada].min(axis=1))
+                cola[:, entrada] -= nuevas[:, None]
+                restante = restante - nuevas
+                unidades = unidades + nuevas
+            else:
+                for e in entrada:
+                    tomadas = np.minimum(restante, cola[:, e])
+                    cola[:, e] -= tomadas
+                    restante = restante - tomadas
+                    unidades = unidades + tomadas
+            if materia_prima:
+                # Materia prima ilimitada para la capacidad que sobra
+                unidades = capacidad if not entrada else unidades + restante
+            self.procesado[:, i] += unidades
+
+            destinos_r, pvals_r = retrabajo
+            if len(destinos_r) == 1:
+                regresan = rng.binomial(unidades, pvals_r[0])
+                cola_retrabajo[:, destinos_r[0]] += regresan
+                unidades = unidades - regresan
+            elif destinos_r:
+                # Un solo sorteo por unidad: vuelve a uno de los destinos o continúa
+                reparto = rng.multinomial(unidades, pvals_r)
+                np.add.at(cola_retrabajo, (slice(None), destinos_r), reparto[:, :-1])
+                unidades = reparto[:, -1]
+
+            # Reparto de la salida entre las aristas y producto terminado
+            if not salida:
+                self.producto_terminado += unidades
+            elif len(pvals) == 1:
+                cola[:, salida[0]] += unidades
+            else:
+                reparto = rng.multinomial(unidades, pvals)
+                cola[:, salida] += reparto[:, :len(salida)]
+                if a_terminado:
+                    self.producto_terminado += reparto[:, -1]
+
+        self.suma_wip += self.wip()
+        self.suma_cola += self.cola
+        self.suma_cola_retrabajo += self.cola_retrabajo
+        self.turnos_simulados += 1
+
+    def simular_jornada(self, numero_de_turnos: int):
+        """Simula `numero_de_turnos` turnos en todas las réplicas."""
+        for _ in range(numero_de_turnos):
+            self.simular_turno()
+
+    def _frente(self, cola, cola_retrabajo):
+        """Unidades frente a cada estación (réplicas × estaciones): colas de entrada más retrabajo."""
+        frente = cola_retrabajo.copy()
+        for i in range(self.numero_estaciones):
+            entrada = self.entrada_aristas[self.entrada_indptr[i]:self.entrada_indptr[i + 1]]
+            if len(entrada):
+                frente[:, i] += cola[:, entrada].sum(axis=1)
+        return frente
+
+    def wip(self) -> np.ndarray:
+        """Inventario en proceso de cada réplica (colas de las aristas y de retrabajo)."""
+        return self.cola.sum(axis=1) + self.cola_retrabajo.sum(axis=1)
+
+    def resultados(self) -> dict:
+        """
+        Totales por réplica.
+
+        Returns:
+            dict: 'producto_terminado' y 'throughput' (por turno), 'wip_total'
+            y 'wip_promedio' (R,), 'cola' (R × aristas), 'cola_promedio'
+            (R × estaciones, cola promedio frente a cada estación), 'utilizacion'
+            (R × estaciones, unidades procesadas entre capacidad lanzada) y
+            'restriccion': la estación con la mayor cola promedio enfrente
+            (si no hay colas, la de mayor utilización).
+        """
+        turnos = max(self.turnos_simulados, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilizacion = np.where(self.suma_lanzamientos > 0, self.procesado / self.suma_lanzamientos, 0.0)
+        cola_promedio = self._frente(self.suma_cola, self.suma_cola_retrabajo) / turnos
+        frente = cola_promedio.mean(axis=0)
+        restriccion = int(frente.argmax()) if frente.max() > 0 else int(utilizacion.mean(axis=0).argmax())
+        return {
+            'producto_terminado': self.producto_terminado.copy(),
+            'throughput': self.producto_terminado / turnos,
+            'wip_total': self.wip(),
+            'wip_promedio': self.suma_wip / turnos,
+            'cola': self.cola.copy(),
+            'cola_promedio': cola_promedio,
+            'utilizacion': utilizacion,
+            'restriccion': self.nombres[restriccion],
+        }
+
+    def resumen(self) -> str:
+        """Resumen en texto de las medias entre réplicas."""
+        res = self.resultados()
+        lineas = [f"=== RED DE {self.numero_estaciones} ESTACIONES, {self.replicas} RÉPLICAS "
+                  f"({self.turnos_simulados} turnos) ===",
+                  f"Throughput promedio por turno: {res['throughput'].mean():.3f}",
+                  f"WIP promedio: {res['wip_promedio'].mean():.2f}",
+                  f"Restricción (mayor cola enfrente): {res['restriccion']}",
+                  "Estaciones con mayor cola promedio enfrente (y su utilización):"]
+        utilizacion = res['utilizacion'].mean(axis=0)
+        frente = res['cola_promedio'].mean(axis=0)
+        for i in np.lexsort((-utilizacion, -frente))[:10].tolist():
+            lineas.append(f"  - {self.nombres[i]}: cola {frente[i]:.2f}, utilización {utilizacion[i]:.3f}")
+        return "\n".join(lineas)
+
+# ----------------------------------------------------------------------
+## EJECUCIÓN DEL PROGRAMA
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación por turnos de la red de ruteo de una planta.")
+    parser.add_argument("archivo", help="Archivo YAML (o .npz columnar); las rutas siguen el orden de 'recursos'.")
+    parser.add_argument("--turnos", type=int, default=1000, help="Turnos a simular.")
+    parser.add_argument("--replicas", type=int, default=1000, help="Réplicas independientes.")
+    parser.add_argument("--turnos-periodo", type=int, default=None,
+                        help="Turnos en que se divide la capacidad de 'recursos' (por defecto, los que dan al "
+                             f"recurso más lento un dado de media {MEDIA_DADO}).")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla de la corrida.")
+    args = parser.parse_args()
+
+    red = RedDeProduccion.desde_catalogo(load_catalog_from_file(args.archivo), replicas=args.replicas,
+                                         semilla=args.semilla, turnos_por_periodo=args.turnos_periodo)
+    inicio = time.perf_counter()
+    red.simular_jornada(args.turnos)
+    print(f"Tiempo: {time.perf_counter() - inicio:.2f} s\n")
+    print(red.resumen())
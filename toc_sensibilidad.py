@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from toc_optimize import SOLVER_MODES, TocModel
+from toc_read import load_catalog_from_file
+
+# ----------------------------------------------------------------------
+## ANÁLISIS DE SENSIBILIDAD (TORNADO) SOBRE LOS PARÁMETROS DE LA PLANTA
+# ----------------------------------------------------------------------
+# Cada parámetro (capacidad de un recurso, o precio, costo_ventas o demanda
+# de un producto) se varía en un rango relativo a su valor base, y la mezcla
+# se vuelve a resolver en memoria con `TocModel` (sin escribir archivos).
+
+PARAMETER_TYPES = ("capacidad", "precio", "costo_ventas", "demanda")
+DEFAULT_RANGE = (-0.2, 0.2)
+
+# Modelo de cada proceso trabajador (se construye una sola vez por proceso)
+_MODELO = None
+
+
+def listar_parametros(catalog, tipos=PARAMETER_TYPES):
+    """
+    Lista los parámetros a perturbar como pares (tipo, nombre): las
+    capacidades de `recursos` y el precio, costo_ventas y demanda de cada producto.
+    """
+    desconocidos = set(tipos) - set(PARAMETER_TYPES)
+    if desconocidos:
+        raise ValueError(f"Tipos de parámetro desconocidos: {', '.join(sorted(desconocidos))}. "
+                         f"Opciones: {', '.join(PARAMETER_TYPES)}")
+    parametros = []
+    if "capacidad" in tipos:
+        parametros += [("capacidad", str(r)) for r in catalog.resource_names]
+    for tipo in ("precio", "costo_ventas", "demanda"):
+        if tipo in tipos:
+            parametros += [(tipo, str(p)) for p in catalog.product_names]
+    return parametros
+
+
+def _valor_base(modelo, tipo, nombre):
+    if tipo == "capacidad":
+        return modelo.capacity_of(nombre)
+    if tipo == "demanda":
+        return modelo.demand_of(nombre)
+    if tipo == "precio":
+        return modelo.price_of(nombre)
+    return modelo.cost_of(nombre)
+
+
+def _asignar(modelo, tipo, nombre, valor):
+    if tipo == "capacidad":
+        modelo.set_capacity(nombre, valor)
+    elif tipo == "demanda":
+        modelo.set_demand(nombre, valor)
+    elif tipo == "precio":
+        modelo.set_price(nombre, valor)
+    else:
+        modelo.set_cost(nombre, valor)
+
+
+def _iniciar_trabajador(catalog, modo):
+    global _MODELO
+    _MODELO = TocModel(catalog, mode=modo)
+
+
+def _evaluar_parametros(tarea):
+    """Resuelve todos los puntos de un grupo de parámetros con el modelo del proceso."""
+    parametros, variaciones_por_tipo = tarea
+    modelo = _MODELO
+    base = modelo.solve()
+    base_utilidad = float(base.net_profit)
+    filas = []
+    for tipo, nombre in parametros:
+        valor_base = _valor_base(modelo, tipo, nombre)
+        for variacion in variaciones_por_tipo[tipo]:
+            valor = valor_base * (1 + variacion)
+            if tipo == "demanda":
+                # La demanda no puede ser negativa; si era entera se conserva entera
+                valor = max(0, round(valor) if isinstance(valor_base, int) else valor)
+            elif tipo == "capacidad" and valor <= 0:
+                continue
+            _asignar(modelo, tipo, nombre, valor)
+            res = modelo.solve()
+            filas.append({
+                'parametro': f"{tipo}:{nombre}",
+                'tipo': tipo,
+                'nombre': nombre,
+                'variacion': variacion,
+                'valor_base': valor_base,
+                'valor': valor,
+                'restriccion': res.bottleneck,
+                'tiene_restriccion': res.has_bottleneck,
+                'throughput_total': float(res.total_throughput),
+                'utilidad_neta': float(res.net_profit),
+                'delta_utilidad': float(res.net_profit) - base_utilidad,
+            })
+        # Restaurar el valor base antes del siguiente parámetro
+        _asignar(modelo, tipo, nombre, valor_base)
+    return filas
+
+
+def analisis_sensibilidad(datos, parametros=None, rango=DEFAULT_RANGE, puntos=21, rangos=None,
+                          modo="greedy", procesos=None):
+    """
+    Perturba cada parámetro en `puntos` valores equiespaciados del rango
+    relativo (por ejemplo -20% a +20%) y resuelve la mezcla en cada punto.
+
+    Los parámetros se reparten en grupos entre un pool de procesos; cada
+    proceso construye un `TocModel` una sola vez y aplica los cambios de
+    forma incremental, restaurando el valor base después de cada parámetro.
+
+    Args:
+        datos (dict | TocCatalog): Datos de la planta.
+        parametros (list[tuple], optional): Pares (tipo, nombre). Por defecto, todos.
+        rango (tuple, optional): Variación relativa mínima y máxima. Por defecto (-0.2, 0.2).
+        puntos (int, optional): Puntos por parámetro. Por defecto 21.
+        rangos (dict, optional): Rango por tipo de parámetro (reemplaza a `rango`).
+        modo (str, optional): Modo de solución de la mezcla (greedy, lp o mip).
+        procesos (int, optional): Procesos trabajadores. Por defecto, todos los núcleos.
+
+    Returns:
+        pd.DataFrame: Tabla en el orden de `parametros`, una fila por parámetro y punto.
+    """
+    modelo = TocModel(datos, mode=modo)
+    catalog = modelo.matrix.catalog
+    parametros = parametros if parametros is not None else listar_parametros(catalog)
+    rangos = rangos or {}
+    variaciones_por_tipo = {tipo: np.linspace(*rangos.get(tipo, rango), puntos).round(10).tolist()
+                            for tipo in PARAMETER_TYPES}
+
+    procesos = procesos or os.cpu_count() or 1
+    grupos = max(1, min(len(parametros), procesos * 4))
+    # Grupos intercalados: cada uno recibe parámetros de todos los tipos
+    tareas = [(parametros[i::grupos], variaciones_por_tipo) for i in range(grupos)]
+
+    if procesos == 1:
+        global _MODELO
+        _MODELO = modelo
+        filas = [fila for tarea in tareas for fila in _evaluar_parametros(tarea)]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(catalog, modo)) as pool:
+            filas = [fila for grupo in pool.map(_evaluar_parametros, tareas) for fila in grupo]
+
+    # Mismo orden que `parametros`, sin importar cómo se repartieron los grupos
+    posicion = {f"{tipo}:{nombre}": i for i, (tipo, nombre) in enumerate(parametros)}
+    tabla = pd.DataFrame(filas)
+    orden = np.lexsort((tabla['variacion'].to_numpy(), tabla['parametro'].map(posicion).to_numpy()))
+    return tabla.iloc[orden].reset_index(drop=True)
+
+
+def resumen_tornado(tabla):
+    """
+    Resume la tabla por parámetro: utilidad neta en el extremo inferior y
+    superior del rango y amplitud (máximo - mínimo) del cambio de utilidad,
+    ordenado de mayor a menor amplitud.
+    """
+    tabla = tabla.sort_values(['parametro', 'variacion'])
+    por_parametro = tabla.groupby('parametro', sort=False)
+    resumen = pd.DataFrame({
+        'tipo': por_parametro['tipo'].first(),
+        'nombre': por_parametro['nombre'].first(),
+        'delta_bajo': por_parametro['delta_utilidad'].first(),
+        'delta_alto': por_parametro['delta_utilidad'].last(),
+        'delta_min': por_parametro['delta_utilidad'].min(),
+        'delta_max': por_parametro['delta_utilidad'].max(),
+    })
+    resumen['amplitud'] = resumen['delta_max'] - resumen['delta_min']
+    return resumen.sort_values('amplitud', ascending=False).reset_index()
+
+
+def grafica_tornado(tabla, ruta, top=20, titulo="Sensibilidad de la Utilidad Neta"):
+    """Guarda el diagrama de tornado de los `top` parámetros con mayor amplitud."""
+    import matplotlib.pyplot as plt
+
+    resumen = resumen_tornado(tabla).head(top).iloc[::-1]
+    y = np.arange(len(resumen))
+    fig, ax = plt.subplots(figsize=(10, max(3, 0.35 * len(resumen) + 1.5)))
+    ax.barh(y, resumen['delta_bajo'], color='#d95f02', label='Extremo inferior del rango')
+    ax.barh(y, resumen['delta_alto'], color='#1b9e77', label='Extremo superior del rango')
+    ax.axvline(0, color='black', linewidth=0.8)
+    ax.set_yticks(y)
+    ax.set_yticklabels(resumen['parametro'])
+    ax.set_xlabel('Cambio en la Utilidad Neta')
+    ax.set_title(titulo)
+    ax.legend(loc='lower right')
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=120)
+    plt.close(fig)
+
+# ----------------------------------------------------------------------
+## EJECUCIÓN DEL PROGRAMA
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis de sensibilidad (tornado) de la utilidad neta.")
+    parser.add_argument("archivo", help="Archivo YAML (o .npz columnar) de la planta.")
+    parser.add_argument("--tipos", nargs="+", choices=PARAMETER_TYPES, default=list(PARAMETER_TYPES),
+                        help="Tipos de parámetro a perturbar.")
+    parser.add_argument("--rango", type=float, nargs=2, default=list(DEFAULT_RANGE), metavar=("MIN", "MAX"),
+                        help="Variación relativa, por ejemplo -0.2 0.2.")
+    parser.add_argument("--puntos", type=int, default=21, help="Puntos por parámetro.")
+    parser.add_argument("--modo", choices=SOLVER_MODES, default="greedy", help="Solución de la mezcla.")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores.")
+    parser.add_argument("--salida", default="sensibilidad.csv", help="Tabla de resultados (.csv o .parquet).")
+    parser.add_argument("--tornado", default="tornado.png", help="Diagrama de tornado (vacío para omitirlo).")
+    parser.add_argument("--top", type=int, default=20, help="Parámetros en el diagrama de tornado.")
+    args = parser.parse_args()
+
+    catalog = load_catalog_from_file(args.archivo)
+    parametros = listar_parametros(catalog, args.tipos)
+    print(f">>> Sensibilidad de {len(parametros)} parámetros x {args.puntos} puntos")
+    inicio = time.perf_counter()
+    tabla = analisis_sensibilidad(catalog, parametros, rango=tuple(args.rango), puntos=args.puntos,
+                                  modo=args.modo, procesos=args.procesos)
+    if args.salida.endswith('.parquet'):
+        tabla.to_parquet(args.salida, index=False)
+    else:
+        tabla.to_csv(args.salida, index=False, float_format='%.4f')
+    print(f"Tabla guardada en: {args.salida} ({time.perf_counter() - inicio:.2f} s)")
+    if args.tornado:
+        grafica_tornado(tabla, args.tornado, top=args.top)
+        print(f"Diagrama de tornado guardado en: {args.tornado}")
+    print(resumen_tornado(tabla).head(10).to_string(index=False, float_format='%.2f'))
@@ -1,110 +1,503 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
+import csv
+import glob
+import hashlib
+import io
+import json
 import os
 import sys
-# Asumimos que toc_optimize.py y toc_graf.py están en el mismo directorio
-import toc_optimize 
-import toc_graf 
-from toc_read import load_data_from_file
+import time
+# Asumimos que toc_optimize.py, toc_graf.py y toc_read.py están en el mismo directorio.
+# Se importan dentro de cada etapa para que --help, los errores de validación y
+# el modo --no-graph no paguen el costo de cargar pandas, networkx o matplotlib.
+import toc_cache
+import toc_metricas
+
+# Versión de la herramienta: forma parte de la clave de la caché, por lo que
+# debe incrementarse cuando cambie el contenido de las salidas.
+TOOL_VERSION = "1.4"
+
+# Modos de solución (los mismos que toc_optimize.SOLVER_MODES, sin importar pandas)
+SOLVER_MODES = ("greedy", "lp", "mip")
+# Formatos del diagrama: PNG (300 dpi) o SVG vectorial
+GRAPH_FORMATS = ("png", "svg")
+
+
+def _report_missing_dependency(e, packages):
+    """Mensaje uniforme cuando falta una librería que necesita una etapa."""
+    print(f"\n❌ Error de dependencia: La librería {e.name} no está instalada.")
+    print(f"   Por favor, ejecute: pip install {packages}")
 
 # ----------------------------------------------------------------------
 ## FUNCIÓN PRINCIPAL DE LA HERRAMIENTA CENTRAL
 # ----------------------------------------------------------------------
 
-def run_toc_tool(yaml_file):
+def run_toc_tool(yaml_file, mode="greedy", use_cache=True, cache_dir=toc_cache.DEFAULT_CACHE_DIR, graph=True,
+                 graph_format="png", html=False, metrics=None, output_claims_dir=None):
     """
     Orquesta el análisis TOC, la graficación, y organiza los archivos de salida.
-    Recibe la ruta del archivo YAML como argumento.
+    Recibe la ruta del archivo YAML como argumento y, opcionalmente, el modo
+    de solución de la mezcla ("greedy", "lp" o "mip").
+
+    Si use_cache es True y los datos no cambiaron desde una corrida anterior
+    (mismo hash de contenido), se reutilizan los CSV/TXT/PNG de la caché.
+    graph_format elige el formato del diagrama ("png" o "svg"). Con html=True
+    se escribe además el tablero interactivo autocontenido (toc_html.py).
+    metrics (toc_metricas.Metrics) registra el tiempo y la memoria de cada
+    etapa y los contadores de la corrida; se agrega al resultado como 'metrics'.
+    Con graph=False solo se generan el CSV y el TXT (no se importan
+    networkx ni matplotlib).
+    output_claims_dir (modo lote) es un directorio compartido por los
+    procesos del lote: cada archivo reserva ahí sus rutas de salida
+    (empresa y fecha), y si otro archivo del lote ya las reservó se reporta
+    un error en lugar de sobrescribir sus resultados.
+
+    Devuelve un diccionario con el estado de la ejecución ('ok' o 'error'),
+    la restricción, el throughput, la utilidad neta y el tiempo empleado.
     """
+    start_time = time.perf_counter()
+    result = {"file": yaml_file, "status": "error", "error": "", "company": "", "date": "",
+              "bottleneck": "", "has_bottleneck": None, "total_throughput": None, "net_profit": None, "cached": False, "seconds": None}
+    # Sin métricas, cada etapa cuesta solo una llamada vacía
+    metrics = metrics or toc_metricas.DISABLED
+    if metrics.enabled:
+        metrics.labels.setdefault("file", yaml_file)
+        metrics.labels.setdefault("mode", mode)
+
+    def finish(status="error", error=""):
+        result.update(status=status, error=error, seconds=round(time.perf_counter() - start_time, 3))
+        if metrics.enabled:
+            metrics.count("errores", int(bool(error)))
+            result["metrics"] = metrics.close().as_dict()
+        return result
+
     print(f"\n*** Herramienta de Análisis TOC (Teoría de Restricciones) ***")
     print(f"    Archivo de entrada: {yaml_file}")
     
     # 1. Validar entorno y cargar datos para configuración
     
-    # Asegurarse de que las librerías necesarias estén disponibles
+    # Cada etapa importa solo las librerías que necesita
     try:
-        import yaml
-        import pandas
-        import networkx
-        import matplotlib.pyplot
+        from toc_read import load_catalog_from_file
     except ImportError as e:
-        print(f"\n❌ Error de dependencia: La librería {e.name} no está instalada.")
-        print("   Por favor, ejecute: pip install PyYAML pandas networkx matplotlib")
-        return
+        _report_missing_dependency(e, "PyYAML")
+        return finish(error=f"Dependencia faltante: {e.name}")
 
     # Cargar datos para obtener el nombre de la empresa
     try:
-        data = load_data_from_file(yaml_file)
+        # Carga y validación en una sola pasada; el catálogo lo usan el análisis y la gráfica
+        with metrics.span("carga"):
+            catalog = load_catalog_from_file(yaml_file)
+        metrics.count("productos", len(catalog.product_names))
+        metrics.count("recursos", len(catalog.resource_names))
+        metrics.count("entradas_matriz", len(catalog.indices))
         # Extraer nombre de la empresa de la sección 'generales'
-        company_name = data.get("generales", {}).get("empresa", "Empresa_TOC").strip()
+        company_name = catalog.company
         print(f"    Empresa detectada: {company_name}")
-        print(f"    Fecha detectada: {data.get('generales', {}).get('fecha', 'YYYY-MM-DD')}")
+        print(f"    Fecha detectada: {catalog.date}")
     except Exception as e:
         print(f"❌ Error al leer datos del archivo '{yaml_file}': {e}")
-        return
+        return finish(error=f"Lectura: {e}")
+    result.update(company=company_name, date=str(catalog.date))
 
     # 2. Crear el Directorio de Salida
     
     output_dir = company_name.replace(' ', '_') # Reemplaza espacios por guiones bajos
     try:
         if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+            # exist_ok: en modo lote otro proceso puede crear la misma carpeta
+            os.makedirs(output_dir, exist_ok=True)
             print(f"\n📁 Directorio '{output_dir}' creado exitosamente.")
         else:
             print(f"\n⚠️ Directorio '{output_dir}' ya existe. Los archivos serán sobrescritos.")
             
         # Extraer fecha de la sección 'generales' para usar en los nombres de archivo
         # Reemplazar caracteres que puedan ser problemáticos en nombres de archivo
-        raw_date = str(data.get("generales", {}).get("fecha", "YYYY-MM-DD")).strip()
+        raw_date = str(catalog.date).strip()
         analysis_date = raw_date.replace('/', '-').replace('\\', '-').replace(' ', '_')
         
         # Definir rutas de salida
         csv_path = os.path.join(output_dir, f"{analysis_date}_resultados_toc.csv")
         txt_path = os.path.join(output_dir, f"{analysis_date}_resumen.txt")
-        png_path = os.path.join(output_dir, f"{analysis_date}_diagrama_toc.png")
+        png_path = os.path.join(output_dir, f"{analysis_date}_diagrama_toc.{graph_format}")
+        html_path = os.path.join(output_dir, f"{analysis_date}_tablero_toc.html")
         
     except OSError as e:
         print(f"❌ Error al crear el directorio '{output_dir}': {e}. Saliendo.")
-        return
+        return finish(error=f"Directorio: {e}")
+
+    if output_claims_dir is not None and not _claim_outputs(output_claims_dir, output_dir, analysis_date):
+        message = (f"Salidas en conflicto: '{os.path.join(output_dir, analysis_date)}_*' ya las escribe "
+                   f"{BATCH_CONFLICT_OWNER} (misma empresa y fecha)")
+        print(f"❌ {message}.")
+        return finish(error=message)
+
+    # 2b. Reutilizar resultados de la caché si los datos no cambiaron
+
+    cache_outputs = {"resultados.csv": csv_path, "resumen.txt": txt_path}
+    if graph:
+        cache_outputs[f"diagrama.{graph_format}"] = png_path
+    if html:
+        cache_outputs["tablero.html"] = html_path
+    if use_cache:
+        # El nombre del archivo de entrada aparece en el TXT, por eso forma parte de la clave
+        key = toc_cache.cache_key(catalog.cache_payload(), TOOL_VERSION, mode=mode, input_filename=yaml_file, graph=graph,
+                                  graph_format=graph_format, html=html)
+        with metrics.span("cache"):
+            cached_summary = toc_cache.lookup(key, cache_outputs, cache_dir)
+        metrics.count("cache_aciertos", int(cached_summary is not None))
+        if cached_summary is not None:
+            print(f"\n♻️ Datos sin cambios: se reutilizan los resultados de la caché ({key[:12]}).")
+            result.update(cached_summary, cached=True)
+            print(f"\n🎉 Tarea finalizada. Revise la carpeta '{output_dir}' para sus resultados.")
+            return finish("ok")
 
     # 3. Ejecutar el Análisis TOC (Lógica de toc_optimize.py)
     
     print("\n--- Ejecutando Análisis de Optimización TOC ---")
     try:
-        # Llamada a la función principal de optimización
-        # Pasamos los datos cargados y el nombre del archivo para reporte
-        toc_optimize.run_toc_analysis(data, csv_path, txt_path, yaml_file)
-        print("✅ Análisis TOC completado y archivos CSV/TXT guardados.")
+        # Un solo modelo (matriz de consumo, factores de carga, throughput y restricción)
+        # para el reporte y la gráfica: el catálogo se recorre una sola vez
+        with metrics.span("optimizacion"):
+            import toc_optimize
+            model = toc_optimize.TocModel(catalog, mode=mode)
+            solution = model.solve()
+        metrics.count("iteraciones", solution.iterations)
+        # El modelo ya está resuelto: esta etapa solo escribe el CSV y el TXT
+        with metrics.span("reportes"):
+            summary = toc_optimize.run_toc_analysis(model, csv_path, txt_path, yaml_file)
+        print(f"✅ Análisis TOC completado (modo {summary['mode']}) y archivos CSV/TXT guardados.")
+        result.update(bottleneck=summary["bottleneck"], has_bottleneck=summary["has_bottleneck"],
+                      total_throughput=summary["total_throughput"],
+                      net_profit=summary["net_profit"])
+    except ImportError as e:
+        _report_missing_dependency(e, "numpy pandas")
+        return finish(error=f"Dependencia faltante: {e.name}")
     except Exception as e:
         print(f"❌ Error crítico durante el análisis TOC: {e}")
         # Detenemos si falla el análisis de datos
-        return 
+        return finish(error=f"Análisis: {e}")
     
     # 4. Ejecutar la Graficación (Lógica de toc_graf.py)
 
-    print("\n--- Generando Diagrama de Procesos ---")
+    if graph:
+        print("\n--- Generando Diagrama de Procesos ---")
+        try:
+            with metrics.span("grafica"):
+                import toc_graf
+                # Llamada a la función principal de graficación
+                # Las posiciones de los nodos se guardan en la caché y se reutilizan mientras no cambie la topología
+                toc_graf.run_toc_graph(model, png_path,
+                                       layout_cache_dir=os.path.join(cache_dir, toc_cache.LAYOUT_DIR) if use_cache else None)
+            print("✅ Diagrama de Grafo generado y guardado.")
+        except ImportError as e:
+            _report_missing_dependency(e, "networkx matplotlib")
+            result["error"] = f"Gráfica: dependencia faltante {e.name}"
+        except Exception as e:
+            print(f"❌ Error durante la graficación: {e}")
+            result["error"] = f"Gráfica: {e}"
+            # Continuamos, ya que la gráfica es complementaria al informe
+
+    # 5. Tablero HTML interactivo (mismo modelo que el reporte)
+
+    if html:
+        try:
+            with metrics.span("html"):
+                import toc_html
+                size = toc_html.write_dashboard(model, html_path)
+            print(f"✅ Tablero HTML guardado ({size / 1024:.0f} KB).")
+        except Exception as e:
+            print(f"❌ Error al generar el tablero HTML: {e}")
+            result["error"] = f"Tablero: {e}"
+
+    # Solo se guardan en caché las corridas completas (con gráfica, si se pidió)
+    if use_cache and not result["error"]:
+        summary_fields = ("bottleneck", "has_bottleneck", "total_throughput", "net_profit")
+        with metrics.span("cache_guardado"):
+            # La caché es complementaria: un fallo al guardar o limpiar no invalida el análisis
+            try:
+                toc_cache.store(key, cache_outputs, {k: result[k] for k in summary_fields}, cache_dir)
+                toc_cache.evict(cache_dir)
+            except OSError as e:
+                print(f"⚠️ No se pudo actualizar la caché: {e}")
+
+    print(f"\n🎉 Tarea finalizada. Revise la carpeta '{output_dir}' para sus resultados.")
+    return finish("ok", result["error"])
+
+# ----------------------------------------------------------------------
+## MODO HORIZONTE: PLAN DE VARIOS PERIODOS
+# ----------------------------------------------------------------------
+
+def run_toc_horizon(yaml_files, mode="greedy", window=None):
+    """
+    Plan combinado de varios periodos: un archivo con la sección 'horizonte'
+    o un archivo por periodo (mismos recursos, productos y tiempos). Escribe
+    un CSV por periodo y el resumen del horizonte en <empresa>/horizonte/.
+
+    Devuelve un diccionario con el estado ('ok' o 'error'), el throughput y
+    la utilidad neta del horizonte y el tiempo empleado.
+    """
+    start_time = time.perf_counter()
+    result = {"files": list(yaml_files), "status": "error", "error": "", "company": "", "periods": None,
+              "total_throughput": None, "net_profit": None, "seconds": None}
+
+    def finish(status="error", error=""):
+        result.update(status=status, error=error, seconds=round(time.perf_counter() - start_time, 3))
+        return result
+
+    print(f"\n*** Herramienta de Análisis TOC: Horizonte de Planeación ***")
+    print(f"    Archivos de entrada: {', '.join(yaml_files)}")
+    try:
+        from toc_read import load_catalog_from_file
+        import toc_optimize
+    except ImportError as e:
+        _report_missing_dependency(e, "PyYAML numpy pandas scipy")
+        return finish(error=f"Dependencia faltante: {e.name}")
+
     try:
-        # Llamada a la función principal de graficación
-        toc_graf.run_toc_graph(data, png_path)
-        print("✅ Diagrama de Grafo generado y guardado.")
+        catalogs = [load_catalog_from_file(f) for f in yaml_files]
+        if len(catalogs) == 1:
+            horizon = toc_optimize.PlanningHorizon.from_catalog(catalogs[0])
+        else:
+            horizon = toc_optimize.PlanningHorizon.from_catalogs(catalogs)
     except Exception as e:
-        print(f"❌ Error durante la graficación: {e}")
-        # Continuamos, ya que la gráfica es complementaria al informe
+        print(f"❌ Error al leer los datos del horizonte: {e}")
+        return finish(error=f"Lectura: {e}")
+
+    company_name = catalogs[0].company
+    result.update(company=company_name, periods=len(horizon.periods))
+    output_dir = os.path.join(company_name.replace(' ', '_'), "horizonte")
+    print(f"    Empresa detectada: {company_name}")
+    print(f"    Periodos: {len(horizon.periods)} ({horizon.periods[0]} a {horizon.periods[-1]})")
+
+    print("\n--- Ejecutando Plan del Horizonte ---")
+    try:
+        summary = toc_optimize.run_horizon_analysis(horizon, output_dir, mode=mode, window=window,
+                                                    input_filename=", ".join(yaml_files))
+    except Exception as e:
+        print(f"❌ Error crítico durante el plan del horizonte: {e}")
+        return finish(error=f"Horizonte: {e}")
+    print(f"✅ Plan del horizonte completado (modo {summary['mode']}): un CSV por periodo y resumen guardados.")
+    result.update(total_throughput=summary["total_throughput"], net_profit=summary["net_profit"])
 
     print(f"\n🎉 Tarea finalizada. Revise la carpeta '{output_dir}' para sus resultados.")
+    return finish("ok")
+
+# ----------------------------------------------------------------------
+## MODO LOTE: VARIOS ARCHIVOS YAML EN PARALELO
+# ----------------------------------------------------------------------
+
+BATCH_INDEX_FIELDS = ["file", "status", "company", "date", "bottleneck", "has_bottleneck", "total_throughput",
+                      "net_profit", "cached", "seconds", "error"]
+
+
+def expand_batch_inputs(pattern):
+    """Lista los archivos YAML (o columnares .npz) de un directorio o de un patrón glob, en orden."""
+    if os.path.isdir(pattern):
+        files = [f for ext in ("*.yml", "*.yaml", "*.npz") for f in glob.glob(os.path.join(pattern, ext))]
+    else:
+        files = glob.glob(pattern, recursive=True)
+    return sorted(set(files))
+
+
+def _init_batch_worker(graph):
+    """Cada proceso del lote usa su propio matplotlib con backend no interactivo."""
+    if graph:
+        import matplotlib
+        matplotlib.use("Agg")
+
+
+# Texto que run_batch reemplaza por el archivo que reservó las salidas en conflicto
+BATCH_CONFLICT_OWNER = "otro archivo del lote"
+
+
+def _claim_outputs(claims_dir, output_dir, analysis_date):
+    """
+    Reserva las rutas de salida <output_dir>/<fecha>_* para este proceso del
+    lote. La creación exclusiva (O_EXCL) es atómica entre procesos.
+    """
+    prefix = os.path.normcase(os.path.abspath(os.path.join(output_dir, analysis_date)))
+    claim = os.path.join(claims_dir, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+    try:
+        os.close(os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+def _run_batch_item(yaml_file, mode, use_cache, cache_dir, graph, graph_format, html, metrics, memory,
+                    output_claims_dir=None):
+    """Ejecuta un archivo del lote capturando su salida; nunca lanza excepciones."""
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            result = run_toc_tool(yaml_file, mode=mode, use_cache=use_cache, cache_dir=cache_dir, graph=graph,
+                                  graph_format=graph_format, html=html,
+                                  metrics=toc_metricas.Metrics(memory=memory) if metrics else None,
+                                  output_claims_dir=output_claims_dir)
+    except Exception as e:
+        result = {"file": yaml_file, "status": "error", "error": f"Inesperado: {e}"}
+    result["log"] = log.getvalue()
+    return result
+
+
+def run_batch(pattern, mode="greedy", processes=None, index_path="indice_lote",
+              use_cache=True, cache_dir=toc_cache.DEFAULT_CACHE_DIR, graph=True, graph_format="png",
+              html=False, metrics_path=None, metrics_format=None, memory=False):
+    """
+    Procesa todos los archivos YAML de un directorio o patrón glob en un pool
+    de procesos. Un archivo con error no detiene el lote.
+
+    Escribe un índice consolidado (index_path + .csv y .json) con la
+    restricción, el throughput, la utilidad neta, el tiempo y el error de
+    cada archivo. Con metrics_path, las métricas de todos los archivos se
+    escriben juntas en ese archivo (JSON o Prometheus, ver toc_metricas.py).
+    Si dos archivos tienen la misma empresa y fecha (las mismas rutas de
+    salida), solo el primero en llegar las escribe; el otro se reporta con
+    error en el índice.
+    Devuelve la lista de resultados.
+    """
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    files = expand_batch_inputs(pattern)
+    if not files:
+        print(f"❌ No se encontraron archivos YAML para '{pattern}'.")
+        return []
+
+    processes = min(processes or os.cpu_count() or 1, len(files))
+    print(f"\n*** Modo lote: {len(files)} archivos en {processes} procesos ***")
+    start_time = time.perf_counter()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="toc_lote_") as claims_dir, \
+            ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker, initargs=(graph,)) as pool:
+        futures = {pool.submit(_run_batch_item, f, mode, use_cache, cache_dir, graph, graph_format, html,
+                               metrics_path is not None, memory, claims_dir): f for f in files}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # El proceso trabajador murió (por ejemplo, memoria agotada)
+                result = {"file": futures[future], "status": "error", "error": f"Proceso: {e}", "log": ""}
+            results.append(result)
+            if result["status"] == "ok":
+                origin = " [caché]" if result["cached"] else ""
+                print(f"✅ {result['file']} ({result['seconds']:.2f} s{origin}) -> {result['company']}, "
+                      f"restricción: {result['bottleneck']}, utilidad neta: {result['net_profit']:.2f}")
+            else:
+                print(f"❌ {result['file']}: {result['error']}")
+
+    results.sort(key=lambda r: r["file"])
+    # Nombrar el archivo que escribió las salidas de cada conflicto
+    owners = {(r["company"], r["date"]): r["file"] for r in results if r.get("status") == "ok"}
+    for r in results:
+        owner = owners.get((r.get("company"), r.get("date")))
+        if r["status"] != "ok" and owner and BATCH_CONFLICT_OWNER in r["error"]:
+            r["error"] = r["error"].replace(BATCH_CONFLICT_OWNER, f"'{owner}'")
+    if metrics_path:
+        toc_metricas.write_metrics(metrics_path, [r.get("metrics") for r in results], metrics_format)
+    rows = [{k: r.get(k) for k in BATCH_INDEX_FIELDS} for r in results]
+
+    with open(f"{index_path}.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=BATCH_INDEX_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(f"{index_path}.json", "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    print(f"\n🎉 Lote finalizado en {time.perf_counter() - start_time:.2f} s: "
+          f"{len(results) - failed} correctos, {failed} con error. Índice: {index_path}.csv / {index_path}.json")
+    return results
     
 # ----------------------------------------------------------------------
 ## EJECUCIÓN DEL PROGRAMA
 # ----------------------------------------------------------------------
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: ./toc_tool.py <archivo_yaml>")
-        sys.exit(1)
-        
-    yaml_file_arg = sys.argv[1]
-    
-    if not os.path.exists(yaml_file_arg):
-        print(f"Error: El archivo '{yaml_file_arg}' no existe.")
-        sys.exit(1)
-        
-    run_toc_tool(yaml_file_arg)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Herramienta de Análisis TOC (Teoría de Restricciones).")
+    parser.add_argument("yaml_file", nargs="*",
+                        help="Archivo YAML con generales, recursos, productos y gastos_operacion "
+                             "(o su versión columnar .npz, ver toc_columnar.py). Con --horizonte, "
+                             "un archivo con la sección 'horizonte' o un archivo por periodo.")
+    parser.add_argument("--batch", metavar="DIR_O_GLOB",
+                        help="Procesa en paralelo todos los YAML de un directorio o patrón glob.")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del modo lote (por defecto, todos los núcleos).")
+    parser.add_argument("--indice", default="indice_lote", help="Ruta base del índice del lote (.csv y .json).")
+    parser.add_argument("--no-graph", action="store_true",
+                        help="Solo texto: genera CSV y TXT sin diagrama (no carga networkx ni matplotlib).")
+    parser.add_argument("--formato-grafica", choices=GRAPH_FORMATS, default="png",
+                        help="Formato del diagrama: png (300 dpi, por defecto) o svg (vectorial).")
+    parser.add_argument("--html", action="store_true",
+                        help="Genera además un tablero HTML interactivo (sin conexión) con escenarios de capacidad y demanda.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recalcula todo aunque los datos no hayan cambiado.")
+    parser.add_argument("--cache-dir", default=toc_cache.DEFAULT_CACHE_DIR,
+                        help="Directorio de la caché (por defecto $TOC_CACHE_DIR o ~/.cache/toc_tool).")
+    parser.add_argument("--modo", choices=SOLVER_MODES, default="greedy",
+                        help="Solución de la mezcla: greedy (T/C, por defecto), lp (continua) o mip (entera).")
+    parser.add_argument("--horizonte", action="store_true",
+                        help="Plan de varios periodos con inventario entre periodos (CSV por periodo y resumen).")
+    parser.add_argument("--ventana", type=int, default=None,
+                        help="Con --horizonte: horizonte rodante de este número de periodos.")
+    parser.add_argument("--metricas", metavar="ARCHIVO",
+                        help="Guarda el tiempo de cada etapa y los contadores de la corrida (JSON; "
+                             "formato de texto de Prometheus si termina en .prom).")
+    parser.add_argument("--formato-metricas", choices=toc_metricas.METRIC_FORMATS, default=None,
+                        help="Formato de --metricas (por defecto, según la extensión).")
+    parser.add_argument("--memoria", action="store_true",
+                        help="Con --metricas: mide el pico de memoria de cada etapa (tracemalloc, más lento).")
+    parser.add_argument("--perfil", choices=toc_metricas.PROFILERS, default=None,
+                        help="Perfila la corrida completa con cProfile o pyinstrument.")
+    parser.add_argument("--perfil-salida", default=None,
+                        help="Archivo del perfil (por defecto toc_perfil.prof o toc_perfil.html).")
+    args = parser.parse_args()
+    if args.memoria and not args.metricas:
+        parser.error("--memoria requiere --metricas.")
+    if args.perfil == "pyinstrument":
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError as e:
+            _report_missing_dependency(e, "pyinstrument")
+            sys.exit(1)
+
+    if args.batch:
+        if args.perfil:
+            parser.error("--perfil no está disponible en modo lote (cada archivo corre en otro proceso).")
+        batch_results = run_batch(args.batch, mode=args.modo, processes=args.procesos, index_path=args.indice,
+                                  use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                                  graph=not args.no_graph, graph_format=args.formato_grafica, html=args.html,
+                                  metrics_path=args.metricas, metrics_format=args.formato_metricas,
+                                  memory=args.memoria)
+        sys.exit(0 if batch_results and all(r["status"] == "ok" for r in batch_results) else 1)
+
+    if not args.yaml_file:
+        parser.error("Indique un archivo YAML o use --batch.")
+
+    for yaml_file_arg in args.yaml_file:
+        if not os.path.exists(yaml_file_arg):
+            print(f"Error: El archivo '{yaml_file_arg}' no existe.")
+            sys.exit(1)
+
+    if args.horizonte:
+        horizon_result = run_toc_horizon(args.yaml_file, mode=args.modo, window=args.ventana)
+        sys.exit(0 if horizon_result["status"] == "ok" else 1)
+    if len(args.yaml_file) > 1:
+        parser.error("Varios archivos solo se aceptan con --horizonte (o use --batch).")
+
+    yaml_file_arg = args.yaml_file[0]
+    run_metrics = toc_metricas.Metrics(memory=args.memoria) if args.metricas else None
+    profile_path = args.perfil_salida or ("toc_perfil.prof" if args.perfil == "cprofile" else "toc_perfil.html")
+
+    with toc_metricas.profile(args.perfil, profile_path):
+        run_toc_tool(yaml_file_arg, mode=args.modo, use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                     graph=not args.no_graph, graph_format=args.formato_grafica, html=args.html,
+                     metrics=run_metrics)
+    if run_metrics:
+        run_metrics.write(args.metricas, args.formato_metricas)
+        print(f"📈 Métricas guardadas en: {args.metricas}")
+    if args.perfil:
+        print(f"🔎 Perfil ({args.perfil}) guardado en: {profile_path}")
\ No newline at end of file